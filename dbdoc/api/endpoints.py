@@ -1,6 +1,7 @@
 """Enhanced API endpoints with pagination, filtering, and new features."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 from typing import List, Optional
@@ -8,10 +9,11 @@ import re
 import uuid
 from datetime import datetime
 
-from ..models.base import get_db
+from ..models.base import get_db, get_read_db, get_write_db, WriteSessionLocal, thread_write_lock
 from ..models import DataSource, Table, Column, TableFilter, UserContext, Relationship
-from ..core import CatalogManager
-from ..services.job_manager import JobManager, JobType, create_job, start_job, get_job, list_jobs
+from ..core import CatalogManagerFactory
+from ..services.job_manager import JOB_STATUS_VALUES, Job, JobManager, JobType, create_job, start_job, get_job, list_jobs
+from ..services.erd_generator import ERDGenerator
 from .schemas import (
     DataSourceCreate, DataSourceUpdate, DataSourceResponse,
     TableResponse, PaginatedTableResponse, TableListParams,
@@ -26,15 +28,20 @@ from .schemas import (
 
 router = APIRouter(prefix="/api/v2", tags=["Enhanced API"])
 
-# Use the global job manager
-from ..services.job_manager import job_manager
+
+def get_catalog_manager_factory(request: Request) -> CatalogManagerFactory:
+    """Get the app's shared catalog manager factory, creating it if missing."""
+    factory = getattr(request.app.state, "catalog_manager_factory", None)
+    if factory is None:
+        factory = request.app.state.catalog_manager_factory = CatalogManagerFactory()
+    return factory
 
 
 # Data Source endpoints
 @router.post("/data-sources", response_model=DataSourceResponse)
-async def create_data_source(data_source: DataSourceCreate, db: Session = Depends(get_db)):
+async def create_data_source(data_source: DataSourceCreate, request: Request, db: Session = Depends(get_write_db)):
     """Create a new data source with enhanced filtering options."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = get_catalog_manager_factory(request).for_session(db)
     
     # Create data source with new fields
     new_ds = DataSource(
@@ -67,7 +74,7 @@ async def create_data_source(data_source: DataSourceCreate, db: Session = Depend
 async def update_data_source(
     data_source_id: int,
     update: DataSourceUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Update data source settings."""
     ds = db.query(DataSource).filter(DataSource.id == data_source_id).first()
@@ -173,7 +180,7 @@ async def list_tables(
 async def create_table_filter(
     data_source_id: int,
     filter_create: TableFilterCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Create or update a table filter."""
     # Check if filter already exists
@@ -212,7 +219,7 @@ async def create_table_filter(
 async def bulk_update_table_filters(
     data_source_id: int,
     bulk_update: TableFilterBulkUpdate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Bulk update table filters."""
     updated_filters = []
@@ -261,7 +268,7 @@ async def bulk_update_table_filters(
 @router.post("/user-context", response_model=UserContextResponse)
 async def create_user_context(
     context: UserContextCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Create or update user context for a table or column."""
     # Check if context already exists
@@ -315,10 +322,11 @@ async def get_column_context(column_id: int, db: Session = Depends(get_db)):
 async def discover_schema_enhanced(
     data_source_id: int,
     params: DiscoveryParams,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_write_db)
 ):
     """Discover schema with enhanced filtering."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = get_catalog_manager_factory(request).for_session(db)
     data_source = db.query(DataSource).filter(DataSource.id == data_source_id).first()
     
     if not data_source:
@@ -383,9 +391,12 @@ async def discover_schema_enhanced(
 async def generate_descriptions_async(
     data_source_id: int,
     params: GenerationParams,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Start async generation job with user context."""
+    catalog_manager_factory = get_catalog_manager_factory(request)
+
     # Get tables to process
     query = db.query(Table).filter(Table.data_source_id == data_source_id)
     
@@ -417,9 +428,12 @@ async def generate_descriptions_async(
     )
     
     # Start the job
-    def generation_job(progress_callback, db_session, data_source_id, table_ids, params):
-        """Job function for description generation."""
-        catalog_manager = CatalogManager(db_session)
+    def generation_job(progress_callback, data_source_id, table_ids, params):
+        """Job function for description generation, on its own write session."""
+        # The request's session closes when it returns, so the job opens its
+        # own; see run_description_generation in main.py
+        db_session = WriteSessionLocal(expire_on_commit=False)
+        catalog_manager = catalog_manager_factory.for_session(db_session, write_lock=thread_write_lock)
         
         try:
             result = catalog_manager.generate_descriptions_sync_wrapper(
@@ -433,16 +447,19 @@ async def generate_descriptions_async(
         except Exception as e:
             logger.error(f"Generation job failed: {e}")
             raise
+        finally:
+            db_session.close()
     
     # Start job in background
-    start_job(
+    started = start_job(
         job_id,
         generation_job,
-        db,
         data_source_id,
         [t.id for t in tables],
         params
     )
+    if not started:
+        raise HTTPException(status_code=503, detail="Too many jobs queued, try again later")
     
     estimated_time = len(tables) * 2  # 2 seconds per table estimate
     
@@ -453,6 +470,21 @@ async def generate_descriptions_async(
     )
 
 
+def job_status_response(job: Job) -> JobStatusResponse:
+    """Build the status response for a job from a snapshot of it."""
+    snapshot = job.snapshot()
+    return JobStatusResponse(
+        job_id=snapshot.id,
+        status=JOB_STATUS_VALUES[snapshot.status],
+        progress=snapshot.progress.percentage / 100.0,
+        items_completed=snapshot.progress.items_processed,
+        items_total=snapshot.progress.total_items,
+        errors=[snapshot.error] if snapshot.error else [],
+        started_at=snapshot.started_at,
+        completed_at=snapshot.completed_at
+    )
+
+
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(job_id: str):
     """Get status of a generation job."""
@@ -460,16 +492,7 @@ async def get_job_status(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return JobStatusResponse(
-        job_id=job.id,
-        status=job.status,
-        progress=job.progress.percentage / 100.0,
-        items_completed=job.progress.items_processed,
-        items_total=job.progress.total_items,
-        errors=[job.error] if job.error else [],
-        started_at=job.started_at,
-        completed_at=job.completed_at
-    )
+    return job_status_response(job)
 
 
 @router.get("/jobs", response_model=List[JobStatusResponse])
@@ -487,26 +510,14 @@ async def list_all_jobs(
     
     jobs = list_jobs(job_type=job_type_enum, status=status_enum, limit=limit)
     
-    return [
-        JobStatusResponse(
-            job_id=job.id,
-            status=job.status,
-            progress=job.progress.percentage / 100.0,
-            items_completed=job.progress.items_processed,
-            items_total=job.progress.total_items,
-            errors=[job.error] if job.error else [],
-            started_at=job.started_at,
-            completed_at=job.completed_at
-        )
-        for job in jobs
-    ]
+    return [job_status_response(job) for job in jobs]
 
 
 # ERD endpoint
 @router.post("/erd", response_model=ERDResponse)
 async def generate_erd(
     request: ERDRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Generate ERD diagram for a data source."""
     # Get tables
@@ -568,4 +579,25 @@ async def generate_erd(
         table_count=len(tables),
         relationship_count=len(relationships),
         format="mermaid"
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/data-sources/{data_source_id}/erd.mmd", response_class=StreamingResponse)
+async def stream_erd(
+    data_source_id: int,
+    schema_filter: Optional[str] = Query(None, description="Filter by schema"),
+    include_columns: bool = Query(True),
+    max_tables: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_write_db)
+):
+    """Stream the Mermaid ERD of a data source as plain text, line by line."""
+    data_source = db.query(DataSource).filter(DataSource.id == data_source_id).first()
+    
+    if not data_source:
+        raise HTTPException(status_code=404, detail="Data source not found")
+    
+    # Loads everything up front; only rendering happens while streaming
+    lines = ERDGenerator(db).stream_mermaid_erd(
+        data_source_id, schema_filter, include_columns, max_tables=max_tables
+    )
+    return StreamingResponse((f"{line}\n" for line in lines), media_type="text/plain")
@@ -3,17 +3,24 @@
 from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from jinja2 import FileSystemBytecodeCache
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Set
+import asyncio
 import os
+import tempfile
 
-from ..models.base import get_db, create_tables
+from ..models.base import get_read_db, get_write_db, create_tables, WriteSessionLocal, thread_write_lock
 from ..models import DataSource
-from ..core import CatalogManager
+from ..core import CatalogManagerFactory, catalog_cache
+from ..services.async_generation_engine import GenerationProgress
+from ..services.job_manager import JOB_STATUS_VALUES, Job, JobStatus, JobType, create_job, start_job, get_job, get_manager
 from .schemas import (
     DataSourceCreate, DataSourceResponse,
-    TableResponse, TableDetailResponse,
+    TableDetailResponse,
     DiscoveryRequest, DiscoveryResponse,
     GenerateDescriptionsRequest,
     ValidationRequest, ValidationResponse
@@ -29,6 +36,9 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# Shared across requests so LLM clients are built once per process
+app.state.catalog_manager_factory = CatalogManagerFactory()
+
 # Include enhanced API routes
 app.include_router(enhanced_router)
 
@@ -41,10 +51,104 @@ if os.path.exists(static_path):
 
 templates = Jinja2Templates(directory=templates_path)
 
+# Templates only change on deploy, so skip the per-render stat() of every
+# template and keep compiled bytecode across restarts
+templates_cache_path = os.path.join(tempfile.gettempdir(), "dbdoc_jinja_cache")
+os.makedirs(templates_cache_path, exist_ok=True)
+templates.env.auto_reload = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+templates.env.bytecode_cache = FileSystemBytecodeCache(templates_cache_path)
+
+# Serializes ORM rows straight to JSON bytes, bypassing FastAPI's
+# response_model re-validation and jsonable_encoder pass
+data_source_list_adapter = TypeAdapter(List[DataSourceResponse])
+DATA_SOURCE_RESPONSE_FIELDS = tuple(DataSourceResponse.model_fields)
+
+
+def stream_json_array(items: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode items as a JSON array one element at a time."""
+    yield b"["
+    for index, item in enumerate(items):
+        if index:
+            yield b","
+        yield to_json(item)
+    yield b"]"
+
+
+def run_description_generation(
+    progress_callback: Callable,
+    data_source_id: int,
+    table_id: Optional[int],
+    table_ids: Optional[List[int]],
+    column_ids: Optional[Set[int]],
+    enhanced: bool,
+    max_concurrent: int,
+    rate_limit_rpm: int,
+    use_cache: bool
+) -> Dict[str, Any]:
+    """
+    Job function that generates descriptions on its own write session.
+    
+    Writes go through the single-connection write engine like write
+    requests do. The job can't take the asyncio write lock from its worker
+    thread, so it holds thread_write_lock around each batch it commits.
+    Objects aren't expired on commit because the session commits between
+    tables to hand the connection back.
+    """
+    db = WriteSessionLocal(expire_on_commit=False)
+    try:
+        catalog_manager = app.state.catalog_manager_factory.for_session(db, write_lock=thread_write_lock)
+        
+        if enhanced:
+            def report_enhanced(progress: GenerationProgress):
+                done = progress.completed + progress.failed
+                step = progress.current_task or "Generating descriptions"
+                progress_callback(step, done, progress.total_tasks, done, progress.total_tasks)
+            
+            # Use enhanced generation with rich context and concurrency
+            return catalog_manager.generate_descriptions_sync_wrapper(
+                data_source_id=data_source_id,
+                table_ids=table_ids,
+                column_ids=column_ids,
+                max_concurrent=max_concurrent,
+                rate_limit_rpm=rate_limit_rpm,
+                progress_callback=report_enhanced,
+                use_cache=use_cache
+            )
+        
+        def report(message: str, processed: int, total: int):
+            progress_callback(message, processed, total, processed, total)
+        
+        # Use original generation method
+        return catalog_manager.generate_descriptions(
+            data_source_id=data_source_id,
+            table_id=table_id,
+            table_ids=table_ids,
+            column_ids=list(column_ids) if column_ids else None,
+            progress_callback=report
+        )
+    finally:
+        db.close()
+
+
+def job_event(job: Job) -> Dict[str, Any]:
+    """Build the progress payload streamed to clients for a job."""
+    snapshot = job.snapshot()
+    progress = snapshot.progress
+    return {
+        "job_id": snapshot.id,
+        "status": JOB_STATUS_VALUES[snapshot.status],
+        "current_step": progress.current_step,
+        "items_processed": progress.items_processed,
+        "total_items": progress.total_items,
+        "percentage": progress.percentage,
+        "result": snapshot.result if snapshot.status == JobStatus.COMPLETED else None,
+        "error": snapshot.error
+    }
+
 
 # Web Routes
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, db: Session = Depends(get_db)):
+async def home(request: Request, db: Session = Depends(get_read_db)):
     """Home page showing data sources."""
     data_sources = db.query(DataSource).all()
     return templates.TemplateResponse("index.html", {
@@ -54,13 +158,13 @@ async def home(request: Request, db: Session = Depends(get_db)):
 
 
 @app.get("/catalog/{data_source_id}", response_class=HTMLResponse)
-async def catalog_view(request: Request, data_source_id: int, db: Session = Depends(get_db)):
+async def catalog_view(request: Request, data_source_id: int, db: Session = Depends(get_read_db)):
     """Catalog view for a specific data source."""
     data_source = db.query(DataSource).filter(DataSource.id == data_source_id).first()
     if not data_source:
         raise HTTPException(status_code=404, detail="Data source not found")
     
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     tables = catalog_manager.get_tables(data_source_id)
     
     return templates.TemplateResponse("catalog.html", {
@@ -71,7 +175,7 @@ async def catalog_view(request: Request, data_source_id: int, db: Session = Depe
 
 
 @app.get("/enhanced-catalog/{data_source_id}", response_class=HTMLResponse)
-async def enhanced_catalog_view(request: Request, data_source_id: int, db: Session = Depends(get_db)):
+async def enhanced_catalog_view(request: Request, data_source_id: int, db: Session = Depends(get_read_db)):
     """Enhanced catalog view with filtering, search, and ERD features."""
     data_source = db.query(DataSource).filter(DataSource.id == data_source_id).first()
     if not data_source:
@@ -84,9 +188,9 @@ async def enhanced_catalog_view(request: Request, data_source_id: int, db: Sessi
 
 
 @app.get("/table/{table_id}", response_class=HTMLResponse)
-async def table_view(request: Request, table_id: int, db: Session = Depends(get_db)):
+async def table_view(request: Request, table_id: int, db: Session = Depends(get_read_db)):
     """Detailed view of a specific table."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     table_details = catalog_manager.get_table_details(table_id)
     
     if not table_details:
@@ -100,9 +204,9 @@ async def table_view(request: Request, table_id: int, db: Session = Depends(get_
 
 # API Routes
 @app.post("/api/data-sources", response_model=DataSourceResponse)
-async def create_data_source(data_source: DataSourceCreate, db: Session = Depends(get_db)):
+async def create_data_source(data_source: DataSourceCreate, db: Session = Depends(get_write_db)):
     """Create a new data source."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     
     try:
         new_data_source = catalog_manager.add_data_source(
@@ -116,16 +220,27 @@ async def create_data_source(data_source: DataSourceCreate, db: Session = Depend
 
 
 @app.get("/api/data-sources", response_model=List[DataSourceResponse])
-async def list_data_sources(db: Session = Depends(get_db)):
+async def list_data_sources(db: Session = Depends(get_read_db)):
     """List all data sources."""
     data_sources = db.query(DataSource).all()
-    return [DataSourceResponse.from_orm(ds) for ds in data_sources]
+    # Rows come straight from our own tables, so build the models without
+    # re-validating every field
+    payload = [
+        DataSourceResponse.model_construct(**{
+            field: getattr(ds, field) for field in DATA_SOURCE_RESPONSE_FIELDS if hasattr(ds, field)
+        })
+        for ds in data_sources
+    ]
+    return Response(
+        content=data_source_list_adapter.dump_json(payload),
+        media_type="application/json"
+    )
 
 
 @app.delete("/api/data-sources/{data_source_id}")
-async def delete_data_source(data_source_id: int, db: Session = Depends(get_db)):
+async def delete_data_source(data_source_id: int, db: Session = Depends(get_write_db)):
     """Delete a data source and all its associated data."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     
     try:
         result = catalog_manager.remove_data_source(data_source_id)
@@ -135,9 +250,9 @@ async def delete_data_source(data_source_id: int, db: Session = Depends(get_db))
 
 
 @app.post("/api/data-sources/{data_source_id}/discover", response_model=DiscoveryResponse)
-async def discover_schema(data_source_id: int, request: DiscoveryRequest, db: Session = Depends(get_db)):
+async def discover_schema(data_source_id: int, request: DiscoveryRequest, db: Session = Depends(get_write_db)):
     """Discover schema for a data source."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     
     try:
         result = catalog_manager.discover_schema(
@@ -158,10 +273,12 @@ async def generate_descriptions(
     max_concurrent: int = 5,
     rate_limit_rpm: int = 60,
     use_cache: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
-    Generate AI descriptions for tables and columns.
+    Start generating AI descriptions for tables and columns in the background.
+    
+    Returns the job ID immediately; follow progress at /api/jobs/{job_id}/stream.
     
     Parameters:
     - enhanced: Use enhanced generation with better context and concurrency
@@ -169,64 +286,113 @@ async def generate_descriptions(
     - rate_limit_rpm: Rate limit in requests per minute (enhanced mode only)
     - use_cache: Enable caching for faster repeated generations (enhanced mode only)
     """
-    catalog_manager = CatalogManager(db)
+    data_source = db.query(DataSource).filter(DataSource.id == data_source_id).first()
+    if not data_source:
+        raise HTTPException(status_code=404, detail="Data source not found")
     
-    try:
-        table_ids = None
-        column_ids = None
-        
-        if request:
-            table_ids = request.table_ids
-            column_ids = set(request.column_ids) if request.column_ids else None
-        
-        if enhanced:
-            # Use enhanced generation with rich context and concurrency
-            result = catalog_manager.generate_descriptions_sync_wrapper(
-                data_source_id=data_source_id,
-                table_ids=table_ids,
-                column_ids=column_ids,
-                max_concurrent=max_concurrent,
-                rate_limit_rpm=rate_limit_rpm,
-                use_cache=use_cache
-            )
-        else:
-            # Use original generation method
-            result = catalog_manager.generate_descriptions(
-                data_source_id=data_source_id,
-                table_id=table_id,
-                table_ids=table_ids,
-                column_ids=list(column_ids) if column_ids else None
-            )
-        
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    table_ids = None
+    column_ids = None
+    
+    if request:
+        table_ids = request.table_ids
+        column_ids = set(request.column_ids) if request.column_ids else None
+    
+    job_id = create_job(
+        job_type=JobType.DESCRIPTION_GENERATION,
+        title=f"Generate descriptions for {data_source.name}",
+        description=f"Generating AI descriptions for data source {data_source_id}",
+        metadata={
+            "data_source_id": data_source_id,
+            "table_ids": table_ids,
+            "enhanced": enhanced
+        }
+    )
+    started = start_job(
+        job_id,
+        run_description_generation,
+        data_source_id,
+        table_id,
+        table_ids,
+        column_ids,
+        enhanced,
+        max_concurrent,
+        rate_limit_rpm,
+        use_cache
+    )
+    if not started:
+        raise HTTPException(status_code=503, detail="Too many jobs queued, try again later")
+    
+    return {"job_id": job_id}
 
 
-@app.get("/api/data-sources/{data_source_id}/tables", response_model=List[TableResponse])
-async def get_tables(data_source_id: int, db: Session = Depends(get_db)):
-    """Get all tables for a data source."""
-    catalog_manager = CatalogManager(db)
+@app.get("/api/jobs/{job_id}/stream")
+async def stream_job_progress(job_id: str):
+    """Stream job progress as server-sent events until the job finishes."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    # Job callbacks fire on worker threads, so hand events over to the loop
+    def on_progress(updated_job: Job):
+        loop.call_soon_threadsafe(queue.put_nowait, job_event(updated_job))
+    
+    get_manager().add_progress_callback(job_id, on_progress)
+    finished = {JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value}
+    
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            event = job_event(job)
+            while True:
+                yield b"data: " + to_json(event) + b"\n\n"
+                if event["status"] in finished:
+                    break
+                event = await queue.get()
+        finally:
+            get_manager().remove_progress_callback(job_id, on_progress)
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/api/data-sources/{data_source_id}/tables", response_class=StreamingResponse)
+async def get_tables(request: Request, data_source_id: int, db: Session = Depends(get_read_db)):
+    """Get all tables for a data source, streamed as a JSON array."""
+    etag = catalog_cache.etag(data_source_id)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     tables = catalog_manager.get_tables(data_source_id)
-    return [TableResponse(**table) for table in tables]
+    return StreamingResponse(
+        stream_json_array(tables),
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
 
 
 @app.get("/api/tables/{table_id}", response_model=TableDetailResponse)
-async def get_table_details(table_id: int, db: Session = Depends(get_db)):
+async def get_table_details(request: Request, response: Response, table_id: int, db: Session = Depends(get_read_db)):
     """Get detailed information about a table."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     table_details = catalog_manager.get_table_details(table_id)
     
     if not table_details:
         raise HTTPException(status_code=404, detail="Table not found")
     
+    etag = catalog_cache.etag(table_details['data_source_id'])
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
     return TableDetailResponse(**table_details)
 
 
 @app.post("/api/descriptions/{description_id}/validate", response_model=ValidationResponse)
-async def validate_description(description_id: int, request: ValidationRequest, db: Session = Depends(get_db)):
+async def validate_description(description_id: int, request: ValidationRequest, db: Session = Depends(get_write_db)):
     """Validate an AI-generated description."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     
     try:
         result = catalog_manager.validate_description(
@@ -242,8 +408,8 @@ async def validate_description(description_id: int, request: ValidationRequest,
 
 
 @app.get("/api/descriptions/pending")
-async def get_pending_descriptions(db: Session = Depends(get_db)):
+async def get_pending_descriptions(db: Session = Depends(get_read_db)):
     """Get all descriptions pending validation."""
-    catalog_manager = CatalogManager(db)
+    catalog_manager = app.state.catalog_manager_factory.for_session(db)
     pending = catalog_manager.get_pending_descriptions()
     return pending
\ No newline at end of file
@@ -1,5 +1,6 @@
 """Core business logic for Schema Scribe."""
 
-from .catalog_manager import CatalogManager
+from .catalog_cache import CatalogCache, catalog_cache
+from .catalog_manager import CatalogManager, CatalogManagerFactory
 
-__all__ = ["CatalogManager"]
\ No newline at end of file
+__all__ = ["CatalogManager", "CatalogManagerFactory", "CatalogCache", "catalog_cache"]
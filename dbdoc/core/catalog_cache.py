@@ -0,0 +1,75 @@
+"""In-memory cache for hot catalog reads."""
+
+import secrets
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class CatalogCache:
+    """
+    TTL cache for catalog read results, invalidated per data source.
+
+    Every data source has a generation counter that write operations bump.
+    Cached entries remember the generation they were built under and are
+    discarded once it moves on, so reads never outlive a known write; the
+    TTL bounds staleness from writes made outside this process.
+
+    ETags are built from the same generations, so they also carry an ID
+    picked when the cache is created and the current TTL window: an ETag
+    from another worker or an earlier run never matches, and one never
+    outlives writes made elsewhere by more than the TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        """Initialize with the maximum age of a cached entry."""
+        self.ttl_seconds = ttl_seconds
+        self._boot_id = secrets.token_hex(4)
+        self._global_generation = 0
+        self._generations: Dict[int, int] = {}
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, int, Tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, data_source_id: int) -> Tuple[int, int]:
+        """Get the current generation of a data source."""
+        return (self._global_generation, self._generations.get(data_source_id, 0))
+
+    def etag(self, data_source_id: int) -> str:
+        """Get a weak ETag identifying the current state of a data source."""
+        global_generation, generation = self.generation(data_source_id)
+        window = int(time.monotonic() // self.ttl_seconds) if self.ttl_seconds > 0 else time.monotonic_ns()
+        return f'W/"{self._boot_id}.{window}.{global_generation}.{generation}-{data_source_id}"'
+
+    def get(self, kind: str, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if missing, expired or invalidated."""
+        entry = self._entries.get((kind, key))
+        if entry is None:
+            return None
+
+        expires_at, data_source_id, generation, value = entry
+        if expires_at < time.monotonic() or generation != self.generation(data_source_id):
+            self._entries.pop((kind, key), None)
+            return None
+        return value
+
+    def set(self, kind: str, key: Hashable, data_source_id: int, value: Any) -> None:
+        """Cache a value built from the given data source's current state."""
+        self._entries[(kind, key)] = (
+            time.monotonic() + self.ttl_seconds,
+            data_source_id,
+            self.generation(data_source_id),
+            value
+        )
+
+    def invalidate(self, data_source_id: Optional[int] = None) -> None:
+        """Invalidate cached reads for one data source, or for all when None."""
+        with self._lock:
+            if data_source_id is None:
+                self._global_generation += 1
+                self._entries.clear()
+            else:
+                self._generations[data_source_id] = self._generations.get(data_source_id, 0) + 1
+
+
+# Shared by every CatalogManager in the process
+catalog_cache = CatalogCache()
@@ -3,40 +3,120 @@
 import logging
 import os
 import asyncio
+import concurrent.futures
+import threading
+from collections import deque
+from contextlib import nullcontext
 from typing import List, Optional, Dict, Any, Set, Callable
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from datetime import datetime
 
 from ..models import DataSource, Table, Column, AIDescription, ValidationStatus
 from ..services import DataProfiler, AIService
-from ..services.ai_service import LLMProvider
+from ..services.ai_service import LLMProvider, PROMPT_VERSION
 from ..services.multi_db_connector import MultiDatabaseConnector, DatabaseType
 from ..services.enhanced_context_builder import EnhancedContextBuilder
 from ..services.async_generation_engine import AsyncGenerationEngine, GenerationProgress
+from .catalog_cache import catalog_cache
 
 logger = logging.getLogger(__name__)
 
+# Generated descriptions are inserted in batches of this many rows
+DESCRIPTION_FLUSH_ROWS = 256
+
+
+class CatalogManagerFactory:
+    """Holds state shared by all catalog managers, such as the LLM client."""
+    
+    def __init__(self):
+        """Initialize with no shared state; it is built on first use."""
+        self._ai_service: Optional[AIService] = None
+        self._lock = threading.Lock()
+    
+    def get_ai_service(self) -> AIService:
+        """Get or create the shared AI service instance."""
+        if self._ai_service is None:
+            with self._lock:
+                if self._ai_service is None:
+                    # Try OpenAI first, then Anthropic
+                    if os.getenv("OPENAI_API_KEY"):
+                        self._ai_service = AIService(LLMProvider.OPENAI)
+                    elif os.getenv("ANTHROPIC_API_KEY"):
+                        self._ai_service = AIService(LLMProvider.ANTHROPIC)
+                    else:
+                        raise ValueError("Either OPENAI_API_KEY or ANTHROPIC_API_KEY environment variable must be set for AI description generation")
+        return self._ai_service
+    
+    def for_session(self, db_session: Session,
+                    write_lock: Optional[threading.Lock] = None) -> "CatalogManager":
+        """Get a catalog manager bound to a database session."""
+        return CatalogManager(db_session, factory=self, write_lock=write_lock)
+
 
 class CatalogManager:
     """Manages the data catalog operations."""
     
-    def __init__(self, db_session: Session):
-        """Initialize with database session."""
+    def __init__(self, db_session: Session, factory: Optional[CatalogManagerFactory] = None,
+                 write_lock: Optional[threading.Lock] = None):
+        """
+        Initialize with database session and optional shared factory.
+        
+        Background jobs writing through the shared write session pass a
+        write_lock; generation then holds it around each batch it commits
+        and hands the session's connection back between batches.
+        """
         self.db = db_session
+        self.factory = factory or CatalogManagerFactory()
+        self.write_lock = write_lock
         self.ai_service = None  # Initialize lazily when needed
         
     def _get_ai_service(self) -> AIService:
         """Get or create AI service instance."""
         if self.ai_service is None:
-            # Try OpenAI first, then Anthropic
-            if os.getenv("OPENAI_API_KEY"):
-                self.ai_service = AIService(LLMProvider.OPENAI)
-            elif os.getenv("ANTHROPIC_API_KEY"):
-                self.ai_service = AIService(LLMProvider.ANTHROPIC)
-            else:
-                raise ValueError("Either OPENAI_API_KEY or ANTHROPIC_API_KEY environment variable must be set for AI description generation")
+            self.ai_service = self.factory.get_ai_service()
         return self.ai_service
     
+    @staticmethod
+    def _generate_table(ai_service: AIService, schema_name: str, table_name: str,
+                        row_count: Optional[int], columns_data: List[Dict[str, Any]],
+                        items: List[Dict[str, Any]]):
+        """Make a table's LLM calls; failures are returned in place of results."""
+        try:
+            table_result = ai_service.generate_table_description(schema_name, table_name, columns_data, row_count)
+        except Exception as e:
+            table_result = e
+        
+        try:
+            col_results = ai_service.generate_column_descriptions_for_table(table_name, items) if items else []
+        except Exception as e:
+            col_results = e
+        
+        return table_result, col_results
+    
+    def _commit_descriptions(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert and commit description rows, holding the write lock if there is one."""
+        with self.write_lock or nullcontext():
+            AIDescription.bulk_insert(self.db, rows)
+            self.db.commit()
+    
+    def _description_row(self, result, table_id: Optional[int] = None,
+                         column_id: Optional[int] = None) -> Dict[str, Any]:
+        """Build the AIDescription row for a generation result."""
+        return {
+            "table_id": table_id,
+            "column_id": column_id,
+            "description": result.description,
+            "suggested_name": result.suggested_name,
+            "confidence_score": result.confidence_score,
+            "context_used": "",
+            "reasoning": result.reasoning,
+            "suggested_business_domain": result.suggested_business_domain,
+            "suggested_is_pii": result.suggested_is_pii,
+            "suggested_data_quality_warning": result.data_quality_warning,
+            "model_used": result.model_used,
+            "prompt_version": PROMPT_VERSION,
+        }
+    
     def add_data_source(self, name: str, connection_string: str, 
                        database_type: str = "postgresql") -> DataSource:
         """Add a new data source to the catalog."""
@@ -65,6 +145,7 @@ class CatalogManager:
         self.db.add(data_source)
         self.db.commit()
         self.db.refresh(data_source)
+        catalog_cache.invalidate(data_source.id)
         
         logger.info(f"Added data source: {name}")
         return data_source
@@ -120,6 +201,7 @@ class CatalogManager:
             
             # Commit all deletions
             self.db.commit()
+            catalog_cache.invalidate(data_source_id)
             
             logger.info(f"Removed data source: {name} ({tables_count} tables, {columns_count} columns, {descriptions_count} descriptions)")
             return {
@@ -155,7 +237,7 @@ class CatalogManager:
         if not connector.connect():
             raise ValueError("Cannot connect to database")
         
-        profiler = DataProfiler(connector.engine)
+        profiler = DataProfiler(connector.engine, data_source.database_type)
         
         # Get tables
         tables_metadata = connector.get_tables(schemas)
@@ -195,6 +277,14 @@ class CatalogManager:
                 table_meta.table_name
             )
             
+            # Profile all columns of the table in batches of queries; columns
+            # that can't be profiled are missing from the result
+            profiles = profiler.profile_table(
+                table_meta.schema_name,
+                table_meta.table_name,
+                [col_meta.column_name for col_meta in columns_metadata]
+            )
+            
             for col_meta in columns_metadata:
                 # Check if column already exists
                 existing_column = self.db.query(Column).filter(
@@ -219,14 +309,11 @@ class CatalogManager:
                 else:
                     column = existing_column
                 
-                # Profile the column
+                profile = profiles.get(col_meta.column_name)
+                if profile is None:
+                    continue
+                
                 try:
-                    profile = profiler.profile_column(
-                        table_meta.schema_name,
-                        table_meta.table_name, 
-                        col_meta.column_name
-                    )
-                    
                     # Update column with profile data
                     column.cardinality = profile.cardinality
                     column.null_percentage = profile.null_percentage
@@ -253,6 +340,7 @@ class CatalogManager:
             
             self.db.commit()
         
+        catalog_cache.invalidate(data_source_id)
         logger.info(f"Schema discovery complete: {tables_added} tables, {columns_added} columns added")
         return {"tables_added": tables_added, "columns_added": columns_added}
     
@@ -260,8 +348,16 @@ class CatalogManager:
                             table_id: Optional[int] = None,
                             table_ids: Optional[List[int]] = None,
                             column_ids: Optional[List[int]] = None,
-                            progress_callback=None) -> Dict[str, int]:
-        """Generate AI descriptions for tables and columns."""
+                            progress_callback=None,
+                            max_concurrent_tables: int = 4) -> Dict[str, int]:
+        """
+        Generate AI descriptions for tables and columns.
+        
+        Runs as a pipeline: this thread reads each table's catalog data and
+        submits its LLM calls to a worker, keeping up to
+        max_concurrent_tables tables in flight, and turns finished tables
+        into rows that are committed every DESCRIPTION_FLUSH_ROWS rows.
+        """
         query = self.db.query(Table).filter(Table.data_source_id == data_source_id)
         
         if table_id:
@@ -274,74 +370,82 @@ class CatalogManager:
         total_tables = len(tables)
         total_columns = sum(len(table.columns) for table in tables)
         processed_items = 0
+        description_rows = []
         
         if progress_callback:
             progress_callback(f"Starting generation for {total_tables} tables with {total_columns} columns", 0, total_tables + total_columns)
         
-        for table_idx, table in enumerate(tables):
-            # Generate table description
-            columns_data = []
-            for col in table.columns:
-                columns_data.append({
-                    'column_name': col.column_name,
-                    'data_type': col.data_type,
-                    'description': getattr(col.ai_descriptions[0], 'description', None) 
-                                 if col.ai_descriptions else None
-                })
-            
-            if progress_callback:
-                progress_callback(f"Generating description for table {table.table_name}", processed_items, total_tables + total_columns)
+        ai_service = self._get_ai_service()
+        in_flight = deque()
+        
+        def finish(table: Table, pending_columns: List[Column], future) -> None:
+            """Turn a table's finished generation into rows, flushing them in bulk."""
+            nonlocal descriptions_generated, processed_items
+            table_result, col_results = future.result()
             
-            try:
-                ai_service = self._get_ai_service()
-                table_result = ai_service.generate_table_description(
-                    table.schema_name,
-                    table.table_name,
-                    columns_data,
-                    table.row_count
-                )
-                
+            if isinstance(table_result, Exception):
+                logger.error(f"Failed to generate table description for {table.full_name}: {table_result}")
+            else:
                 # Save table description
-                table_desc = AIDescription(
-                    table_id=table.id,
-                    description=table_result.description,
-                    suggested_name=table_result.suggested_name,
-                    confidence_score=table_result.confidence_score,
-                    context_used="",  # Could store the context here
-                    reasoning=table_result.reasoning,
-                    suggested_business_domain=table_result.suggested_business_domain,
-                    suggested_is_pii=table_result.suggested_is_pii,
-                    suggested_data_quality_warning=table_result.data_quality_warning,
-                    model_used=table_result.model_used,
-                    prompt_version="v1.0"
-                )
-                
-                self.db.add(table_desc)
+                description_rows.append(self._description_row(table_result, table_id=table.id))
                 descriptions_generated += 1
                 processed_items += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to generate table description for {table.full_name}: {e}")
             
-            # Generate column descriptions
-            for column in table.columns:
-                # Skip if column not in selection (when column_ids is specified)
-                if column_ids and column.id not in column_ids:
+            if isinstance(col_results, Exception):
+                logger.error(f"Failed to generate column descriptions for {table.full_name}: {col_results}")
+                processed_items += len(pending_columns)
+                col_results = []
+            
+            for column, col_result in zip(pending_columns, col_results):
+                processed_items += 1
+                if isinstance(col_result, Exception):
+                    logger.error(f"Failed to generate column description for {column.column_name}: {col_result}")
                     continue
                 
-                # Skip if already has description
-                existing_desc = self.db.query(AIDescription).filter(
-                    AIDescription.column_id == column.id,
-                    AIDescription.status != ValidationStatus.REJECTED
-                ).first()
-                
-                if existing_desc:
-                    continue
+                # Save column description
+                description_rows.append(self._description_row(col_result, column_id=column.id))
+                descriptions_generated += 1
+            
+            if len(description_rows) >= DESCRIPTION_FLUSH_ROWS:
+                self._commit_descriptions(description_rows)
+                description_rows.clear()
+            
+            if progress_callback:
+                progress_callback(f"Generated descriptions for table {table.table_name}", processed_items, total_tables + total_columns)
+        
+        # Catalog reads stay on this thread (the session isn't thread-safe)
+        # while workers make the LLM calls for up to max_concurrent_tables tables
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent_tables) as executor:
+            for table in tables:
+                columns_data = []
+                for col in table.columns:
+                    columns_data.append({
+                        'column_name': col.column_name,
+                        'data_type': col.data_type,
+                        'description': getattr(col.ai_descriptions[0], 'description', None) 
+                                     if col.ai_descriptions else None
+                    })
                 
-                if progress_callback:
-                    progress_callback(f"Generating description for column {table.table_name}.{column.column_name}", processed_items, total_tables + total_columns)
+                # Collect the columns that still need a description
+                pending_columns = []
+                for column in table.columns:
+                    # Skip if column not in selection (when column_ids is specified)
+                    if column_ids and column.id not in column_ids:
+                        continue
+                    
+                    # Skip if already has description
+                    existing_desc = self.db.query(AIDescription).filter(
+                        AIDescription.column_id == column.id,
+                        AIDescription.status != ValidationStatus.REJECTED
+                    ).first()
+                    
+                    if existing_desc:
+                        continue
+                    
+                    pending_columns.append(column)
                 
-                try:
+                items = []
+                for column in pending_columns:
                     profile_data = {
                         'cardinality': column.cardinality,
                         'null_percentage': column.null_percentage,
@@ -355,40 +459,37 @@ class CatalogManager:
                     if column.top_values:
                         sample_values = list(column.top_values.keys())[:10]
                     
-                    ai_service = self._get_ai_service()
-                    col_result = ai_service.generate_column_description(
-                        table.table_name,
-                        column.column_name,
-                        column.data_type,
-                        column.is_nullable,
-                        profile_data,
-                        sample_values
-                    )
-                    
-                    # Save column description
-                    col_desc = AIDescription(
-                        column_id=column.id,
-                        description=col_result.description,
-                        suggested_name=col_result.suggested_name,
-                        confidence_score=col_result.confidence_score,
-                        context_used="",
-                        reasoning=col_result.reasoning,
-                        suggested_business_domain=col_result.suggested_business_domain,
-                        suggested_is_pii=col_result.suggested_is_pii,
-                        suggested_data_quality_warning=col_result.data_quality_warning,
-                        model_used=col_result.model_used,
-                        prompt_version="v1.0"
-                    )
-                    
-                    self.db.add(col_desc)
-                    descriptions_generated += 1
-                    processed_items += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to generate column description for {column.column_name}: {e}")
-                    processed_items += 1
+                    items.append({
+                        'table_name': table.table_name,
+                        'column_name': column.column_name,
+                        'data_type': column.data_type,
+                        'is_nullable': column.is_nullable,
+                        'profile_data': profile_data,
+                        'sample_values': sample_values
+                    })
+                
+                if progress_callback:
+                    progress_callback(f"Generating descriptions for table {table.table_name} and {len(pending_columns)} columns", processed_items, total_tables + total_columns)
+                
+                if self.write_lock is not None:
+                    # Other writers share this session's connection; end the
+                    # read transaction so it is free while the LLM calls run
+                    self.db.commit()
+                
+                future = executor.submit(
+                    self._generate_table, ai_service, table.schema_name, table.table_name,
+                    table.row_count, columns_data, items
+                )
+                in_flight.append((table, pending_columns, future))
+                
+                if len(in_flight) >= max_concurrent_tables:
+                    finish(*in_flight.popleft())
+            
+            while in_flight:
+                finish(*in_flight.popleft())
         
-        self.db.commit()
+        self._commit_descriptions(description_rows)
+        catalog_cache.invalidate(data_source_id)
         
         if progress_callback:
             progress_callback(f"Generation complete! Generated {descriptions_generated} descriptions", total_tables + total_columns, total_tables + total_columns)
@@ -436,7 +537,7 @@ class CatalogManager:
         # Initialize enhanced components
         try:
             ai_service = self._get_ai_service()
-            context_builder = EnhancedContextBuilder(self.db, data_source)
+            context_builder = EnhancedContextBuilder(self.db, data_source, cache=catalog_cache)
             
             generation_engine = AsyncGenerationEngine(
                 db_session=self.db,
@@ -444,7 +545,8 @@ class CatalogManager:
                 context_builder=context_builder,
                 max_concurrent=max_concurrent,
                 rate_limit_rpm=rate_limit_rpm,
-                cache_enabled=use_cache
+                cache_enabled=use_cache,
+                write_lock=self.write_lock
             )
             
             if progress_callback:
@@ -466,6 +568,7 @@ class CatalogManager:
             # Run async generation
             logger.info(f"Starting enhanced generation for {len(tables)} tables with {len(column_ids)} columns")
             result = await generation_engine.generate_descriptions(tables, column_ids)
+            catalog_cache.invalidate(data_source_id)
             
             # Update statistics
             result.update({
@@ -555,6 +658,10 @@ class CatalogManager:
     
     def get_tables(self, data_source_id: int) -> List[Dict[str, Any]]:
         """Get all tables for a data source."""
+        cached = catalog_cache.get("tables", data_source_id)
+        if cached is not None:
+            return cached
+        
         tables = self.db.query(Table).filter(
             Table.data_source_id == data_source_id
         ).all()
@@ -578,10 +685,15 @@ class CatalogManager:
                 'last_profiled_at': table.last_profiled_at
             })
         
+        catalog_cache.set("tables", data_source_id, data_source_id, result)
         return result
     
     def get_table_details(self, table_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed information about a table including columns."""
+        cached = catalog_cache.get("table_details", table_id)
+        if cached is not None:
+            return cached
+        
         table = self.db.query(Table).filter(Table.id == table_id).first()
         if not table:
             return None
@@ -611,7 +723,7 @@ class CatalogManager:
                 'description_id': col_desc.id if col_desc else None
             })
         
-        return {
+        details = {
             'id': table.id,
             'data_source_id': table.data_source_id,
             'schema_name': table.schema_name,
@@ -625,6 +737,9 @@ class CatalogManager:
             'description_id': table_desc.id if table_desc else None,
             'columns': columns
         }
+        
+        catalog_cache.set("table_details", table_id, table.data_source_id, details)
+        return details
     
     def validate_description(self, description_id: int, action: str, feedback: Optional[str] = None) -> Dict[str, Any]:
         """Validate an AI-generated description."""
@@ -659,6 +774,9 @@ class CatalogManager:
         
         self.db.commit()
         
+        owner_table = description.table or (description.column.table if description.column else None)
+        catalog_cache.invalidate(owner_table.data_source_id if owner_table else None)
+        
         return {
             "description_id": description_id,
             "new_status": description.status.value,
@@ -667,7 +785,9 @@ class CatalogManager:
     
     def get_pending_descriptions(self) -> List[Dict[str, Any]]:
         """Get all descriptions pending validation."""
-        descriptions = self.db.query(AIDescription).filter(
+        descriptions = self.db.query(AIDescription).options(
+            undefer(AIDescription.reasoning)
+        ).filter(
             AIDescription.status == ValidationStatus.PENDING
         ).all()
         
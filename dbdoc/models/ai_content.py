@@ -1,9 +1,11 @@
 """Models for AI-generated content and validation workflow."""
 
-from sqlalchemy import Column as SQLColumn, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import insert, text, Column as SQLColumn, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, Index
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
+from typing import Any, Dict, List
 from .base import Base
 
 
@@ -15,10 +17,46 @@ class ValidationStatus(PyEnum):
     REJECTED = "rejected"
 
 
+class ValidationStatusType(TypeDecorator):
+    """
+    Stores a ValidationStatus as its name in a plain string column.
+    
+    Names match what the previous SQL Enum column stored, so existing rows
+    read back unchanged; bound values may be members, names or values.
+    """
+    
+    impl = String(16)
+    cache_ok = True
+    
+    @staticmethod
+    def coerce(value) -> ValidationStatus:
+        """Convert a member, name or value to a ValidationStatus."""
+        if isinstance(value, ValidationStatus):
+            return value
+        try:
+            return ValidationStatus(value)
+        except ValueError:
+            return ValidationStatus[value]
+    
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.coerce(value).name
+    
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.coerce(value)
+
+
 class AIDescription(Base):
     """AI-generated descriptions for tables and columns."""
     
     __tablename__ = "ai_descriptions"
+    __table_args__ = (
+        # The validation worklist only ever reads pending rows
+        Index(
+            "ix_ai_descriptions_pending", "status",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'")
+        ),
+    )
     
     id = SQLColumn(Integer, primary_key=True, index=True)
     
@@ -31,12 +69,13 @@ class AIDescription(Base):
     description = SQLColumn(Text, nullable=False)
     confidence_score = SQLColumn(Float)  # AI confidence 0-1
     
-    # RAG context used
-    context_used = SQLColumn(Text)  # What context was provided to LLM
-    reasoning = SQLColumn(Text)     # LLM's chain of thought
+    # RAG context used; deferred since catalog reads rarely need the LLM's
+    # working text and it dwarfs the description itself
+    context_used = deferred(SQLColumn(Text))  # What context was provided to LLM
+    reasoning = deferred(SQLColumn(Text))     # LLM's chain of thought
     
     # Validation workflow
-    status = SQLColumn(Enum(ValidationStatus), default=ValidationStatus.PENDING)
+    status = SQLColumn(ValidationStatusType(), default=ValidationStatus.PENDING)
     human_feedback = SQLColumn(Text)  # If edited or rejected, why?
     final_description = SQLColumn(Text)  # Human-approved final description
     
@@ -56,4 +95,10 @@ class AIDescription(Base):
     
     # Relationships
     table = relationship("Table", back_populates="ai_descriptions")
-    column = relationship("Column", back_populates="ai_descriptions")
\ No newline at end of file
+    column = relationship("Column", back_populates="ai_descriptions")
+    
+    @classmethod
+    def bulk_insert(cls, session, rows: List[Dict[str, Any]]) -> None:
+        """Insert many descriptions in one executemany instead of one INSERT per object."""
+        if rows:
+            session.execute(insert(cls), rows)
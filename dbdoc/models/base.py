@@ -1,14 +1,68 @@
 """Base database model configuration."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import asyncio
 import os
+import threading
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dbdoc.db")
 
-engine = create_engine(DATABASE_URL)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """Apply WAL journaling and relaxed sync to every new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB
+    cursor.close()
+
+
+def _set_sqlite_query_only(dbapi_connection, connection_record):
+    """Reject writes on connections handed out for read-only requests."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+if IS_SQLITE:
+    # Keep a pool of warm connections so each request reuses a connection
+    # that already has the PRAGMAs above applied
+    engine = create_engine(DATABASE_URL, pool_size=10, max_overflow=20)
+    event.listen(engine, "connect", _set_sqlite_pragma)
+
+    # WAL lets readers run alongside a writer, so reads get their own pool
+    # while writes go through a single connection (SQLite allows one writer)
+    read_engine = create_engine(DATABASE_URL, pool_size=10, max_overflow=20)
+    event.listen(read_engine, "connect", _set_sqlite_pragma)
+    event.listen(read_engine, "connect", _set_sqlite_query_only)
+
+    write_engine = create_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+    event.listen(write_engine, "connect", _set_sqlite_pragma)
+elif make_url(DATABASE_URL).drivername in ("postgresql", "postgresql+psycopg2"):
+    # Batch executemany for UPDATE/DELETE as well as INSERT
+    engine = create_engine(DATABASE_URL, executemany_mode="values_plus_batch")
+    read_engine = engine
+    write_engine = engine
+else:
+    engine = create_engine(DATABASE_URL)
+    read_engine = engine
+    write_engine = engine
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+
+# Serializes write sessions so writers queue here instead of timing out on the pool
+_write_lock = asyncio.Lock()
+
+# Serializes commits from write sessions opened on worker threads (background
+# jobs), which can't take the asyncio lock; held per batch, not per job
+thread_write_lock = threading.Lock()
 
 Base = declarative_base()
 
@@ -22,6 +76,25 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Get database session for requests that only read the catalog."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_write_db():
+    """Get database session for requests that modify the catalog."""
+    async with _write_lock:
+        db = WriteSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
 def create_tables():
     """Create all database tables."""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
@@ -1,8 +1,9 @@
 """Core catalog models for tables, columns, and relationships."""
 
-from sqlalchemy import Column as SQLColumn, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import insert, Column as SQLColumn, Integer, String, DateTime, Float, Boolean, Text, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from typing import Any, Dict, List
 from .base import Base
 
 
@@ -131,6 +132,12 @@ class Relationship(Base):
     created_at = SQLColumn(DateTime(timezone=True), server_default=func.now())
     validated_at = SQLColumn(DateTime(timezone=True))
     validated_by = SQLColumn(String(255))  # User who validated
+    
+    @classmethod
+    def bulk_insert(cls, session, rows: List[Dict[str, Any]]) -> None:
+        """Insert many relationships in one executemany instead of one INSERT per object."""
+        if rows:
+            session.execute(insert(cls), rows)
 
 
 class TableFilter(Base):
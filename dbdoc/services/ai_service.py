@@ -1,16 +1,255 @@
 """AI service for generating descriptions using LLMs."""
 
+import asyncio
+import concurrent.futures
 import logging
 import os
 import json
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, asdict
 import openai
 import anthropic
+import orjson
 from enum import Enum
 
+from .semantic_cache import SemanticCache, ProgramCache, ResponseCache, CACHE_DIR
+
 logger = logging.getLogger(__name__)
 
+# String fields of a column response as they stream in; the closing quote
+# may not have arrived yet
+_PARTIAL_FIELD_RES = {
+    name: re.compile(rf'"{name}"\s*:\s*"((?:[^"\\]|\\.)*)')
+    for name in ("reasoning", "suggested_name", "description", "business_domain")
+}
+
+# Bump whenever a prompt template changes so cached responses to the old
+# prompts are no longer used
+PROMPT_VERSION = "v1.1"
+
+# Body of the first markdown code fence in a response
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+
+# Static instructions shared by every column prompt
+_COLUMN_PROMPT_HEADER = """You are an expert data analyst creating a world-class data dictionary. 
+Your task is to analyze the provided context for a database column and generate a comprehensive, structured description in JSON format.
+
+### INSTRUCTIONS ###
+Based on the provided context, analyze the target column and generate a JSON output with your reasoning and the final description.
+
+### EXAMPLE ###
+
+"""
+
+# One worked example per column shape; a prompt carries only the example
+# closest to the target column
+_COLUMN_PROMPT_EXAMPLES = {
+    "identifier": """Context:
+- Table: users, Column: user_id
+- Data Type: integer
+- Nullable: No
+- Distinct Values: 1,500,000
+- Null Percentage: 0.0%
+- Sample Values: 101, 102, 103, 104, 105
+
+Output:
+```json
+{
+  "reasoning": "The column is a non-nullable integer with 100% unique values, and its name is 'user_id'. This strongly indicates it is the primary key for the 'users' table, uniquely identifying each user record.",
+  "suggested_name": "User ID",
+  "description": "A unique system-generated identifier for each user in the platform.",
+  "is_pii": false,
+  "business_domain": null,
+  "data_quality_warning": null,
+  "confidence_score": 0.95
+}
+```
+
+""",
+    "datetime": """Context:
+- Table: orders, Column: shipped_at
+- Data Type: timestamp
+- Nullable: Yes
+- Distinct Values: 38,912
+- Null Percentage: 12.4%
+- Sample Values: '2024-03-02 14:21:07', '2024-03-02 16:45:51', '2024-03-03 09:02:33'
+
+Output:
+```json
+{
+  "reasoning": "The column is a nullable timestamp named 'shipped_at' on the orders table. The 12.4% null rate is consistent with orders that have not shipped yet, so nulls carry meaning rather than indicating missing data.",
+  "suggested_name": "Shipped At",
+  "description": "Date and time the order left the warehouse; empty until the order ships.",
+  "is_pii": false,
+  "business_domain": "operations",
+  "data_quality_warning": null,
+  "confidence_score": 0.9
+}
+```
+
+""",
+    "categorical": """Context:
+- Table: orders, Column: status
+- Data Type: varchar
+- Nullable: No
+- Distinct Values: 5
+- Null Percentage: 0.0%
+- Top Values: 'delivered' (61234), 'shipped' (8123), 'processing' (2410), 'cancelled' (1502), 'returned' (733)
+
+Output:
+```json
+{
+  "reasoning": "The column is a low-cardinality varchar whose five values describe stages of order fulfilment, with 'delivered' dominating. It is an enumerated lifecycle status rather than free text.",
+  "suggested_name": "Order Status",
+  "description": "Current fulfilment stage of the order: processing, shipped, delivered, cancelled or returned.",
+  "is_pii": false,
+  "business_domain": "operations",
+  "data_quality_warning": null,
+  "confidence_score": 0.93
+}
+```
+
+""",
+    "text": """Context:
+- Table: orders, Column: customer_email
+- Data Type: varchar
+- Nullable: Yes
+- Distinct Values: 45,230
+- Null Percentage: 2.3%
+- Sample Values: 'john@example.com', 'sarah.smith@company.org', 'mike.jones@email.net'
+
+Output:
+```json
+{
+  "reasoning": "The column contains email addresses based on the sample values and column name. The 2.3% null rate suggests most orders have associated customer emails, but some may be from guest checkouts.",
+  "suggested_name": "Customer Email Address", 
+  "description": "The email address of the customer who placed the order, used for communication and account identification.",
+  "is_pii": true,
+  "business_domain": "customer",
+  "data_quality_warning": "2.3% of records have missing email addresses",
+  "confidence_score": 0.92
+}
+```
+
+""",
+}
+
+_COLUMN_PROMPT_FOOTER = "### TARGET COLUMN CONTEXT ###\n"
+
+# Complete static prefix for each column shape. Sent verbatim ahead of the
+# column context so provider prompt caches can reuse each shape's prefix.
+COLUMN_PROMPT_PREFIXES = {
+    shape: _COLUMN_PROMPT_HEADER + example + _COLUMN_PROMPT_FOOTER
+    for shape, example in _COLUMN_PROMPT_EXAMPLES.items()
+}
+
+# Static prefix for describing many columns of one table in a single call
+TABLE_COLUMNS_PROMPT_PREFIX = _COLUMN_PROMPT_HEADER + _COLUMN_PROMPT_EXAMPLES["text"] + """### BATCH INSTRUCTIONS ###
+The target is a list of columns from one table, separated by lines containing only ---.
+Produce one JSON object like the example output for every column, in the order given, adding a "column_name" field to each.
+Respond with a single JSON object of the form {"results": [...]}.
+
+### TARGET TABLE COLUMNS ###
+"""
+
+# Output tokens allowed per column in a table batch
+TABLE_BATCH_TOKENS_PER_COLUMN = 300
+
+# Text columns with at most this many distinct values are treated as categorical
+CATEGORICAL_MAX_CARDINALITY = 50
+
+_NUMERIC_TYPE_MARKERS = ("int", "serial", "numeric", "decimal", "float", "double", "real", "number", "money")
+
+
+def _column_shape(data_type: str, profile_data: Optional[Dict[str, Any]]) -> str:
+    """Classify a column into one of the COLUMN_PROMPT_PREFIXES shapes."""
+    data_type = data_type.lower()
+    if "date" in data_type or "time" in data_type:
+        return "datetime"
+    if any(marker in data_type for marker in _NUMERIC_TYPE_MARKERS):
+        return "identifier"
+    cardinality = (profile_data or {}).get("cardinality")
+    if "bool" in data_type or (cardinality is not None and cardinality <= CATEGORICAL_MAX_CARDINALITY):
+        return "categorical"
+    return "text"
+
+
+SYSTEM_PROMPT = "You are an expert data analyst. Always respond with valid JSON."
+
+PROGRAM_PROMPT_TEMPLATE = """You are generalizing database column documentation into a reusable template.
+Below are {count} descriptions written for columns that share the same name and data type, each with the inputs it was written for.
+
+### EXAMPLES ###
+
+{examples}
+
+### TASK ###
+Write one JSON object that reproduces these outputs from the inputs alone. String values may reference the inputs as $table_name, $column_name, $data_type and $nullable (write a literal dollar sign as $$). Use this structure:
+```json
+{{
+  "reasoning": "Why this template fits every column with this name and type",
+  "suggested_name": "Business-friendly name, may use placeholders",
+  "description": "Description, may use placeholders",
+  "is_pii": true or false,
+  "business_domain": "Business domain or null",
+  "data_quality_warning": null,
+  "confidence_score": "Confidence that the template holds for new tables, 0.0 to 1.0"
+}}
+```
+"""
+
+
+def _format_top_values(top_values) -> str:
+    return ", ".join([f"'{v[0]}' ({v[1]})" for v in top_values[:5]])
+
+
+# (profile key, label, formatter, keep falsy values) for each profile line
+# of the column context, in the order they appear
+PROFILE_CONTEXT_FIELDS = (
+    ("cardinality", "Distinct Values", "{:,}".format, True),
+    ("null_percentage", "Null Percentage", "{:.1f}%".format, True),
+    ("top_values", "Top Values", _format_top_values, False),
+    ("min_value", "Min Value", str, False),
+    ("max_value", "Max Value", str, False),
+)
+
+
+def _hashable(value):
+    """Convert nested lists to tuples so profile values can key a cache."""
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _column_context(table_name: str, column_name: str, data_type: str, is_nullable: bool,
+                    profile_items: Tuple[Tuple[str, Any], ...], sample_values: Tuple[Any, ...],
+                    table_context: Optional[str]) -> str:
+    """Build the context for a column from hashable inputs."""
+    context_parts = [
+        f"Table: {table_name}",
+        f"Column: {column_name}",
+        f"Data Type: {data_type}",
+        f"Nullable: {'Yes' if is_nullable else 'No'}",
+    ]
+
+    profile = dict(profile_items)
+    for key, label, formatter, keep_falsy in PROFILE_CONTEXT_FIELDS:
+        value = profile.get(key)
+        if value is None or (not keep_falsy and not value):
+            continue
+        context_parts.append(f"{label}: {formatter(value)}")
+
+    if sample_values:
+        context_parts.append("Sample Values: " + ", ".join([f"'{v}'" for v in sample_values]))
+
+    if table_context:
+        context_parts.append(f"Table Context: {table_context}")
+
+    return "\\n".join(context_parts)
+
 
 class LLMProvider(Enum):
     """Supported LLM providers."""
@@ -34,10 +273,30 @@ class GenerationResult:
 class AIService:
     """Service for generating AI descriptions using various LLM providers."""
     
-    def __init__(self, provider: LLMProvider = LLMProvider.OPENAI):
+    def __init__(self, provider: LLMProvider = LLMProvider.OPENAI,
+                 semantic_cache: Optional[SemanticCache] = None,
+                 program_cache: Optional[ProgramCache] = None,
+                 response_cache: Optional[ResponseCache] = None):
         """Initialize AI service with specified provider."""
         self.provider = provider
         
+        # Columns like id/created_at/email produce near-identical contexts
+        # across tables; answer those from earlier results
+        if semantic_cache is None:
+            semantic_cache = SemanticCache(path=os.path.join(CACHE_DIR, "semantic_cache.pkl"))
+        self.semantic_cache = semantic_cache
+        
+        # Keys that keep missing the semantic cache get a template
+        # synthesized from their results so later columns skip the LLM
+        if program_cache is None:
+            program_cache = ProgramCache(directory=os.path.join(CACHE_DIR, "programs"))
+        self.program_cache = program_cache
+        
+        # Re-running over an unchanged schema repeats prompts exactly
+        if response_cache is None:
+            response_cache = ResponseCache(directory=os.path.join(CACHE_DIR, "llm"))
+        self.response_cache = response_cache
+        
         if provider == LLMProvider.OPENAI:
             self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
             self.model = "gpt-4"
@@ -57,19 +316,273 @@ class AIService:
                                   table_context: Optional[str] = None) -> GenerationResult:
         """Generate description for a database column."""
         
-        context = self._build_column_context(
+        context, cache_key, fields = self._prepare_column(
             table_name, column_name, data_type, is_nullable,
             profile_data, sample_values, table_context
         )
         
-        prompt = self._build_column_prompt(context)
+        cached = self._lookup_column(cache_key, context, fields)
+        if cached:
+            return cached
+        
+        prefix, prompt = self._build_column_prompt(context, data_type, profile_data)
         
         if self.provider == LLMProvider.OPENAI:
-            response = self._call_openai(prompt)
+            response = self._call_openai(prompt, prefix=prefix, validate=self._check_response)
         else:
-            response = self._call_anthropic(prompt)
+            response = self._call_anthropic(prompt, prefix=prefix, validate=self._check_response)
         
-        return self._parse_response(response, self.model)
+        return self._store_column(cache_key, context, fields, response)
+    
+    def generate_column_description_stream(self,
+                                           table_name: str,
+                                           column_name: str,
+                                           data_type: str,
+                                           is_nullable: bool,
+                                           profile_data: Dict[str, Any],
+                                           sample_values: List[Any],
+                                           table_context: Optional[str] = None) -> Iterator[GenerationResult]:
+        """
+        Generate description for a database column, streaming the LLM response.
+        
+        Yields partial results (confidence 0.0) whenever a text field grows,
+        so interactive callers can render output before the response is
+        complete. The last result yielded is the final one, as returned by
+        generate_column_description.
+        """
+        context, cache_key, fields = self._prepare_column(
+            table_name, column_name, data_type, is_nullable,
+            profile_data, sample_values, table_context
+        )
+        
+        cached = self._lookup_column(cache_key, context, fields)
+        if cached:
+            yield cached
+            return
+        
+        prefix, prompt = self._build_column_prompt(context, data_type, profile_data)
+        key = self._response_key(prompt, prefix)
+        response = self.response_cache.get(key)
+        
+        if response is None:
+            if self.provider == LLMProvider.OPENAI:
+                chunks = self._stream_openai(prompt, prefix)
+            else:
+                chunks = self._stream_anthropic(prompt, prefix)
+            
+            parts = []
+            last_partial = None
+            for chunk in chunks:
+                parts.append(chunk)
+                partial = self._parse_partial_response("".join(parts))
+                if partial is not None and partial != last_partial:
+                    last_partial = partial
+                    yield partial
+            
+            response = "".join(parts)
+            self._cache_response(key, response, self._check_response)
+        
+        yield self._store_column(cache_key, context, fields, response)
+    
+    def generate_column_descriptions_for_table(self, table_name: str, items: List[Dict[str, Any]],
+                                               batch_size: int = 25) -> List[Union[GenerationResult, Exception]]:
+        """
+        Generate descriptions for columns of one table, batch_size columns per LLM call.
+        
+        Items are as for generate_column_descriptions and results come back
+        in the same order. The columns of a batch share one prompt prefix and
+        one call; any column missing from a batch response, or in a batch
+        whose response can't be parsed, falls back to its own call.
+        """
+        results: List[Optional[Union[GenerationResult, Exception]]] = [None] * len(items)
+        pending = []
+        for i, item in enumerate(items):
+            context, cache_key, fields = self._prepare_column(**item)
+            cached = self._lookup_column(cache_key, context, fields)
+            if cached:
+                results[i] = cached
+            else:
+                pending.append((i, context, cache_key, fields))
+        
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            prompt = self._build_table_columns_prompt(table_name, [context for _, context, _, _ in batch])
+            max_tokens = min(TABLE_BATCH_TOKENS_PER_COLUMN * len(batch), 4096)
+            column_names = [fields["column_name"] for _, _, _, fields in batch]
+            
+            def check_batch(response: str) -> None:
+                # Only a response that answers every column is worth replaying
+                for data in self._parse_batch_response(response, column_names):
+                    self._result_from_data(data, self.model)
+            
+            try:
+                if self.provider == LLMProvider.OPENAI:
+                    response = self._call_openai(prompt, prefix=TABLE_COLUMNS_PROMPT_PREFIX,
+                                                 max_tokens=max_tokens, validate=check_batch)
+                else:
+                    response = self._call_anthropic(prompt, prefix=TABLE_COLUMNS_PROMPT_PREFIX,
+                                                    max_tokens=max_tokens, validate=check_batch)
+                batch_data = self._parse_batch_response(response, column_names)
+            except Exception as e:
+                logger.warning(f"Batched generation failed for {len(batch)} columns of {table_name}: {e}")
+                continue
+            
+            for (i, context, cache_key, fields), data in zip(batch, batch_data):
+                if data is None:
+                    continue
+                try:
+                    result = self._result_from_data(data, self.model)
+                except (TypeError, ValueError) as e:
+                    # e.g. a non-numeric confidence_score; the column is generated on its own below
+                    logger.warning(f"Unusable batch result for {table_name}.{fields['column_name']}: {e}")
+                    continue
+                results[i] = self._remember_column(cache_key, context, fields, result)
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            logger.info(f"Generating {len(missing)} columns of {table_name} individually")
+            for i, result in zip(missing, self.generate_column_descriptions([items[i] for i in missing])):
+                results[i] = result
+        
+        return results
+    
+    def generate_column_descriptions(self, items: List[Dict[str, Any]],
+                                     concurrency: int = 16) -> List[Union[GenerationResult, Exception]]:
+        """Generate descriptions for many columns, overlapping the LLM calls."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.generate_column_descriptions_batch(items, concurrency))
+        
+        # Called from inside an event loop; run the batch on its own loop
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(
+                asyncio.run, self.generate_column_descriptions_batch(items, concurrency)
+            ).result()
+    
+    async def generate_column_descriptions_batch(self, items: List[Dict[str, Any]],
+                                                 concurrency: int = 16) -> List[Union[GenerationResult, Exception]]:
+        """
+        Generate descriptions for many columns concurrently.
+        
+        Each item holds the keyword arguments of generate_column_description.
+        Results are returned in the order of the items; an item whose LLM
+        call still fails after retries is returned as its exception.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        # Async clients hold connections bound to the running event loop,
+        # so each batch gets its own
+        if self.provider == LLMProvider.OPENAI:
+            aclient = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        else:
+            aclient = anthropic.AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        
+        async def generate(item: Dict[str, Any]) -> GenerationResult:
+            context, cache_key, fields = self._prepare_column(**item)
+            cached = self._lookup_column(cache_key, context, fields)
+            if cached:
+                return cached
+            
+            prefix, prompt = self._build_column_prompt(context, item["data_type"], item.get("profile_data"))
+            async with semaphore:
+                response = await self._acall_with_retry(aclient, prompt, prefix=prefix,
+                                                        validate=self._check_response)
+            
+            # Storing may synthesize a template with a blocking LLM call
+            return await asyncio.to_thread(self._store_column, cache_key, context, fields, response)
+        
+        async with aclient:
+            return await asyncio.gather(*[generate(item) for item in items], return_exceptions=True)
+    
+    def _prepare_column(self, table_name: str, column_name: str, data_type: str,
+                        is_nullable: bool, profile_data: Dict[str, Any],
+                        sample_values: List[Any],
+                        table_context: Optional[str] = None) -> Tuple[str, str, Dict[str, str]]:
+        """Build the context, cache key and template fields for a column."""
+        context = self._build_column_context(
+            table_name, column_name, data_type, is_nullable,
+            profile_data, sample_values, table_context
+        )
+        cache_key = f"{self.model}:{column_name.lower()}:{data_type.lower()}"
+        fields = {
+            "table_name": table_name,
+            "column_name": column_name,
+            "data_type": data_type,
+            "nullable": "Yes" if is_nullable else "No",
+        }
+        return context, cache_key, fields
+    
+    def _lookup_column(self, cache_key: str, context: str,
+                       fields: Dict[str, str]) -> Optional[GenerationResult]:
+        """Answer a column from the semantic cache or a synthesized template."""
+        target = f"{fields['table_name']}.{fields['column_name']}"
+        
+        cached = self.semantic_cache.lookup(cache_key, context)
+        if cached:
+            logger.info(f"Semantic cache hit for {target}")
+            return GenerationResult(**cached)
+        
+        templated = self.program_cache.run(cache_key, fields)
+        if templated:
+            logger.info(f"Synthesized template hit for {target}")
+            return GenerationResult(model_used=f"{self.model}+template", **templated)
+        
+        return None
+    
+    def _store_column(self, cache_key: str, context: str, fields: Dict[str, str],
+                      response: str) -> GenerationResult:
+        """Parse an LLM response for a column and feed it to the caches."""
+        return self._remember_column(cache_key, context, fields, self._parse_response(response, self.model))
+    
+    def _remember_column(self, cache_key: str, context: str, fields: Dict[str, str],
+                         result: GenerationResult) -> GenerationResult:
+        """Feed a generated column result to the caches."""
+        # Don't cache the fallback returned for unparseable responses
+        if result.confidence_score > 0:
+            self.semantic_cache.add(cache_key, context, asdict(result))
+            examples = self.program_cache.record(cache_key, fields, asdict(result))
+            if examples:
+                self._synthesize_program(cache_key, examples)
+        
+        return result
+    
+    def _synthesize_program(self, cache_key: str,
+                            examples: List[Tuple[Dict[str, str], Dict[str, Any]]]) -> bool:
+        """Ask the LLM for a template reproducing a key's results and install it if it validates."""
+        example_parts = []
+        for i, (fields, result) in enumerate(examples, 1):
+            output = {
+                "suggested_name": result.get("suggested_name"),
+                "description": result.get("description"),
+                "is_pii": result.get("suggested_is_pii"),
+                "business_domain": result.get("suggested_business_domain"),
+                "data_quality_warning": result.get("data_quality_warning"),
+            }
+            example_parts.append(f"Example {i}:\nInputs: {json.dumps(fields)}\nOutput: {json.dumps(output)}")
+        
+        prompt = PROGRAM_PROMPT_TEMPLATE.format(
+            count=len(examples),
+            examples="\n\n".join(example_parts)
+        )
+        
+        def check_program(response: str) -> None:
+            if not isinstance(orjson.loads(self._strip_markdown(response)), dict):
+                raise ValueError("template is not a JSON object")
+        
+        try:
+            if self.provider == LLMProvider.OPENAI:
+                response = self._call_openai(prompt, validate=check_program)
+            else:
+                response = self._call_anthropic(prompt, validate=check_program)
+            program = orjson.loads(self._strip_markdown(response))
+        except Exception as e:
+            logger.warning(f"Template synthesis failed for {cache_key}: {e}")
+            return False
+        
+        if not isinstance(program, dict):
+            return False
+        return self.program_cache.install(cache_key, program, examples)
     
     def generate_table_description(self,
                                  schema_name: str,
@@ -82,9 +595,9 @@ class AIService:
         prompt = self._build_table_prompt(context)
         
         if self.provider == LLMProvider.OPENAI:
-            response = self._call_openai(prompt)
+            response = self._call_openai(prompt, validate=self._check_response)
         else:
-            response = self._call_anthropic(prompt)
+            response = self._call_anthropic(prompt, validate=self._check_response)
         
         return self._parse_response(response, self.model)
     
@@ -94,38 +607,18 @@ class AIService:
                             sample_values: List[Any],
                             table_context: Optional[str]) -> str:
         """Build context for column description generation."""
-        
-        context_parts = [
-            f"Table: {table_name}",
-            f"Column: {column_name}",
-            f"Data Type: {data_type}",
-            f"Nullable: {'Yes' if is_nullable else 'No'}",
-        ]
-        
-        # Add profiling data
-        if profile_data:
-            if 'cardinality' in profile_data and profile_data['cardinality'] is not None:
-                context_parts.append(f"Distinct Values: {profile_data['cardinality']:,}")
-            if 'null_percentage' in profile_data and profile_data['null_percentage'] is not None:
-                context_parts.append(f"Null Percentage: {profile_data['null_percentage']:.1f}%")
-            if 'top_values' in profile_data and profile_data['top_values']:
-                top_vals = ", ".join([f"'{v[0]}' ({v[1]})" for v in profile_data['top_values'][:5]])
-                context_parts.append(f"Top Values: {top_vals}")
-            if 'min_value' in profile_data and profile_data['min_value']:
-                context_parts.append(f"Min Value: {profile_data['min_value']}")
-            if 'max_value' in profile_data and profile_data['max_value']:
-                context_parts.append(f"Max Value: {profile_data['max_value']}")
-        
-        # Add sample values
-        if sample_values:
-            sample_str = ", ".join([f"'{v}'" for v in sample_values[:10]])
-            context_parts.append(f"Sample Values: {sample_str}")
-        
-        # Add table context if available
-        if table_context:
-            context_parts.append(f"Table Context: {table_context}")
-        
-        return "\\n".join(context_parts)
+        profile_items = tuple(
+            (key, _hashable(profile_data[key]))
+            for key, _, _, _ in PROFILE_CONTEXT_FIELDS
+            if profile_data and key in profile_data
+        )
+        args = (table_name, column_name, data_type, is_nullable, profile_items,
+                tuple(sample_values[:10]) if sample_values else (), table_context)
+        try:
+            return _column_context(*args)
+        except TypeError:
+            # Unhashable sample values (e.g. JSON objects) skip the memo
+            return _column_context.__wrapped__(*args)
     
     def _build_table_context(self, schema_name: str, table_name: str,
                            columns: List[Dict[str, Any]], row_count: Optional[int]) -> str:
@@ -152,66 +645,27 @@ class AIService:
         
         return "\\n".join(context_parts)
     
-    def _build_column_prompt(self, context: str) -> str:
-        """Build prompt for column description generation."""
+    def _build_column_prompt(self, context: str, data_type: str,
+                             profile_data: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        """Get the static prefix for the column's shape and the column-specific tail that follows it."""
+        prefix = COLUMN_PROMPT_PREFIXES[_column_shape(data_type, profile_data)]
         
-        return f"""You are an expert data analyst creating a world-class data dictionary. 
-Your task is to analyze the provided context for a database column and generate a comprehensive, structured description in JSON format.
-
-### INSTRUCTIONS ###
-Based on the provided context, analyze the target column and generate a JSON output with your reasoning and the final description.
+        return prefix, f"""{context}
 
-### EXAMPLES ###
-
-Example 1:
-Context:
-- Table: users, Column: user_id
-- Data Type: integer
-- Nullable: No
-- Distinct Values: 1,500,000
-- Null Percentage: 0.0%
-- Sample Values: 101, 102, 103, 104, 105
-
-Output:
-```json
-{{
-  "reasoning": "The column is a non-nullable integer with 100% unique values, and its name is 'user_id'. This strongly indicates it is the primary key for the 'users' table, uniquely identifying each user record.",
-  "suggested_name": "User ID",
-  "description": "A unique system-generated identifier for each user in the platform.",
-  "is_pii": false,
-  "business_domain": null,
-  "data_quality_warning": null,
-  "confidence_score": 0.95
-}}
-```
-
-Example 2:
-Context:
-- Table: orders, Column: customer_email
-- Data Type: varchar
-- Nullable: Yes
-- Distinct Values: 45,230
-- Null Percentage: 2.3%
-- Sample Values: 'john@example.com', 'sarah.smith@company.org', 'mike.jones@email.net'
+### TASK ###
+Generate the JSON output for the target column. Ensure your response is valid JSON and includes all required fields.
+"""
 
-Output:
-```json
-{{
-  "reasoning": "The column contains email addresses based on the sample values and column name. The 2.3% null rate suggests most orders have associated customer emails, but some may be from guest checkouts.",
-  "suggested_name": "Customer Email Address", 
-  "description": "The email address of the customer who placed the order, used for communication and account identification.",
-  "is_pii": true,
-  "business_domain": "customer",
-  "data_quality_warning": "2.3% of records have missing email addresses",
-  "confidence_score": 0.92
-}}
-```
+    def _build_table_columns_prompt(self, table_name: str, contexts: List[str]) -> str:
+        """Build the tail that follows TABLE_COLUMNS_PROMPT_PREFIX for a batch of columns."""
+        columns = "\n---\n".join(contexts)
+        
+        return f"""Table: {table_name}
 
-### TARGET COLUMN CONTEXT ###
-{context}
+{columns}
 
 ### TASK ###
-Generate the JSON output for the target column. Ensure your response is valid JSON and includes all required fields.
+Generate the JSON output for all {len(contexts)} target columns. Ensure your response is valid JSON and includes all required fields.
 """
 
     def _build_table_prompt(self, context: str) -> str:
@@ -239,63 +693,246 @@ Generate a JSON response with the following structure:
 Focus on the business purpose and what real-world entities or events this table represents.
 """
 
-    def _call_openai(self, prompt: str) -> str:
-        """Call OpenAI API."""
+    def _openai_messages(self, prompt: str, prefix: Optional[str]) -> List[Dict[str, Any]]:
+        """Build OpenAI messages, keeping any static prefix ahead of the prompt."""
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if prefix:
+            # OpenAI caches the longest repeated prompt prefix automatically
+            messages.append({"role": "system", "content": prefix})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def _anthropic_messages(self, prompt: str, prefix: Optional[str]) -> List[Dict[str, Any]]:
+        """Build Anthropic messages, marking any static prefix as cacheable."""
+        if not prefix:
+            return [{"role": "user", "content": prompt}]
+        return [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": prompt}
+            ]
+        }]
+    
+    def _response_key(self, prompt: str, prefix: Optional[str]) -> str:
+        """Get the response cache key for a request to the current model."""
+        return ResponseCache.key(self.model, PROMPT_VERSION, prefix or "", prompt)
+    
+    def _cache_response(self, key: str, response: str,
+                        validate: Optional[Callable[[str], Any]]) -> None:
+        """
+        Store a response for reuse if it passes validation.
+        
+        validate parses the response the way its caller will and raises if
+        it can't; a response that fails it (or has no validator) is not
+        stored, so the next run asks the LLM again instead of replaying it.
+        """
+        if validate is None:
+            return
+        try:
+            validate(response)
+        except Exception as e:
+            logger.warning(f"Not caching unusable LLM response: {e}")
+            return
+        self.response_cache.set(key, response)
+    
+    def _call_openai(self, prompt: str, prefix: Optional[str] = None, max_tokens: int = 1000,
+                     validate: Optional[Callable[[str], Any]] = None) -> str:
+        """Call OpenAI API, caching the response if it passes validate."""
+        key = self._response_key(prompt, prefix)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert data analyst. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._openai_messages(prompt, prefix),
                 temperature=0.1,
-                max_tokens=1000
+                max_tokens=max_tokens
             )
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            self._cache_response(key, content, validate)
+            return content
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
             raise
     
-    def _call_anthropic(self, prompt: str) -> str:
-        """Call Anthropic API."""
+    async def _acall_with_retry(self, aclient, prompt: str, prefix: Optional[str] = None,
+                                max_attempts: int = 5,
+                                validate: Optional[Callable[[str], Any]] = None) -> str:
+        """Call the LLM asynchronously, backing off exponentially on failures such as 429s."""
+        key = self._response_key(prompt, prefix)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        for attempt in range(1, max_attempts + 1):
+            try:
+                if self.provider == LLMProvider.OPENAI:
+                    response = await self._acall_openai(aclient, prompt, prefix)
+                else:
+                    response = await self._acall_anthropic(aclient, prompt, prefix)
+                self._cache_response(key, response, validate)
+                return response
+            except Exception as e:
+                if attempt == max_attempts:
+                    raise
+                delay = min(2 ** attempt, 30)
+                logger.warning(f"LLM call failed (attempt {attempt}/{max_attempts}), retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+    
+    async def _acall_openai(self, aclient: openai.AsyncOpenAI, prompt: str,
+                            prefix: Optional[str] = None) -> str:
+        """Call OpenAI API asynchronously."""
+        response = await aclient.chat.completions.create(
+            model=self.model,
+            messages=self._openai_messages(prompt, prefix),
+            temperature=0.1,
+            max_tokens=1000
+        )
+        return response.choices[0].message.content
+    
+    async def _acall_anthropic(self, aclient: anthropic.AsyncAnthropic, prompt: str,
+                               prefix: Optional[str] = None) -> str:
+        """Call Anthropic API asynchronously."""
+        response = await aclient.messages.create(
+            model=self.model,
+            max_tokens=1000,
+            temperature=0.1,
+            system=SYSTEM_PROMPT,
+            messages=self._anthropic_messages(prompt, prefix)
+        )
+        return response.content[0].text
+    
+    def _call_anthropic(self, prompt: str, prefix: Optional[str] = None, max_tokens: int = 1000,
+                        validate: Optional[Callable[[str], Any]] = None) -> str:
+        """Call Anthropic API, caching the response if it passes validate."""
+        key = self._response_key(prompt, prefix)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             response = self.client.messages.create(
                 model=self.model,
-                max_tokens=1000,
+                max_tokens=max_tokens,
                 temperature=0.1,
-                system="You are an expert data analyst. Always respond with valid JSON.",
-                messages=[{"role": "user", "content": prompt}]
+                system=SYSTEM_PROMPT,
+                messages=self._anthropic_messages(prompt, prefix)
             )
-            return response.content[0].text
+            content = response.content[0].text
+            self._cache_response(key, content, validate)
+            return content
         except Exception as e:
             logger.error(f"Anthropic API call failed: {e}")
             raise
     
+    def _stream_openai(self, prompt: str, prefix: Optional[str] = None) -> Iterator[str]:
+        """Call OpenAI API, yielding the response text as it arrives."""
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._openai_messages(prompt, prefix),
+                temperature=0.1,
+                max_tokens=1000,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"OpenAI API call failed: {e}")
+            raise
+    
+    def _stream_anthropic(self, prompt: str, prefix: Optional[str] = None) -> Iterator[str]:
+        """Call Anthropic API, yielding the response text as it arrives."""
+        try:
+            with self.client.messages.stream(
+                model=self.model,
+                max_tokens=1000,
+                temperature=0.1,
+                system=SYSTEM_PROMPT,
+                messages=self._anthropic_messages(prompt, prefix)
+            ) as stream:
+                yield from stream.text_stream
+        except Exception as e:
+            logger.error(f"Anthropic API call failed: {e}")
+            raise
+    
+    def _strip_markdown(self, response: str) -> str:
+        """Extract JSON from a response if it's wrapped in markdown."""
+        match = _FENCE_RE.search(response)
+        return match.group(1).strip() if match else response
+    
+    def _parse_partial_response(self, response: str) -> Optional[GenerationResult]:
+        """Build a partial result from the text fields of an incomplete response."""
+        values = {}
+        for name, pattern in _PARTIAL_FIELD_RES.items():
+            match = pattern.search(response)
+            if match:
+                # Drop a dangling escape so the fragment decodes
+                fragment = match.group(1)
+                if (len(fragment) - len(fragment.rstrip("\\"))) % 2:
+                    fragment = fragment[:-1]
+                try:
+                    values[name] = orjson.loads(f'"{fragment}"')
+                except orjson.JSONDecodeError:
+                    values[name] = fragment
+        
+        if "description" not in values:
+            return None
+        
+        return GenerationResult(
+            description=values["description"],
+            suggested_name=values.get("suggested_name"),
+            confidence_score=0.0,
+            reasoning=values.get("reasoning", ""),
+            suggested_is_pii=False,
+            suggested_business_domain=values.get("business_domain"),
+            data_quality_warning=None,
+            model_used=self.model
+        )
+    
+    def _result_from_data(self, data: Dict[str, Any], model_used: str) -> GenerationResult:
+        """Build a GenerationResult from a parsed response object."""
+        return GenerationResult(
+            description=data.get("description", ""),
+            suggested_name=data.get("suggested_name"),
+            confidence_score=float(data.get("confidence_score", 0.5)),
+            reasoning=data.get("reasoning", ""),
+            suggested_is_pii=data.get("is_pii", False),
+            suggested_business_domain=data.get("business_domain"),
+            data_quality_warning=data.get("data_quality_warning"),
+            model_used=model_used
+        )
+    
+    def _check_response(self, response: str) -> GenerationResult:
+        """Parse a single-object response, raising where _parse_response would fall back."""
+        return self._result_from_data(orjson.loads(self._strip_markdown(response)), self.model)
+    
+    def _parse_batch_response(self, response: str, column_names: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Parse a table batch response into one object per column, None where missing.
+        
+        Objects are matched to columns by their column_name, or by position
+        when the response names none of them.
+        """
+        results = orjson.loads(self._strip_markdown(response))["results"]
+        objects = [data for data in results if isinstance(data, dict)]
+        
+        by_name = {str(data["column_name"]).lower(): data for data in objects if data.get("column_name")}
+        if by_name:
+            return [by_name.get(name.lower()) for name in column_names]
+        if len(objects) == len(column_names):
+            return objects
+        return [None] * len(column_names)
+    
     def _parse_response(self, response: str, model_used: str) -> GenerationResult:
         """Parse LLM response into GenerationResult."""
         try:
-            # Extract JSON from response if it's wrapped in markdown
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                response = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                response = response[start:end].strip()
-            
-            data = json.loads(response)
-            
-            return GenerationResult(
-                description=data.get("description", ""),
-                suggested_name=data.get("suggested_name"),
-                confidence_score=float(data.get("confidence_score", 0.5)),
-                reasoning=data.get("reasoning", ""),
-                suggested_is_pii=data.get("is_pii", False),
-                suggested_business_domain=data.get("business_domain"),
-                data_quality_warning=data.get("data_quality_warning"),
-                model_used=model_used
-            )
+            response = self._strip_markdown(response)
+            return self._result_from_data(orjson.loads(response), model_used)
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             logger.error(f"Failed to parse LLM response: {e}")
             logger.error(f"Response was: {response}")
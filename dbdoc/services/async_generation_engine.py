@@ -2,9 +2,11 @@
 
 import asyncio
 import logging
+import threading
 import time
 from typing import List, Dict, Any, Optional, Callable, Set
-from dataclasses import dataclass, field
+from contextlib import nullcontext
+from dataclasses import astuple, dataclass, field
 from enum import Enum
 from sqlalchemy.orm import Session
 from concurrent.futures import ThreadPoolExecutor
@@ -68,9 +70,12 @@ class AsyncGenerationEngine:
         max_concurrent: int = 5,
         rate_limit_rpm: int = 60,
         max_retries: int = 3,
-        cache_enabled: bool = True
+        cache_enabled: bool = True,
+        write_lock: Optional[threading.Lock] = None
     ):
         self.db = db_session
+        # Held around each commit when the session is shared with other writers
+        self.write_lock = write_lock
         self.ai_service = ai_service
         self.context_builder = context_builder
         self.max_concurrent = max_concurrent
@@ -160,7 +165,7 @@ class AsyncGenerationEngine:
             }
         }
         
-        hash_str = json.dumps(hash_data, sort_keys=True)
+        hash_str = json.dumps(hash_data, sort_keys=True, default=astuple)  # ColumnSummary
         return hashlib.md5(hash_str.encode()).hexdigest()
     
     async def _rate_limit(self):
@@ -439,8 +444,9 @@ class AsyncGenerationEngine:
                 prompt_version="enhanced_v1.0"
             )
         
-        self.db.add(description)
-        self.db.commit()
+        with self.write_lock or nullcontext():
+            self.db.add(description)
+            self.db.commit()
     
     def _update_progress(self, current_task: Optional[str] = None):
         """Update and emit progress information."""
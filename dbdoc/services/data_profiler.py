@@ -7,6 +7,13 @@ from sqlalchemy import text
 from sqlalchemy.engine import Engine
 from dataclasses import dataclass
 import json
+import math
+import numpy as np
+
+try:
+    import hyperscan
+except ImportError:  # Optional; pattern analysis falls back to re
+    hyperscan = None
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +35,26 @@ class ColumnProfile:
 class DataProfiler:
     """Profiles database columns to understand data patterns and quality."""
     
-    def __init__(self, engine: Engine, database_type: str = "postgresql"):
-        """Initialize with database engine."""
+    # Each column adds 15 expressions to the PostgreSQL stats scan, whose
+    # select list is capped at 1664 entries
+    COLUMNS_PER_QUERY = 100
+    
+    def __init__(self, engine: Engine, database_type: str = "postgresql",
+                 pattern_sample_size: int = 1000, context_sample_size: int = 20):
+        """
+        Initialize with database engine.
+        
+        pattern_sample_size is roughly how many rows the database matches
+        against the classification patterns; context_sample_size is how many
+        sampled rows are fetched for prompt context and shape checks.
+        """
         self.engine = engine
         self.database_type = database_type
+        self.pattern_sample_size = pattern_sample_size
+        self.context_sample_size = context_sample_size
+        
+        # Whether each (schema, table) supports TABLESAMPLE; looked up once
+        self._sampleable: Dict[Tuple[str, str], bool] = {}
         
         # Common patterns for classification
         self.patterns = {
@@ -44,130 +67,465 @@ class DataProfiler:
             'ssn': re.compile(r'^\d{3}-?\d{2}-?\d{4}$'),
             'date_string': re.compile(r'^\d{4}-\d{2}-\d{2}'),
         }
+        
+        # PostgreSQL counts pattern matches in its stats scan; other databases
+        # have no regex operator, so the patterns are matched against a
+        # fetched sample here. Without hyperscan, combined regexes built by
+        # _combined_pattern test a value against several patterns in one
+        # match call
+        self._combined: Dict[int, re.Pattern] = {}
+        
+        # With hyperscan, all patterns compile into one database that
+        # classifies a value against every pattern in a single scan;
+        # compiled on first use since PostgreSQL sources never need it
+        self._hs_db = None
+        self._hs_compiled = False
+    
+    def _hyperscan_db(self):
+        """Get the hyperscan database of all patterns, or None if unavailable."""
+        if not self._hs_compiled:
+            self._hs_compiled = True
+            if hyperscan is not None:
+                try:
+                    self._hs_db = hyperscan.Database()
+                    self._hs_db.compile(
+                        expressions=[pattern.pattern.encode() for pattern in self.patterns.values()],
+                        ids=list(range(len(self.patterns))),
+                        elements=len(self.patterns),
+                        flags=[
+                            hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH
+                            | (hyperscan.HS_FLAG_CASELESS if pattern.flags & re.IGNORECASE else 0)
+                            for pattern in self.patterns.values()
+                        ]
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to compile hyperscan patterns, using re: {e}")
+                    self._hs_db = None
+        return self._hs_db
     
     def profile_column(self, schema_name: str, table_name: str, 
-                      column_name: str, sample_size: int = 1000) -> ColumnProfile:
+                      column_name: str, sample_size: Optional[int] = None) -> ColumnProfile:
         """Profile a single column."""
-        logger.info(f"Profiling column {schema_name}.{table_name}.{column_name}")
+        return self._profile_columns(schema_name, table_name, [column_name], sample_size)[column_name]
+    
+    def profile_table(self, schema_name: str, table_name: str,
+                      column_names: List[str], sample_size: Optional[int] = None) -> Dict[str, ColumnProfile]:
+        """
+        Profile all given columns of a table together.
         
-        # Get basic statistics
-        stats_query = text(f'''
-            WITH column_stats AS (
-                SELECT 
-                    COUNT(*) as total_rows,
-                    COUNT("{column_name}") as non_null_rows,
-                    COUNT(DISTINCT "{column_name}") as distinct_values,
-                    MIN("{column_name}"::text) as min_val,
-                    MAX("{column_name}"::text) as max_val
-                FROM "{schema_name}"."{table_name}"
-            ),
-            numeric_stats AS (
-                SELECT 
-                    AVG(CASE WHEN "{column_name}"::text ~ '^-?\\d+(\\.\\d+)?$' 
-                        THEN "{column_name}"::text::numeric ELSE NULL END) as avg_val,
-                    STDDEV(CASE WHEN "{column_name}"::text ~ '^-?\\d+(\\.\\d+)?$' 
-                        THEN "{column_name}"::text::numeric ELSE NULL END) as std_val
-                FROM "{schema_name}"."{table_name}"
-                WHERE "{column_name}" IS NOT NULL
-            )
-            SELECT 
-                total_rows,
-                non_null_rows,
-                distinct_values,
-                min_val,
-                max_val,
-                avg_val,
-                std_val,
-                CASE WHEN total_rows = 0 THEN 0 
-                     ELSE ROUND((total_rows - non_null_rows)::numeric / total_rows * 100, 2) 
-                END as null_percentage
-            FROM column_stats, numeric_stats
-        ''')
+        Columns are profiled COLUMNS_PER_QUERY at a time. If a group's
+        queries fail (e.g. on one unprofileable column), its columns are
+        profiled individually, and any column that still fails is left out
+        of the result.
+        """
+        logger.info(f"Profiling {len(column_names)} columns of {schema_name}.{table_name}")
         
-        with self.engine.connect() as conn:
-            result = conn.execute(stats_query)
-            stats = result.fetchone()
+        profiles = {}
+        for start in range(0, len(column_names), self.COLUMNS_PER_QUERY):
+            group = column_names[start:start + self.COLUMNS_PER_QUERY]
+            try:
+                profiles.update(self._profile_columns(schema_name, table_name, group, sample_size))
+                continue
+            except Exception as e:
+                logger.warning(f"Batch profiling failed for {schema_name}.{table_name}, profiling columns individually: {e}")
             
-            if not stats or stats.total_rows == 0:
-                return ColumnProfile(
-                    cardinality=0,
-                    null_percentage=100.0,
-                    top_values=[],
-                    min_value=None,
-                    max_value=None,
-                    avg_value=None,
-                    std_dev=None,
-                    sample_values=[],
-                    pattern_analysis={}
-                )
-            
-            # Get top values
-            top_values_query = text(f'''
-                SELECT "{column_name}", COUNT(*) as freq
-                FROM "{schema_name}"."{table_name}"
-                WHERE "{column_name}" IS NOT NULL
-                GROUP BY "{column_name}"
+            for column_name in group:
+                try:
+                    profiles[column_name] = self.profile_column(schema_name, table_name, column_name, sample_size)
+                except Exception as e:
+                    logger.warning(f"Failed to profile column {column_name}: {e}")
+        
+        return profiles
+    
+    def _profile_columns(self, schema_name: str, table_name: str,
+                         column_names: List[str], sample_size: Optional[int] = None) -> Dict[str, ColumnProfile]:
+        """
+        Profile a group of columns of a table with one batch of queries.
+        
+        Statistics for every column come from one aggregate scan, top values
+        from one UNION ALL query, and samples from one row sample that is
+        fanned out per column, so a group costs three queries regardless of
+        its width. On PostgreSQL, pattern matches are counted by the
+        aggregate scan over a random subset of rows, so the fetched sample is
+        only needed for context and the cheap shape checks; elsewhere about
+        sample_size rows are fetched and matched here.
+        """
+        sample_size = sample_size or self.pattern_sample_size
+        postgres = self.database_type == "postgresql"
+        table_ref = f'{self._quote(schema_name)}.{self._quote(table_name)}'
+        quoted = [self._quote(name) for name in column_names]
+        
+        if postgres:
+            stats_query, stats_params = self._postgres_stats_query(table_ref, quoted, sample_size)
+        else:
+            stats_query, stats_params = self._portable_stats_query(table_ref, quoted)
+        
+        # Get top values for every column in one round trip
+        top_values_query = text(" UNION ALL ".join(
+            f'''SELECT * FROM (
+                SELECT {i} AS column_index, CAST({col} AS TEXT) AS value, COUNT(*) AS freq
+                FROM {table_ref}
+                WHERE {col} IS NOT NULL
+                GROUP BY {col}
                 ORDER BY freq DESC
                 LIMIT 10
-            ''')
+            ) AS top_{i}'''
+            for i, col in enumerate(quoted)
+        ))
+        
+        with self.engine.connect() as conn:
+            stats = conn.execute(stats_query, stats_params).mappings().fetchone()
             
-            top_values_result = conn.execute(top_values_query)
-            top_values = [(row[0], row[1]) for row in top_values_result]
+            if not stats or stats["total_rows"] == 0:
+                return {name: self._empty_profile() for name in column_names}
             
-            # Get sample values for pattern analysis
-            sample_query = text(f'''
-                SELECT "{column_name}"
-                FROM "{schema_name}"."{table_name}"
-                WHERE "{column_name}" IS NOT NULL
-                ORDER BY RANDOM()
-                LIMIT :sample_size
-            ''')
+            top_values: Dict[int, List[Tuple[Any, int]]] = {i: [] for i in range(len(column_names))}
+            for row in conn.execute(top_values_query):
+                top_values[row.column_index].append((row.value, row.freq))
+            
+            # Sample rows once and split them into per-column samples
+            limit = self.context_sample_size if postgres else sample_size
+            sample_query, params = self._sample_query(
+                conn, schema_name, table_name, quoted, stats["total_rows"], sample_size, limit
+            )
+            sample_rows = conn.execute(sample_query, params).fetchall()
+            samples = [[row[i] for row in sample_rows if row[i] is not None] for i in range(len(quoted))]
             
-            sample_result = conn.execute(sample_query, {"sample_size": sample_size})
-            sample_values = [row[0] for row in sample_result]
+            # Mostly-null columns have few values in the shared sample; give
+            # those that have more non-null rows their own non-null sample
+            for i, col in enumerate(quoted):
+                if len(samples[i]) < min(self.context_sample_size, stats[f"non_null_{i}"]):
+                    samples[i] = [row[0] for row in conn.execute(text(f'''
+                        SELECT {col}
+                        FROM {table_ref}
+                        WHERE {col} IS NOT NULL
+                        ORDER BY RANDOM()
+                        LIMIT :limit
+                    '''), {"limit": limit})]
+        
+        total_rows = stats["total_rows"]
+        profiles = {}
+        for i, name in enumerate(column_names):
+            non_null_rows = stats[f"non_null_{i}"]
+            values = samples[i]
             
-            # Analyze patterns
-            pattern_analysis = self._analyze_patterns(sample_values)
+            if postgres:
+                avg_val, std_val = stats[f"avg_{i}"], stats[f"std_{i}"]
+                pattern_counts = {
+                    pattern_name: (stats[f"pattern_{i}_{j}"], stats[f"checked_{i}"])
+                    for j, pattern_name in enumerate(self.patterns)
+                }
+            else:
+                avg_val, std_val = self._moments(
+                    stats[f"numeric_count_{i}"], stats[f"numeric_sum_{i}"], stats[f"numeric_sumsq_{i}"]
+                )
+                pattern_counts = None
             
-            return ColumnProfile(
-                cardinality=stats.distinct_values,
-                null_percentage=float(stats.null_percentage),
-                top_values=top_values,
-                min_value=stats.min_val,
-                max_value=stats.max_val,
-                avg_value=float(stats.avg_val) if stats.avg_val else None,
-                std_dev=float(stats.std_val) if stats.std_val else None,
-                sample_values=sample_values[:20],  # Keep first 20 for context
-                pattern_analysis=pattern_analysis
+            profiles[name] = ColumnProfile(
+                cardinality=stats[f"distinct_{i}"],
+                null_percentage=round((total_rows - non_null_rows) / total_rows * 100, 2),
+                top_values=top_values[i],
+                min_value=stats[f"min_{i}"],
+                max_value=stats[f"max_{i}"],
+                avg_value=float(avg_val) if avg_val else None,
+                std_dev=float(std_val) if std_val else None,
+                sample_values=values[:self.context_sample_size],
+                pattern_analysis=self._analyze_patterns(values, pattern_counts)
             )
+        
+        return profiles
+    
+    def _postgres_stats_query(self, table_ref: str, quoted: List[str],
+                              sample_size: int) -> Tuple[Any, Dict[str, Any]]:
+        """Build the PostgreSQL aggregate scan, including pattern match counts."""
+        numeric = "'^-?\\d+(\\.\\d+)?$'"
+        in_sample = '"__dbdoc_pattern_sample"'
+        
+        # Get basic statistics for all columns in a single pass
+        aggregates = []
+        for i, col in enumerate(quoted):
+            numeric_val = f'CASE WHEN {col}::text ~ {numeric} THEN {col}::text::numeric ELSE NULL END'
+            aggregates.extend([
+                f'COUNT({col}) AS non_null_{i}',
+                f'COUNT(DISTINCT {col}) AS distinct_{i}',
+                f'MIN({col}::text) AS min_{i}',
+                f'MAX({col}::text) AS max_{i}',
+                f'AVG({numeric_val}) AS avg_{i}',
+                f'STDDEV({numeric_val}) AS std_{i}',
+            ])
+            # Count pattern matches in the same scan instead of regex-matching
+            # the fetched sample in Python; only a random subset of about
+            # sample_size rows is matched so wide scans stay cheap
+            aggregates.append(f'COUNT({col}) FILTER (WHERE {in_sample}) AS checked_{i}')
+            for j, pattern in enumerate(self.patterns.values()):
+                operator = "~*" if pattern.flags & re.IGNORECASE else "~"
+                aggregates.append(
+                    f'COUNT(*) FILTER (WHERE {in_sample} AND {col}::text {operator} :pattern_{j}) AS pattern_{i}_{j}'
+                )
+        stats_query = text(f'''
+            SELECT COUNT(*) AS total_rows,
+                   {", ".join(aggregates)}
+            FROM (
+                SELECT *, random() < :sample_size / GREATEST(COALESCE(
+                    (SELECT reltuples FROM pg_class WHERE oid = to_regclass(:relation)), 0), 1) AS {in_sample}
+                FROM {table_ref}
+            ) AS profiled
+        ''')
+        stats_params: Dict[str, Any] = {"sample_size": sample_size, "relation": table_ref}
+        stats_params.update({f"pattern_{j}": pattern.pattern for j, pattern in enumerate(self.patterns.values())})
+        return stats_query, stats_params
+    
+    def _portable_stats_query(self, table_ref: str, quoted: List[str]) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Build the aggregate scan for SQLite, which has no regex or STDDEV.
+        
+        Numeric values are summed (as floats, via TOTAL, so large integers
+        can't overflow) so _moments can derive the mean and sample
+        standard deviation.
+        """
+        aggregates = []
+        for i, col in enumerate(quoted):
+            numeric_val = f"CASE WHEN typeof({col}) IN ('integer', 'real') THEN {col} END"
+            aggregates.extend([
+                f'COUNT({col}) AS non_null_{i}',
+                f'COUNT(DISTINCT {col}) AS distinct_{i}',
+                f'MIN(CAST({col} AS TEXT)) AS min_{i}',
+                f'MAX(CAST({col} AS TEXT)) AS max_{i}',
+                f'COUNT({numeric_val}) AS numeric_count_{i}',
+                f'TOTAL({numeric_val}) AS numeric_sum_{i}',
+                f'TOTAL(({numeric_val}) * ({numeric_val})) AS numeric_sumsq_{i}',
+            ])
+        return text(f'''
+            SELECT COUNT(*) AS total_rows,
+                   {", ".join(aggregates)}
+            FROM {table_ref}
+        '''), {}
+    
+    def _moments(self, count: int, total: Optional[float],
+                 total_squares: Optional[float]) -> Tuple[Optional[float], Optional[float]]:
+        """Get the mean and sample standard deviation from a count, sum and sum of squares."""
+        if not count:
+            return None, None
+        mean = total / count
+        if count < 2:
+            return mean, None
+        variance = (total_squares - total * total / count) / (count - 1)
+        return mean, math.sqrt(max(variance, 0.0))
+    
+    def _sample_query(self, conn, schema_name: str, table_name: str, quoted: List[str],
+                      total_rows: int, sample_size: int, limit: int) -> Tuple[Any, Dict[str, Any]]:
+        """Build the query fetching limit random rows of a table."""
+        table_ref = f'{self._quote(schema_name)}.{self._quote(table_name)}'
+        columns = ", ".join(quoted)
+        params: Dict[str, Any] = {"limit": limit}
+        
+        if self.database_type == "postgresql" and self._is_sampleable(conn, schema_name, table_name):
+            # Block-level sampling reads only the sampled pages instead of
+            # sorting the whole table; oversample 2x since SYSTEM is approximate,
+            # then shuffle so the fetched rows aren't all from the first page
+            percent = min(100.0, sample_size * 200.0 / total_rows)
+            params["percent"] = percent
+            return text(f'''
+                SELECT {columns}
+                FROM {table_ref} TABLESAMPLE SYSTEM (:percent)
+                ORDER BY RANDOM()
+                LIMIT :limit
+            '''), params
+        
+        return text(f'''
+            SELECT {columns}
+            FROM {table_ref}
+            ORDER BY RANDOM()
+            LIMIT :limit
+        '''), params
     
-    def _analyze_patterns(self, values: List[Any]) -> Dict[str, Any]:
-        """Analyze data patterns in sample values."""
-        if not values:
+    def _is_sampleable(self, conn, schema_name: str, table_name: str) -> bool:
+        """Check whether a relation is a table TABLESAMPLE can read (views can't be sampled)."""
+        key = (schema_name, table_name)
+        if key not in self._sampleable:
+            # Look up the whole schema at once so profiling its other tables
+            # costs no extra round trip
+            rows = conn.execute(text('''
+                SELECT c.relname, c.relkind
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema_name
+            '''), {"schema_name": schema_name})
+            for relname, relkind in rows:
+                self._sampleable[(schema_name, relname)] = relkind in ('r', 'm', 'p')
+            self._sampleable.setdefault(key, False)
+        return self._sampleable[key]
+    
+    def _quote(self, identifier: str) -> str:
+        """Quote an identifier for use in SQL."""
+        return '"' + identifier.replace('"', '""') + '"'
+    
+    def _empty_profile(self) -> ColumnProfile:
+        """Profile returned for columns of an empty table."""
+        return ColumnProfile(
+            cardinality=0,
+            null_percentage=100.0,
+            top_values=[],
+            min_value=None,
+            max_value=None,
+            avg_value=None,
+            std_dev=None,
+            sample_values=[],
+            pattern_analysis={}
+        )
+    
+    def _analyze_patterns(self, values: List[Any],
+                          pattern_counts: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Any]:
+        """
+        Analyze data patterns in sample values.
+        
+        pattern_counts maps pattern names to (matches, values checked) pairs
+        already computed by the database; without it the patterns are
+        matched against the sample values here. The shape checks need
+        sample values, so without any only the pattern matches are returned.
+        """
+        if not values and pattern_counts is None:
             return {}
             
         pattern_matches = {}
         string_values = [str(v) for v in values if v is not None]
         
-        for pattern_name, pattern in self.patterns.items():
-            matches = sum(1 for v in string_values if pattern.match(v))
+        if pattern_counts is None:
+            pattern_counts = {
+                pattern_name: (matches, len(string_values))
+                for pattern_name, matches in self._count_pattern_matches(string_values).items()
+            }
+        
+        for pattern_name, (matches, checked) in pattern_counts.items():
             if matches > 0:
                 pattern_matches[pattern_name] = {
                     'matches': matches,
-                    'percentage': round(matches / len(string_values) * 100, 2)
+                    'percentage': round(matches / checked * 100, 2)
                 }
         
+        if not string_values:
+            return {'pattern_matches': pattern_matches}
+        
         # Additional analysis
+        alpha_values = [s for s in string_values if s.isalpha()]
         analysis = {
             'pattern_matches': pattern_matches,
-            'avg_length': round(sum(len(str(v)) for v in string_values) / len(string_values), 2) if string_values else 0,
-            'all_numeric': all(str(v).replace('.', '').replace('-', '').isdigit() for v in string_values),
-            'all_uppercase': all(str(v).isupper() for v in string_values if str(v).isalpha()),
-            'all_lowercase': all(str(v).islower() for v in string_values if str(v).isalpha()),
+            'avg_length': round(sum(map(len, string_values)) / len(string_values), 2) if string_values else 0,
+            'all_numeric': all(s.replace('.', '').replace('-', '').isdigit() for s in string_values),
+            'all_uppercase': all(s.isupper() for s in alpha_values),
+            'all_lowercase': all(s.islower() for s in alpha_values),
         }
         
         return analysis
     
+    def _count_pattern_matches(self, string_values: List[str]) -> Dict[str, int]:
+        """Count how many values match each pattern."""
+        hs_db = self._hyperscan_db()
+        if hs_db is not None:
+            counts = [0] * len(self.patterns)
+            
+            def on_match(pattern_id, start, end, flags, context):
+                counts[pattern_id] += 1
+            
+            for value in string_values:
+                hs_db.scan(value.encode("utf-8", "replace"), match_event_handler=on_match)
+            return dict(zip(self.patterns, counts))
+        
+        # Group values by which patterns they could match, then test each
+        # value once against the combined regex for its group
+        candidates = self._pattern_candidates(string_values)
+        groups = np.zeros(len(string_values), dtype=np.int64)
+        for bit, pattern_name in enumerate(self.patterns):
+            groups |= candidates[pattern_name].astype(np.int64) << bit
+        
+        counts = dict.fromkeys(self.patterns, 0)
+        names = list(self.patterns)
+        for group in np.unique(groups[groups > 0]):
+            members = np.flatnonzero(groups == group)
+            if group & (group - 1) == 0:
+                # A single candidate pattern needs no combined regex
+                pattern_name = names[int(group).bit_length() - 1]
+                match = self.patterns[pattern_name].match
+                counts[pattern_name] += sum(1 for i in members if match(string_values[i]))
+                continue
+            
+            combined = self._combined_pattern(int(group))
+            for i in members:
+                for pattern_name, value in combined.match(string_values[i]).groupdict().items():
+                    if value is not None:
+                        counts[pattern_name] += 1
+        return counts
+    
+    def _combined_pattern(self, group: int) -> re.Pattern:
+        """
+        Compile one regex testing the patterns whose bits are set in group.
+        
+        Each pattern sits in its own optional lookahead, so a single match
+        reports every pattern the value satisfies (patterns can overlap).
+        """
+        if group not in self._combined:
+            self._combined[group] = re.compile("".join(
+                f"(?=(?P<{name}>{'(?i:' if pattern.flags & re.IGNORECASE else '(?:'}{pattern.pattern.lstrip('^')})))?"
+                for bit, (name, pattern) in enumerate(self.patterns.items())
+                if group >> bit & 1
+            ))
+        return self._combined[group]
+    
+    def _pattern_candidates(self, string_values: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Flag which values could match each pattern, using cheap byte counts.
+        
+        Values are packed into one byte buffer and per-value character-class
+        counts are computed in a single vectorized pass; only flagged values
+        are handed to the (much slower) regexes.
+        """
+        encoded = [v.encode("utf-8", "surrogatepass") for v in string_values]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        owner = np.repeat(np.arange(len(encoded)), lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(encoded) else lengths
+        
+        def count(byte_mask: np.ndarray) -> np.ndarray:
+            return np.bincount(owner, weights=byte_mask, minlength=len(encoded)).astype(np.int64)
+        
+        def byte_at(offset: int, value: bytes) -> np.ndarray:
+            index = np.minimum(starts + offset, max(len(buffer) - 1, 0))
+            if not len(buffer):
+                return np.zeros(len(encoded), dtype=bool)
+            return (lengths > offset) & (buffer[index] == ord(value))
+        
+        is_digit = (buffer >= ord("0")) & (buffer <= ord("9"))
+        is_space = (buffer == ord(" ")) | ((buffer >= 9) & (buffer <= 13))
+        is_dash = buffer == ord("-")
+        is_dot = buffer == ord(".")
+        
+        # The regexes' $ also matches before one trailing newline, so a
+        # value's final "\n" never rules it out
+        ends = (starts + lengths - 1)[lengths > 0]
+        is_final_newline = np.zeros(len(buffer), dtype=bool)
+        is_final_newline[ends] = buffer[ends] == ord("\n")
+        trailing_newline = np.zeros(len(encoded), dtype=np.int64)
+        trailing_newline[lengths > 0] = is_final_newline[ends]
+        
+        def only(allowed: np.ndarray) -> np.ndarray:
+            # Non-ASCII bytes may be Unicode digits/whitespace, which the
+            # regexes accept, so only ASCII bytes can rule a value out
+            return count(~allowed & (buffer < 128) & ~is_final_newline) == 0
+        
+        dots = count(is_dot)
+        non_ascii = count(buffer >= 128) > 0
+        
+        return {
+            'email': (count(buffer == ord("@")) == 1) & (dots > 0),
+            'phone': (lengths >= 10) & only(is_digit | is_space | is_dash | (buffer == ord("(")) | (buffer == ord(")")) | (buffer == ord("+"))),
+            'uuid': (lengths - trailing_newline == 36) & (count(is_dash) == 4),
+            'url': byte_at(0, b"h") & byte_at(1, b"t") & byte_at(2, b"t") & byte_at(3, b"p"),
+            'ip_address': (dots == 3) & only(is_digit | is_dot),
+            'credit_card': (lengths >= 16) & only(is_digit | is_space | is_dash),
+            'ssn': (lengths >= 9) & only(is_digit | is_dash),
+            'date_string': (byte_at(4, b"-") & byte_at(7, b"-")) | non_ascii,
+        }
+    
     def classify_column(self, column_name: str, data_type: str, 
                        profile: ColumnProfile) -> Dict[str, Any]:
         """Classify column based on name, type, and data patterns."""
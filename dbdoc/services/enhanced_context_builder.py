@@ -1,16 +1,81 @@
 """Enhanced context builder for more accurate AI description generation."""
 
 import logging
-from typing import List, Dict, Any, Optional, Set
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, Dict, Any, FrozenSet, Optional, Set, Tuple
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from dataclasses import dataclass
 from ..models import DataSource, Table, Column, AIDescription
 from ..services.multi_db_connector import MultiDatabaseConnector, DatabaseType
+from .semantic_cache import embed
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+except ImportError:  # Optional; domain matching falls back to re
+    ahocorasick = None
 
-@dataclass
+# Keywords whose presence in a table or column name hints at a business domain
+DOMAIN_KEYWORDS = {
+    'finance': ('payment', 'invoice', 'billing', 'account', 'transaction', 'price', 'cost', 'revenue'),
+    'hr': ('employee', 'staff', 'person', 'user', 'role', 'department', 'salary'),
+    'sales': ('order', 'customer', 'product', 'sale', 'deal', 'lead', 'opportunity'),
+    'inventory': ('stock', 'inventory', 'warehouse', 'item', 'product', 'supplier'),
+    'marketing': ('campaign', 'lead', 'prospect', 'channel', 'conversion', 'analytics'),
+    'operations': ('process', 'workflow', 'task', 'status', 'queue', 'log'),
+    'analytics': ('metric', 'kpi', 'report', 'dashboard', 'analysis', 'aggregation')
+}
+
+COMMON_SUFFIXES = ['_id', '_key', '_date', '_time', '_flag', '_status', '_type', '_code', '_name']
+COMMON_SUFFIX_RE = re.compile(f"({'|'.join(COMMON_SUFFIXES)})$")
+
+
+class DomainMatcher:
+    """Finds every business domain with a keyword in a name, in one pass over the name."""
+    
+    def __init__(self, domain_keywords: Dict[str, Tuple[str, ...]]):
+        """Build the matcher over all domains' keywords at once."""
+        self._keyword_domains: Dict[str, List[str]] = {}
+        for domain, keywords in domain_keywords.items():
+            for keyword in keywords:
+                self._keyword_domains.setdefault(keyword, []).append(domain)
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, domains in self._keyword_domains.items():
+                self._automaton.add_word(keyword, domains)
+            self._automaton.make_automaton()
+        else:
+            # A lookahead at every position also finds overlapping keywords,
+            # though only one keyword per start position
+            self._automaton = None
+            self._pattern = re.compile(
+                "(?=(" + "|".join(map(re.escape, sorted(self._keyword_domains, key=len, reverse=True))) + "))"
+            )
+    
+    def domains(self, name: str) -> FrozenSet[str]:
+        """Get the domains with a keyword occurring in the name."""
+        if self._automaton is not None:
+            return frozenset(domain for _, domains in self._automaton.iter(name) for domain in domains)
+        return frozenset(
+            domain for match in self._pattern.finditer(name) for domain in self._keyword_domains[match.group(1)]
+        )
+
+
+_domain_matcher = DomainMatcher(DOMAIN_KEYWORDS)
+
+
+@lru_cache(maxsize=8192)
+def _name_domains(name: str) -> FrozenSet[str]:
+    """Get the domains hinted at by a name; names like id or status recur across tables."""
+    return _domain_matcher.domains(name)
+
+
+@dataclass(frozen=True, slots=True)
 class RelationshipInfo:
     """Information about table relationships."""
     source_table: str
@@ -20,7 +85,32 @@ class RelationshipInfo:
     constraint_name: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class ColumnSummary:
+    """
+    Compact per-column metadata in a table context.
+    
+    Wide tables put hundreds of these in every table context, so they are
+    slotted rather than dicts. Item access mirrors the column dicts that
+    AIService.generate_table_description takes.
+    """
+    column_name: str
+    data_type: str
+    is_nullable: bool
+    is_key: bool
+    is_pii: bool
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+
+@dataclass(frozen=True, slots=True)
 class SchemaPattern:
     """Detected naming and structural patterns in the schema."""
     table_prefixes: List[str]
@@ -29,7 +119,7 @@ class SchemaPattern:
     business_domains: List[str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EnhancedContext:
     """Rich context for AI generation."""
     # Basic context
@@ -58,12 +148,21 @@ class EnhancedContext:
 class EnhancedContextBuilder:
     """Builds rich, comprehensive context for AI description generation."""
     
-    def __init__(self, db_session: Session, data_source: DataSource):
+    def __init__(self, db_session: Session, data_source: DataSource, cache=None):
+        """
+        Initialize for a data source.
+        
+        cache is an optional process-wide CatalogCache; when given, detected
+        schema patterns and relationships are shared with later builders
+        for the same data source until its catalog changes.
+        """
         self.db = db_session
         self.data_source = data_source
         self.connector = None
+        self.cache = cache
         self._schema_patterns_cache = None
         self._relationships_cache = None
+        self._approved_descriptions: Dict[str, Tuple[Any, List[Dict[str, Any]]]] = {}
         
     def _get_connector(self) -> MultiDatabaseConnector:
         """Get database connector, creating if needed."""
@@ -80,19 +179,31 @@ class EnhancedContextBuilder:
         """Analyze schema to detect naming patterns and business domains."""
         if self._schema_patterns_cache:
             return self._schema_patterns_cache
+        
+        if self.cache is not None:
+            self._schema_patterns_cache = self.cache.get("schema_patterns", self.data_source.id)
+            if self._schema_patterns_cache:
+                return self._schema_patterns_cache
             
-        tables = self.db.query(Table).filter(
-            Table.data_source_id == self.data_source.id
-        ).all()
+        # Only names are needed, so fetch them directly rather than loading
+        # every table and lazily loading its columns one table at a time
+        table_names = [
+            name.lower() for (name,) in self.db.query(Table.table_name).filter(
+                Table.data_source_id == self.data_source.id
+            )
+        ]
         
         # Analyze table naming patterns
-        table_names = [t.table_name.lower() for t in tables]
         table_prefixes = self._extract_prefixes(table_names)
         
         # Analyze column naming patterns
-        all_columns = []
-        for table in tables:
-            all_columns.extend([c.column_name.lower() for c in table.columns])
+        all_columns = [
+            name.lower() for (name,) in self.db.query(Column.column_name).join(
+                Table, Column.table_id == Table.id
+            ).filter(
+                Table.data_source_id == self.data_source.id
+            )
+        ]
         
         column_suffixes = self._extract_suffixes(all_columns)
         
@@ -109,58 +220,55 @@ class EnhancedContextBuilder:
             business_domains=business_domains
         )
         
+        if self.cache is not None:
+            self.cache.set("schema_patterns", self.data_source.id, self.data_source.id, self._schema_patterns_cache)
+        
         return self._schema_patterns_cache
     
     def _extract_prefixes(self, names: List[str], min_count: int = 2) -> List[str]:
         """Extract common prefixes from a list of names."""
-        prefix_counts = {}
-        
-        for name in names:
-            for i in range(2, min(len(name), 8)):  # Check prefixes 2-7 chars
-                prefix = name[:i]
-                if prefix.endswith('_'):
-                    prefix_counts[prefix] = prefix_counts.get(prefix, 0) + 1
+        # Prefixes of 2-7 chars that end in an underscore, shorter than the
+        # name; they depend only on its first 8 chars, which repeat a lot
+        prefix_counts: Counter = Counter()
+        for head, count in Counter(name[:8] for name in names).items():
+            for i in range(2, len(head)):
+                if head[i - 1] == '_':
+                    prefix_counts[head[:i]] += count
         
         return [prefix for prefix, count in prefix_counts.items() if count >= min_count]
     
     def _extract_suffixes(self, names: List[str], min_count: int = 3) -> List[str]:
         """Extract common suffixes from a list of names."""
-        suffix_counts = {}
-        
-        common_suffixes = ['_id', '_key', '_date', '_time', '_flag', '_status', '_type', '_code', '_name']
-        
-        for name in names:
-            for suffix in common_suffixes:
-                if name.endswith(suffix):
-                    suffix_counts[suffix] = suffix_counts.get(suffix, 0) + 1
+        # The longest suffix has 7 chars; one more allows for a trailing newline
+        suffix_counts: Counter = Counter()
+        for tail, count in Counter(name[-8:] for name in names).items():
+            match = COMMON_SUFFIX_RE.search(tail)
+            if match:
+                suffix_counts[match.group(1)] += count
         
         return [suffix for suffix, count in suffix_counts.items() if count >= min_count]
     
     def _infer_business_domains(self, table_names: List[str], column_names: List[str]) -> List[str]:
         """Infer business domains from naming patterns."""
-        domain_keywords = {
-            'finance': ['payment', 'invoice', 'billing', 'account', 'transaction', 'price', 'cost', 'revenue'],
-            'hr': ['employee', 'staff', 'person', 'user', 'role', 'department', 'salary'],
-            'sales': ['order', 'customer', 'product', 'sale', 'deal', 'lead', 'opportunity'],
-            'inventory': ['stock', 'inventory', 'warehouse', 'item', 'product', 'supplier'],
-            'marketing': ['campaign', 'lead', 'prospect', 'channel', 'conversion', 'analytics'],
-            'operations': ['process', 'workflow', 'task', 'status', 'queue', 'log'],
-            'analytics': ['metric', 'kpi', 'report', 'dashboard', 'analysis', 'aggregation']
-        }
-        
-        detected_domains = []
-        all_names = table_names + column_names
+        found: Set[str] = set()
+        for name in table_names + column_names:
+            found |= _name_domains(name)
+            if len(found) == len(DOMAIN_KEYWORDS):
+                break
         
-        for domain, keywords in domain_keywords.items():
-            if any(keyword in name for name in all_names for keyword in keywords):
-                detected_domains.append(domain)
-        
-        return detected_domains
+        return [domain for domain in DOMAIN_KEYWORDS if domain in found]
     
     def _detect_naming_convention(self, names: List[str]) -> str:
         """Detect the naming convention used."""
-        snake_case_count = sum(1 for name in names if '_' in name and name.islower())
-        camel_case_count = sum(1 for name in names if any(c.isupper() for c in name[1:]) and '_' not in name)
+        # Classify each distinct name once; an uppercase letter after the
+        # first changes the name when lowercased
+        snake_case_count = camel_case_count = 0
+        for name, count in Counter(names).items():
+            if '_' in name:
+                if name.islower():
+                    snake_case_count += count
+            elif name[1:] != name[1:].lower():
+                camel_case_count += count
         
         total = len(names)
         if snake_case_count / total > 0.7:
@@ -172,8 +280,13 @@ class EnhancedContextBuilder:
     
     def _get_table_relationships(self, table_name: str) -> List[RelationshipInfo]:
         """Get foreign key relationships for a table."""
+        if self._relationships_cache is None and self.cache is not None:
+            self._relationships_cache = self.cache.get("relationships", self.data_source.id)
+        
         if self._relationships_cache is None:
             self._relationships_cache = self._load_all_relationships()
+            if self.cache is not None:
+                self.cache.set("relationships", self.data_source.id, self.data_source.id, self._relationships_cache)
         
         return [rel for rel in self._relationships_cache 
                 if rel.source_table == table_name or rel.target_table == table_name]
@@ -197,37 +310,83 @@ class EnhancedContextBuilder:
     
     def _load_postgresql_relationships(self) -> List[RelationshipInfo]:
         """Load relationships from PostgreSQL system tables."""
-        # Implementation would query information_schema.key_column_usage and related tables
-        # This is a simplified placeholder
-        return []
+        # Every foreign key in the database in one query; pg_constraint pairs
+        # up the columns of multi-column keys, which information_schema
+        # joins on constraint name alone cannot do reliably
+        query = text("""
+            SELECT src.relname, src_att.attname, tgt.relname, tgt_att.attname, con.conname
+            FROM pg_constraint con
+            JOIN pg_class src ON src.oid = con.conrelid
+            JOIN pg_namespace ns ON ns.oid = src.relnamespace
+            JOIN pg_class tgt ON tgt.oid = con.confrelid
+            CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(src_attnum, tgt_attnum)
+            JOIN pg_attribute src_att ON src_att.attrelid = con.conrelid AND src_att.attnum = k.src_attnum
+            JOIN pg_attribute tgt_att ON tgt_att.attrelid = con.confrelid AND tgt_att.attnum = k.tgt_attnum
+            WHERE con.contype = 'f'
+              AND ns.nspname NOT IN ('pg_catalog', 'information_schema')
+            ORDER BY src.relname, con.conname
+        """)
+        
+        with self._get_connector().engine.connect() as conn:
+            return [RelationshipInfo(*row) for row in conn.execute(query)]
     
     def _load_sqlite_relationships(self) -> List[RelationshipInfo]:
         """Load relationships from SQLite using PRAGMA foreign_key_list."""
-        # Implementation would use SQLite's PRAGMA commands
-        # This is a simplified placeholder
-        return []
+        # The table-valued pragma functions read every table's foreign keys
+        # in one query; a key without target columns references the
+        # target's primary key. SQLite keys are unnamed, so name them.
+        query = text("""
+            SELECT m.name, fk."from", fk."table",
+                   COALESCE(fk."to", (SELECT pk.name FROM pragma_table_info(fk."table") AS pk
+                                      WHERE pk.pk = fk.seq + 1)),
+                   'fk_' || m.name || '_' || fk.id
+            FROM sqlite_master AS m
+            JOIN pragma_foreign_key_list(m.name) AS fk
+            WHERE m.type = 'table'
+            ORDER BY m.name, fk.id, fk.seq
+        """)
+        
+        with self._get_connector().engine.connect() as conn:
+            return [RelationshipInfo(*row) for row in conn.execute(query)]
     
-    def _get_similar_descriptions(self, target_name: str, target_type: str) -> List[Dict[str, Any]]:
-        """Find similar previously generated descriptions for context."""
+    def _get_similar_descriptions(self, target_name: str, target_type: str,
+                                  limit: int = 5) -> List[Dict[str, Any]]:
+        """Find approved descriptions of the most similarly named tables or columns."""
+        if target_type not in self._approved_descriptions:
+            self._approved_descriptions[target_type] = self._load_approved_descriptions(target_type)
+        
+        vectors, descriptions = self._approved_descriptions[target_type]
+        if not descriptions:
+            return []
+        
+        # Rows are L2-normalized, so the dot product is cosine similarity;
+        # the stable sort keeps load order among equally similar names
+        similarities = (vectors @ embed([target_name.lower()]).T).toarray().ravel()
+        nearest = (-similarities).argsort(kind='stable')[:limit]
+        return [descriptions[i] for i in nearest]
+    
+    def _load_approved_descriptions(self, target_type: str) -> Tuple[Any, List[Dict[str, Any]]]:
+        """Load approved descriptions once, embedding the names of what they describe."""
         if target_type == 'table':
-            similar = self.db.query(AIDescription).filter(
-                AIDescription.table_id.isnot(None),
-                AIDescription.status.in_(['approved', 'edited'])
-            ).limit(5).all()
+            query = self.db.query(Table.table_name, AIDescription).join(
+                Table, AIDescription.table_id == Table.id
+            )
         else:
-            similar = self.db.query(AIDescription).filter(
-                AIDescription.column_id.isnot(None),
-                AIDescription.status.in_(['approved', 'edited'])
-            ).limit(5).all()
+            query = self.db.query(Column.column_name, AIDescription).join(
+                Column, AIDescription.column_id == Column.id
+            )
+        rows = query.filter(AIDescription.status.in_(['approved', 'edited'])).all()
         
-        return [
+        descriptions = [
             {
                 'name': desc.final_description or desc.description,
                 'confidence': desc.confidence_score,
                 'domain': desc.suggested_business_domain
             }
-            for desc in similar
+            for _, desc in rows
         ]
+        vectors = embed([name.lower() for name, _ in rows]) if rows else None
+        return vectors, descriptions
     
     def build_table_context(self, table: Table) -> EnhancedContext:
         """Build comprehensive context for table description generation."""
@@ -249,23 +408,14 @@ class EnhancedContextBuilder:
             'row_count': table.row_count,
             'column_count': len(table.columns),
             'columns': [
-                {
-                    'name': col.column_name,
-                    'type': col.data_type,
-                    'nullable': col.is_nullable,
-                    'is_key': col.is_key,
-                    'is_pii': col.is_pii
-                }
+                ColumnSummary(col.column_name, col.data_type, col.is_nullable, col.is_key, col.is_pii)
                 for col in table.columns
             ]
         }
         
         # Domain hints from patterns
-        domain_hints = []
-        for domain in patterns.business_domains:
-            if any(keyword in table.table_name.lower() 
-                   for keyword in self._get_domain_keywords(domain)):
-                domain_hints.append(domain)
+        name_domains = _name_domains(table.table_name.lower())
+        domain_hints = [domain for domain in patterns.business_domains if domain in name_domains]
         
         # Get similar descriptions for examples
         similar_descriptions = self._get_similar_descriptions(table.table_name, 'table')
@@ -315,11 +465,8 @@ class EnhancedContextBuilder:
         ]
         
         # Domain hints
-        domain_hints = []
-        for domain in patterns.business_domains:
-            domain_keywords = self._get_domain_keywords(domain)
-            if any(keyword in column.column_name.lower() for keyword in domain_keywords):
-                domain_hints.append(domain)
+        name_domains = _name_domains(column.column_name.lower())
+        domain_hints = [domain for domain in patterns.business_domains if domain in name_domains]
         
         # Detect column purpose from naming patterns
         column_purpose_hints = []
@@ -347,15 +494,6 @@ class EnhancedContextBuilder:
             validation_feedback=[]
         )
     
-    def _get_domain_keywords(self, domain: str) -> List[str]:
+    def _get_domain_keywords(self, domain: str) -> Tuple[str, ...]:
         """Get keywords associated with a business domain."""
-        domain_keywords = {
-            'finance': ['payment', 'invoice', 'billing', 'account', 'transaction', 'price', 'cost', 'revenue'],
-            'hr': ['employee', 'staff', 'person', 'user', 'role', 'department', 'salary'],
-            'sales': ['order', 'customer', 'product', 'sale', 'deal', 'lead', 'opportunity'],
-            'inventory': ['stock', 'inventory', 'warehouse', 'item', 'product', 'supplier'],
-            'marketing': ['campaign', 'lead', 'prospect', 'channel', 'conversion', 'analytics'],
-            'operations': ['process', 'workflow', 'task', 'status', 'queue', 'log'],
-            'analytics': ['metric', 'kpi', 'report', 'dashboard', 'analysis', 'aggregation']
-        }
-        return domain_keywords.get(domain, [])
\ No newline at end of file
+        return DOMAIN_KEYWORDS.get(domain, ())
\ No newline at end of file
@@ -1,9 +1,10 @@
 """ERD generation service for visualizing database relationships."""
 
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from functools import lru_cache
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_, or_, case, func
 import re
 
 from ..models import Table, Column, Relationship, TableFilter
@@ -11,6 +12,28 @@ from .relationship_detector import RelationshipDetector
 
 logger = logging.getLogger(__name__)
 
+MERMAID_UNSAFE_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+# Order in which table filter priorities are shown; tables without a filter count as normal
+TABLE_PRIORITY_RANK = {'critical': 0, 'important': 1, 'normal': 2, 'low': 3, 'ignore': 4}
+
+# Foreign key naming patterns and the confidence each one gives
+FK_SUFFIX_PATTERN = re.compile(r'(.+)_(id|fk|key|code|number)$')
+FK_SUFFIX_CONFIDENCE = {'id': 1.0, 'fk': 0.9, 'key': 0.8, 'code': 0.7, 'number': 0.6}
+FK_PREFIX_PATTERN = re.compile(r'fk_(.+)')
+FK_PREFIX_CONFIDENCE = 0.9
+
+
+@lru_cache(maxsize=4096)
+def _sanitize_mermaid_name(name: str) -> str:
+    """Sanitize a name for Mermaid; memoized as column names like id recur across tables."""
+    # Replace spaces and special characters
+    sanitized = MERMAID_UNSAFE_CHARS.sub('_', name)
+    # Ensure it doesn't start with a number
+    if sanitized and sanitized[0].isdigit():
+        sanitized = f"t_{sanitized}"
+    return sanitized
+
 
 class ERDGenerator:
     """Generate Entity Relationship Diagrams for database schemas."""
@@ -27,6 +50,24 @@ class ERDGenerator:
                            max_tables: int = 50,
                            only_included: bool = True) -> str:
         """Generate Mermaid.js ERD diagram."""
+        return "\n".join(self.stream_mermaid_erd(
+            data_source_id, schema_filter, include_columns, max_columns_per_table, max_tables, only_included
+        ))
+    
+    def stream_mermaid_erd(self,
+                           data_source_id: int,
+                           schema_filter: Optional[str] = None,
+                           include_columns: bool = True,
+                           max_columns_per_table: int = 10,
+                           max_tables: int = 50,
+                           only_included: bool = True) -> Iterator[str]:
+        """
+        Generate Mermaid.js ERD diagram as an iterator of lines.
+        
+        Everything the diagram needs is loaded before this returns, so the
+        lines can be rendered after the session is closed, e.g. while a
+        response streams them to the client.
+        """
         
         # Get tables
         tables = self._get_tables(data_source_id, schema_filter, max_tables, only_included)
@@ -34,54 +75,78 @@ class ERDGenerator:
         # Detect relationships if not already present
         relationships = self._get_or_detect_relationships(tables, data_source_id)
         
-        # Build Mermaid diagram
-        diagram = self._build_mermaid_diagram(
-            tables, relationships, include_columns, max_columns_per_table
-        )
+        columns_by_table = self._get_diagram_columns(tables, include_columns, max_columns_per_table)
+        
+        # Sanitize each table name once; relationships refer to them again
+        table_names = {table.id: self._sanitize_name(table.table_name) for table in tables}
         
-        return diagram
+        # Build Mermaid diagram
+        return self._iter_mermaid_diagram(table_names, relationships, columns_by_table)
     
-    def detect_relationships(self, data_source_id: int) -> List[Relationship]:
-        """Detect relationships between tables based on various heuristics."""
+    def detect_relationships(self, data_source_id: int) -> List[Dict[str, Any]]:
+        """Detect relationships between tables based on various heuristics; returns the inserted rows."""
         
         tables = self.db.query(Table).filter(Table.data_source_id == data_source_id).all()
         detected_relationships = []
         
+        # Load every column and known relationship of the data source up front
+        # rather than querying them per table and per candidate match
+        columns_by_table: Dict[int, List[Column]] = {table.id: [] for table in tables}
+        for column in self.db.query(Column).join(Table, Column.table_id == Table.id).filter(
+            Table.data_source_id == data_source_id
+        ).order_by(Column.table_id, Column.id):
+            columns_by_table[column.table_id].append(column)
+        
+        # The likely primary key of a table doesn't depend on the column
+        # referencing it, so find each table's once
+        primary_keys = {
+            table.id: self._find_primary_key(table, columns_by_table[table.id]) for table in tables
+        }
+        
+        # Name matches below compare singular stems, so index tables by theirs
+        tables_by_stem: Dict[str, List[Table]] = {}
+        for table in tables:
+            tables_by_stem.setdefault(table.table_name.lower().rstrip('s'), []).append(table)
+        
+        existing = set(
+            self.db.query(
+                Relationship.source_table_id,
+                Relationship.source_column_id,
+                Relationship.target_table_id,
+                Relationship.target_column_id
+            ).join(
+                Table, Relationship.source_table_id == Table.id
+            ).filter(
+                Table.data_source_id == data_source_id
+            ).all()
+        )
+        
         for source_table in tables:
-            source_columns = self.db.query(Column).filter(Column.table_id == source_table.id).all()
-            
-            for source_column in source_columns:
+            for source_column in columns_by_table[source_table.id]:
                 # Check for foreign key patterns
-                fk_matches = self._detect_foreign_key_pattern(source_column, tables)
+                fk_matches = self._detect_foreign_key_pattern(source_column, tables_by_stem, primary_keys)
                 
                 for target_table, target_column, confidence in fk_matches:
                     # Check if relationship already exists
-                    existing = self.db.query(Relationship).filter(
-                        and_(
-                            Relationship.source_table_id == source_table.id,
-                            Relationship.source_column_id == source_column.id,
-                            Relationship.target_table_id == target_table.id,
-                            Relationship.target_column_id == target_column.id
-                        )
-                    ).first()
+                    key = (source_table.id, source_column.id, target_table.id, target_column.id)
                     
-                    if not existing:
-                        rel = Relationship(
-                            source_table_id=source_table.id,
-                            source_column_id=source_column.id,
-                            target_table_id=target_table.id,
-                            target_column_id=target_column.id,
-                            relationship_type=self._infer_relationship_type(
-                                source_column, target_column
+                    if key not in existing:
+                        existing.add(key)
+                        detected_relationships.append({
+                            "source_table_id": source_table.id,
+                            "source_column_id": source_column.id,
+                            "target_table_id": target_table.id,
+                            "target_column_id": target_column.id,
+                            "relationship_type": self._infer_relationship_type(
+                                source_column, target_column, source_table
                             ),
-                            confidence_score=confidence,
-                            heuristic_score=confidence,
-                            is_validated=False
-                        )
-                        detected_relationships.append(rel)
-                        self.db.add(rel)
+                            "confidence_score": confidence,
+                            "heuristic_score": confidence,
+                            "is_validated": False
+                        })
         
         if detected_relationships:
+            Relationship.bulk_insert(self.db, detected_relationships)
             self.db.commit()
             logger.info(f"Detected {len(detected_relationships)} new relationships")
         
@@ -99,19 +164,24 @@ class ERDGenerator:
         if schema_filter:
             query = query.filter(Table.schema_name == schema_filter)
         
+        # Joined once, for both the inclusion filter and the priority order
+        query = query.outerjoin(TableFilter, TableFilter.table_id == Table.id)
+        
         if only_included:
             # Only get tables that are included (or have no filter)
-            query = query.outerjoin(TableFilter).filter(
+            query = query.filter(
                 or_(
                     TableFilter.is_included == True,
                     TableFilter.id == None
                 )
             )
         
-        # Prioritize important tables
-        query = query.outerjoin(TableFilter).order_by(
-            TableFilter.priority.desc().nullsfirst(),
-            Table.row_count.desc().nullsfirst()
+        # Prioritize important tables; the id makes the cut at max_tables
+        # deterministic among tables that tie
+        query = query.order_by(
+            case(TABLE_PRIORITY_RANK, value=TableFilter.priority, else_=TABLE_PRIORITY_RANK['normal']),
+            Table.row_count.desc().nullsfirst(),
+            Table.id
         )
         
         return query.limit(max_tables).all()
@@ -147,71 +217,62 @@ class ERDGenerator:
     
     def _detect_foreign_key_pattern(self,
                                    column: Column,
-                                   tables: List[Table]) -> List[Tuple[Table, Column, float]]:
+                                   tables_by_stem: Dict[str, List[Table]],
+                                   primary_keys: Dict[int, Optional[Column]]) -> List[Tuple[Table, Column, float]]:
         """Detect foreign key patterns in column names."""
         
         matches = []
         column_name_lower = column.column_name.lower()
         
-        # Common FK patterns
-        fk_patterns = [
-            (r'(.+)_id$', 1.0),           # ends with _id
-            (r'(.+)_fk$', 0.9),           # ends with _fk
-            (r'fk_(.+)', 0.9),            # starts with fk_
-            (r'(.+)_key$', 0.8),          # ends with _key
-            (r'(.+)_code$', 0.7),         # ends with _code
-            (r'(.+)_number$', 0.6),       # ends with _number
-        ]
-        
-        for pattern, base_confidence in fk_patterns:
-            match = re.match(pattern, column_name_lower)
-            if match:
-                potential_table_name = match.group(1)
+        # A name ends with at most one FK suffix, so one match finds it; the
+        # fk_ prefix can apply as well. Highest confidence is tried first.
+        candidates = []
+        suffix_match = FK_SUFFIX_PATTERN.match(column_name_lower)
+        if suffix_match:
+            candidates.append((suffix_match.group(1), FK_SUFFIX_CONFIDENCE[suffix_match.group(2)]))
+        prefix_match = FK_PREFIX_PATTERN.match(column_name_lower)
+        if prefix_match:
+            candidates.append((prefix_match.group(1), FK_PREFIX_CONFIDENCE))
+        candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+        
+        for potential_table_name, base_confidence in candidates:
+            # Look for matching tables; exact and singular/plural matches all
+            # share the name's singular stem
+            for target_table in tables_by_stem.get(potential_table_name.rstrip('s'), []):
+                if target_table.id == column.table_id:
+                    continue  # Skip self-references for now
                 
-                # Look for matching tables
-                for target_table in tables:
-                    if target_table.id == column.table_id:
-                        continue  # Skip self-references for now
-                    
-                    table_name_lower = target_table.table_name.lower()
+                # Look for primary key in target table
+                target_column = primary_keys.get(target_table.id)
+                if target_column is not None:
+                    # Adjust confidence based on data type match
+                    confidence = base_confidence
+                    if column.data_type == target_column.data_type:
+                        confidence = min(confidence + 0.1, 1.0)
                     
-                    # Check for exact match or singular/plural variations
-                    if (potential_table_name == table_name_lower or
-                        potential_table_name + 's' == table_name_lower or
-                        potential_table_name == table_name_lower + 's' or
-                        potential_table_name.rstrip('s') == table_name_lower.rstrip('s')):
-                        
-                        # Look for primary key in target table
-                        target_columns = self.db.query(Column).filter(
-                            Column.table_id == target_table.id
-                        ).all()
-                        
-                        for target_column in target_columns:
-                            # Check if it's likely a primary key
-                            if (target_column.column_name.lower() in ['id', 'pk', target_table.table_name.lower() + '_id'] or
-                                target_column.is_key or
-                                (target_column.cardinality and 
-                                 target_table.row_count and 
-                                 target_column.cardinality >= target_table.row_count * 0.95)):
-                                
-                                # Adjust confidence based on data type match
-                                confidence = base_confidence
-                                if column.data_type == target_column.data_type:
-                                    confidence = min(confidence + 0.1, 1.0)
-                                
-                                matches.append((target_table, target_column, confidence))
-                                break
-        
+                    matches.append((target_table, target_column, confidence))
+
         return matches
     
-    def _infer_relationship_type(self, source_column: Column, target_column: Column) -> str:
+    def _find_primary_key(self, table: Table, columns: List[Column]) -> Optional[Column]:
+        """Find the first column of a table that is likely its primary key."""
+        key_names = ['id', 'pk', table.table_name.lower() + '_id']
+        for column in columns:
+            if (column.column_name.lower() in key_names or
+                column.is_key or
+                (column.cardinality and 
+                 table.row_count and 
+                 column.cardinality >= table.row_count * 0.95)):
+                return column
+        return None
+    
+    def _infer_relationship_type(self, source_column: Column, target_column: Column,
+                                 source_table: Table) -> str:
         """Infer the type of relationship between columns."""
         
         # Simple heuristic based on cardinality
         if source_column.cardinality and target_column.cardinality:
-            source_table = self.db.query(Table).filter(Table.id == source_column.table_id).first()
-            
-            if source_table and source_table.row_count:
+            if source_table.row_count:
                 uniqueness_ratio = source_column.cardinality / source_table.row_count
                 
                 if uniqueness_ratio > 0.95:
@@ -222,55 +283,81 @@ class ERDGenerator:
         # Default to one_to_many
         return "one_to_many"
     
-    def _build_mermaid_diagram(self,
-                              tables: List[Table],
+    def _get_diagram_columns(self,
+                             tables: List[Table],
+                             include_columns: bool,
+                             max_columns_per_table: int) -> Dict[int, List[Column]]:
+        """Get the columns shown for each table in the diagram."""
+        
+        # Load the shown columns of every table in one query, ranking them per
+        # table so wide tables don't send columns that would be cut anyway
+        columns_by_table: Dict[int, List[Column]] = {table.id: [] for table in tables}
+        if include_columns and tables:
+            column_order = (Column.is_key.desc(), Column.ordinal_position)
+            ranked = self.db.query(
+                Column.id,
+                func.row_number().over(partition_by=Column.table_id, order_by=column_order).label("position")
+            ).filter(
+                Column.table_id.in_(list(columns_by_table))
+            ).subquery()
+            
+            all_columns = self.db.query(Column).options(
+                load_only(
+                    Column.table_id, Column.column_name, Column.data_type,
+                    Column.is_key, Column.is_nullable, Column.is_pii
+                )
+            ).join(
+                ranked, Column.id == ranked.c.id
+            ).filter(
+                ranked.c.position <= max_columns_per_table
+            ).order_by(
+                Column.table_id, ranked.c.position
+            ).all()
+            for column in all_columns:
+                columns_by_table[column.table_id].append(column)
+        
+        return columns_by_table
+    
+    def _iter_mermaid_diagram(self,
+                              table_names: Dict[int, str],
                               relationships: List[Relationship],
-                              include_columns: bool,
-                              max_columns_per_table: int) -> str:
-        """Build Mermaid.js ERD diagram syntax."""
+                              columns_by_table: Dict[int, List[Column]]) -> Iterator[str]:
+        """Build Mermaid.js ERD diagram syntax one line at a time from sanitized table names by id."""
         
-        lines = ["erDiagram"]
-        lines.append("")
+        yield "erDiagram"
+        yield ""
         
         # Add tables and their columns
-        for table in tables:
-            lines.append(f"    {self._sanitize_name(table.table_name)} {{")
+        for table_id, table_name in table_names.items():
+            yield f"    {table_name} {{"
             
-            if include_columns:
-                columns = self.db.query(Column).filter(
-                    Column.table_id == table.id
-                ).order_by(
-                    Column.is_key.desc(),
-                    Column.ordinal_position
-                ).limit(max_columns_per_table).all()
+            for column in columns_by_table[table_id]:
+                # Format column line
+                data_type = self._format_data_type(column.data_type)
+                column_name = self._sanitize_name(column.column_name)
                 
-                for column in columns:
-                    # Format column line
-                    data_type = self._format_data_type(column.data_type)
-                    column_name = self._sanitize_name(column.column_name)
-                    
-                    # Add constraints
-                    constraints = []
-                    if column.is_key:
-                        constraints.append("PK")
-                    if not column.is_nullable:
-                        constraints.append("NOT NULL")
-                    if column.is_pii:
-                        constraints.append("PII")
-                    
-                    constraint_str = f" \"{','.join(constraints)}\"" if constraints else ""
-                    
-                    lines.append(f"        {data_type} {column_name}{constraint_str}")
+                # Add constraints
+                constraints = []
+                if column.is_key:
+                    constraints.append("PK")
+                if not column.is_nullable:
+                    constraints.append("NOT NULL")
+                if column.is_pii:
+                    constraints.append("PII")
+                
+                constraint_str = f" \"{','.join(constraints)}\"" if constraints else ""
+                
+                yield f"        {data_type} {column_name}{constraint_str}"
             
-            lines.append("    }")
-            lines.append("")
+            yield "    }"
+            yield ""
         
         # Add relationships
         for rel in relationships:
-            source_table = next((t for t in tables if t.id == rel.source_table_id), None)
-            target_table = next((t for t in tables if t.id == rel.target_table_id), None)
+            source_name = table_names.get(rel.source_table_id)
+            target_name = table_names.get(rel.target_table_id)
             
-            if source_table and target_table:
+            if source_name is not None and target_name is not None:
                 # Determine relationship notation
                 rel_notation = self._get_mermaid_notation(rel.relationship_type)
                 
@@ -280,21 +367,11 @@ class ERDGenerator:
                     confidence_pct = int(rel.confidence_score * 100)
                     label = f" : \"confidence: {confidence_pct}%\""
                 
-                lines.append(
-                    f"    {self._sanitize_name(source_table.table_name)} {rel_notation} "
-                    f"{self._sanitize_name(target_table.table_name)}{label}"
-                )
-        
-        return "\n".join(lines)
+                yield f"    {source_name} {rel_notation} {target_name}{label}"
     
     def _sanitize_name(self, name: str) -> str:
         """Sanitize names for Mermaid diagram."""
-        # Replace spaces and special characters
-        sanitized = re.sub(r'[^a-zA-Z0-9_]', '_', name)
-        # Ensure it doesn't start with a number
-        if sanitized and sanitized[0].isdigit():
-            sanitized = f"t_{sanitized}"
-        return sanitized
+        return _sanitize_mermaid_name(name)
     
     def _format_data_type(self, data_type: str) -> str:
         """Format data type for display."""
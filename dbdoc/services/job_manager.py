@@ -1,13 +1,16 @@
 """Job management system for tracking long-running operations."""
 
 import logging
-import uuid
+import secrets
 import time
 import asyncio
-from typing import Dict, Any, Optional, Callable, List
-from dataclasses import dataclass, field
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import count, islice
+from typing import Dict, Any, Awaitable, NamedTuple, Optional, Callable, List, Set, Tuple
+from dataclasses import dataclass, replace
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
 from concurrent.futures import ThreadPoolExecutor, Future
 
@@ -32,9 +35,14 @@ class JobType(Enum):
     DATA_PROFILING = "data_profiling"
 
 
-@dataclass
+# Enum .value is a descriptor lookup; serializers read the values from these instead
+JOB_STATUS_VALUES: Dict[JobStatus, str] = {status: status.value for status in JobStatus}
+JOB_TYPE_VALUES: Dict[JobType, str] = {job_type: job_type.value for job_type in JobType}
+
+
+@dataclass(frozen=True, slots=True)
 class JobProgress:
-    """Progress information for a job."""
+    """Progress information for a job; replaced, never modified, on update."""
     current_step: str
     steps_completed: int
     total_steps: int
@@ -42,51 +50,150 @@ class JobProgress:
     total_items: int
     percentage: float = 0.0
     estimated_remaining_seconds: Optional[float] = None
-    
-    def __post_init__(self):
-        """Calculate percentage after initialization."""
-        if self.total_items > 0:
-            self.percentage = (self.items_processed / self.total_items) * 100
-        elif self.total_steps > 0:
-            self.percentage = (self.steps_completed / self.total_steps) * 100
 
 
-@dataclass
-class Job:
-    """Represents a long-running job."""
+class JobSnapshot(NamedTuple):
+    """A job's fields as read at one moment."""
     id: str
     job_type: JobType
-    title: str
-    description: str
-    status: JobStatus = JobStatus.PENDING
-    progress: JobProgress = field(default_factory=lambda: JobProgress("Initializing", 0, 1, 0, 1))
-    result: Optional[Any] = None
-    error: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    started_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
-    created_by: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    status: JobStatus
+    progress: JobProgress
+    result: Optional[Any]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+
+
+class Job:
+    """Represents a long-running job."""
+    
+    __slots__ = (
+        "id", "job_type", "title", "description", "status", "progress", "result", "error",
+        "created_at", "started_at", "completed_at", "created_by", "metadata",
+        "_lock", "_seq", "_started_monotonic", "_duration", "_future", "_task", "_callbacks"
+    )
+    
+    def __init__(self,
+                 id: str,
+                 job_type: JobType,
+                 title: str,
+                 description: str,
+                 progress: Optional[JobProgress] = None,
+                 metadata: Optional[Dict[str, Any]] = None,
+                 created_by: Optional[str] = None):
+        """Initialize a pending job."""
+        self.id = id
+        self.job_type = job_type
+        self.title = title
+        self.description = description
+        self.status = JobStatus.PENDING
+        self.progress = progress or JobProgress("Initializing", 0, 1, 0, 1)
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.created_by = created_by
+        self.metadata = metadata if metadata is not None else {}
+        # Guards this job's own fields, so updates to different jobs never contend
+        self._lock = threading.Lock()
+        # Creation order within the manager's indexes
+        self._seq = 0
+        # Monotonic start time for ETA estimates; started_at is for display
+        self._started_monotonic: Optional[float] = None
+        # Fixed once the job finishes
+        self._duration: Optional[float] = None
+        # How the job is running and who is watching it
+        self._future: Optional[Future] = None
+        self._task: Optional[asyncio.Task] = None
+        # Replaced, never modified, so notifiers can iterate it without the lock
+        self._callbacks: Tuple[Callable[["Job"], None], ...] = ()
     
     @property
     def duration_seconds(self) -> Optional[float]:
         """Calculate job duration in seconds."""
-        if self.started_at:
-            end_time = self.completed_at or datetime.utcnow()
-            return (end_time - self.started_at).total_seconds()
+        if self._duration is not None:
+            return self._duration
+        if self._started_monotonic is not None:
+            return time.monotonic() - self._started_monotonic
         return None
+    
+    def snapshot(self) -> JobSnapshot:
+        """
+        Read the job's fields without taking its lock.
+        
+        Writers replace progress whole and set result, error, final
+        progress and start or completion times before status, so a snapshot
+        never pairs a running or finished status with a missing timestamp or
+        result, or a finished status with the last running progress.
+        """
+        status = self.status
+        return JobSnapshot(
+            self.id, self.job_type, status, self.progress, self.result, self.error,
+            self.created_at, self.started_at, self.completed_at
+        )
+
+
+# Jobs' (sequence number, ID) pairs in creation order
+JobIndex = Tuple[Tuple[int, str], ...]
 
 
 class JobManager:
-    """Manages long-running jobs with progress tracking."""
+    """
+    Manages long-running jobs with progress tracking.
+    
+    Each job's fields, including its future or task and its progress
+    callbacks, are written under the job's own lock; readers use
+    Job.snapshot() and take no lock. The job registry is only
+    locked to add or remove a job, through a lock striped by job ID; reads
+    of it are single dict lookups and take no lock.
+    
+    Jobs are also indexed by type and by status in creation order, so
+    list_jobs reads the newest matches off the end of an index instead of
+    filtering and sorting every job. Indexes are immutable tuples that
+    writers replace under one lock when a job is added, removed or changes
+    status; list_jobs reads them without locking.
+    
+    Callbacks never run on the thread reporting a change. Jobs only mark
+    themselves as changed, and a single background thread notifies the
+    callbacks of each changed job: progress at most once per
+    PROGRESS_FLUSH_INTERVAL, status changes as soon as it wakes.
+    
+    Finished jobs are queued in completion order, so cleanup only visits
+    the jobs that have expired. At most MAX_JOBS are retained; creating a
+    job beyond that evicts the oldest finished ones.
+    """
+    
+    REGISTRY_LOCK_STRIPES = 16
+    PROGRESS_FLUSH_INTERVAL = 0.25
+    MAX_JOBS = 10000
+    QUEUED_JOBS_PER_WORKER = 4
     
     def __init__(self, max_concurrent_jobs: int = 5):
         """Initialize job manager."""
         self.jobs: Dict[str, Job] = {}
-        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs)
-        self.running_futures: Dict[str, Future] = {}
-        self.progress_callbacks: Dict[str, List[Callable[[Job], None]]] = {}
-        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix="dbdoc-job")
+        # Bounds running plus queued thread-pool jobs; submissions beyond it are refused
+        self._queue_slots = threading.BoundedSemaphore(max_concurrent_jobs * self.QUEUED_JOBS_PER_WORKER)
+        self._registry_locks = [threading.Lock() for _ in range(self.REGISTRY_LOCK_STRIPES)]
+        self._sequence = count()
+        # Job IDs are this prefix plus the job's sequence number, unique across restarts
+        self._id_prefix = secrets.token_hex(4)
+        self._all: JobIndex = ()
+        self._by_type: Dict[JobType, JobIndex] = {t: () for t in JobType}
+        self._by_status: Dict[JobStatus, JobIndex] = {s: () for s in JobStatus}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()
+        self._index_lock = threading.Lock()
+        self._pending_progress: Set[str] = set()
+        self._progress_lock = threading.Lock()
+        self._progress_flusher: Optional[threading.Thread] = None
+        self._flush_now = threading.Event()
+        self._stop_flushing = threading.Event()
+    
+    def _registry_lock(self, job_id: str) -> threading.Lock:
+        """Get the registry lock stripe for a job."""
+        return self._registry_locks[hash(job_id) % self.REGISTRY_LOCK_STRIPES]
         
     def create_job(self, 
                    job_type: JobType,
@@ -96,7 +203,8 @@ class JobManager:
                    metadata: Optional[Dict[str, Any]] = None,
                    created_by: Optional[str] = None) -> str:
         """Create a new job and return its ID."""
-        job_id = str(uuid.uuid4())
+        seq = next(self._sequence)
+        job_id = f"{self._id_prefix}-{seq:x}"
         
         job = Job(
             id=job_id,
@@ -107,10 +215,19 @@ class JobManager:
             metadata=metadata or {},
             created_by=created_by
         )
+        job._seq = seq
         
-        with self._lock:
+        with self._registry_lock(job_id):
             self.jobs[job_id] = job
-            self.progress_callbacks[job_id] = []
+        
+        with self._index_lock:
+            entry = (seq, job_id)
+            self._all = self._with_entry(self._all, entry)
+            self._by_type[job_type] = self._with_entry(self._by_type[job_type], entry)
+            self._by_status[job.status] = self._with_entry(self._by_status[job.status], entry)
+            
+            while len(self.jobs) > self.MAX_JOBS and self._finished:
+                self._remove_job(next(iter(self._finished.values())))
         
         logger.info(f"Created job {job_id}: {title}")
         return job_id
@@ -123,85 +240,223 @@ class JobManager:
                   job_type: Optional[JobType] = None,
                   status: Optional[JobStatus] = None,
                   limit: int = 50) -> List[Job]:
-        """List jobs with optional filtering."""
-        jobs = list(self.jobs.values())
-        
-        if job_type:
-            jobs = [j for j in jobs if j.job_type == job_type]
-        
-        if status:
-            jobs = [j for j in jobs if j.status == status]
+        """List jobs with optional filtering, newest first."""
+        if job_type and status:
+            # Walk the shorter index and check the other criterion
+            by_type, by_status = self._by_type[job_type], self._by_status[status]
+            if len(by_type) <= len(by_status):
+                entries, matches = by_type, lambda j: j.status == status
+            else:
+                entries, matches = by_status, lambda j: j.job_type == job_type
+        else:
+            if job_type:
+                entries = self._by_type[job_type]
+            elif status:
+                entries = self._by_status[status]
+            else:
+                entries = self._all
+            matches = None
         
-        # Sort by creation time, newest first
-        jobs.sort(key=lambda j: j.created_at, reverse=True)
-        
-        return jobs[:limit]
+        # The index is a snapshot; skip jobs removed since it was taken
+        jobs = (self.jobs.get(job_id) for _, job_id in reversed(entries))
+        jobs = (j for j in jobs if j is not None and (matches is None or matches(j)))
+        return list(islice(jobs, limit))
+    
+    def _set_status(self, job: Job, status: JobStatus):
+        """Change a job's status and move it between status indexes; call with job._lock held."""
+        with self._index_lock:
+            if job.id in self.jobs:
+                entry = (job._seq, job.id)
+                self._by_status[job.status] = self._without_entry(self._by_status[job.status], entry)
+                self._by_status[status] = self._with_entry(self._by_status[status], entry)
+            job.status = status
+    
+    def _set_finished(self, job: Job, status: JobStatus):
+        """Move a job to a terminal status and queue it for cleanup; call with job._lock held."""
+        job.completed_at = datetime.utcnow()
+        if job._started_monotonic is not None:
+            job._duration = time.monotonic() - job._started_monotonic
+        # Last, so lock-free readers never see a finished job without its completion time
+        self._set_status(job, status)
+        with self._index_lock:
+            if job.id in self.jobs:
+                self._finished[job.id] = job
+    
+    def _remove_job(self, job: Job):
+        """Drop a job from the registry and every index; call with _index_lock held."""
+        entry = (job._seq, job.id)
+        self._all = self._without_entry(self._all, entry)
+        self._by_type[job.job_type] = self._without_entry(self._by_type[job.job_type], entry)
+        self._by_status[job.status] = self._without_entry(self._by_status[job.status], entry)
+        self._finished.pop(job.id, None)
+        with self._registry_lock(job.id):
+            self.jobs.pop(job.id, None)
+    
+    @staticmethod
+    def _with_entry(entries: JobIndex, entry: Tuple[int, str]) -> JobIndex:
+        """Copy a sorted index with an entry added."""
+        i = bisect_left(entries, entry)
+        return entries[:i] + (entry,) + entries[i:]
+    
+    @staticmethod
+    def _without_entry(entries: JobIndex, entry: Tuple[int, str]) -> JobIndex:
+        """Copy a sorted index with an entry removed, if present."""
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            return entries[:i] + entries[i + 1:]
+        return entries
     
     def start_job(self, 
                   job_id: str,
                   job_function: Callable,
                   *args,
                   **kwargs) -> bool:
-        """Start executing a job."""
-        job = self.jobs.get(job_id)
+        """
+        Start executing a job on the manager's thread pool.
+        
+        At most QUEUED_JOBS_PER_WORKER jobs per worker may be running or
+        waiting at once; past that the job is failed and False returned.
+        """
+        job = self._get_pending_job(job_id)
         if not job:
-            logger.error(f"Job {job_id} not found")
             return False
         
-        if job.status != JobStatus.PENDING:
-            logger.error(f"Job {job_id} is not in pending status")
-            return False
-        
-        # Create progress callback
-        def progress_callback(current_step: str, steps_completed: int, total_steps: int,
-                            items_processed: int, total_items: int):
-            self.update_job_progress(job_id, current_step, steps_completed, total_steps,
-                                   items_processed, total_items)
+        progress_callback = self._make_progress_callback(job_id)
         
         # Submit job to executor
         def job_wrapper():
             try:
-                # Update status to running
-                self._update_job_status(job_id, JobStatus.RUNNING)
-                job.started_at = datetime.utcnow()
+                self._mark_running(job)
                 
                 # Execute the job function with progress callback
                 result = job_function(progress_callback, *args, **kwargs)
                 
-                # Update job with result
-                with self._lock:
-                    job.result = result
-                    job.status = JobStatus.COMPLETED
-                    job.completed_at = datetime.utcnow()
-                    job.progress.current_step = "Completed"
-                    job.progress.percentage = 100.0
-                
-                self._notify_progress_callbacks(job_id)
-                logger.info(f"Job {job_id} completed successfully")
-                
+                self._mark_completed(job, result)
                 return result
                 
             except Exception as e:
-                # Update job with error
-                with self._lock:
-                    job.error = str(e)
-                    job.status = JobStatus.FAILED
-                    job.completed_at = datetime.utcnow()
-                    job.progress.current_step = f"Failed: {str(e)}"
-                
-                self._notify_progress_callbacks(job_id)
-                logger.error(f"Job {job_id} failed: {e}")
+                self._mark_failed(job, e)
                 raise
         
-        # Submit to thread pool
+        # Submit to thread pool, unless its queue is full
+        if not self._queue_slots.acquire(blocking=False):
+            self._mark_failed(job, RuntimeError("Job queue is full"))
+            return False
+        
         future = self.executor.submit(job_wrapper)
+        future.add_done_callback(lambda _: self._queue_slots.release())
         
-        with self._lock:
-            self.running_futures[job_id] = future
+        with job._lock:
+            job._future = future
         
         logger.info(f"Started job {job_id}")
         return True
     
+    def start_job_async(self,
+                        job_id: str,
+                        job_function: Callable[..., Awaitable[Any]],
+                        *args,
+                        **kwargs) -> bool:
+        """
+        Start executing a coroutine job as a task on the running event loop.
+        
+        For I/O-bound jobs written as coroutines: they don't hold one of the
+        thread pool's workers, so any number can wait on I/O at once. Must be
+        called from the event loop; blocking steps inside the job belong in
+        loop.run_in_executor.
+        """
+        job = self._get_pending_job(job_id)
+        if not job:
+            return False
+        
+        progress_callback = self._make_progress_callback(job_id)
+        
+        async def job_wrapper():
+            try:
+                self._mark_running(job)
+                result = await job_function(progress_callback, *args, **kwargs)
+                self._mark_completed(job, result)
+                return result
+            except asyncio.CancelledError:
+                self._mark_cancelled(job)
+                raise
+            except Exception as e:
+                # Nothing awaits the task, so record the failure instead of raising
+                self._mark_failed(job, e)
+            finally:
+                with job._lock:
+                    job._task = None
+        
+        task = asyncio.get_running_loop().create_task(job_wrapper())
+        
+        with job._lock:
+            job._task = task
+        
+        logger.info(f"Started job {job_id} on the event loop")
+        return True
+    
+    def _get_pending_job(self, job_id: str) -> Optional[Job]:
+        """Get a job that can be started, or None after logging why not."""
+        job = self.jobs.get(job_id)
+        if not job:
+            logger.error(f"Job {job_id} not found")
+            return None
+        
+        if job.status != JobStatus.PENDING:
+            logger.error(f"Job {job_id} is not in pending status")
+            return None
+        
+        return job
+    
+    def _make_progress_callback(self, job_id: str) -> Callable:
+        """Create the progress callback handed to a job function."""
+        def progress_callback(current_step: str, steps_completed: int, total_steps: int,
+                            items_processed: int, total_items: int):
+            self.update_job_progress(job_id, current_step, steps_completed, total_steps,
+                                   items_processed, total_items)
+        return progress_callback
+    
+    def _mark_running(self, job: Job):
+        """Record that a job has started."""
+        with job._lock:
+            job.started_at = datetime.utcnow()
+            job._started_monotonic = time.monotonic()
+            self._set_status(job, JobStatus.RUNNING)
+    
+    def _mark_completed(self, job: Job, result: Any):
+        """Record a job's result."""
+        with job._lock:
+            job.result = result
+            job.progress = replace(job.progress, current_step="Completed", percentage=100.0)
+            self._set_finished(job, JobStatus.COMPLETED)
+        
+        self._queue_notification(job.id, urgent=True)
+        logger.info(f"Job {job.id} completed successfully")
+    
+    def _mark_failed(self, job: Job, error: Exception):
+        """Record a job's error."""
+        # Exception messages can be long; format outside the lock, once
+        message = str(error)
+        current_step = f"Failed: {message}"
+        with job._lock:
+            job.error = message
+            job.progress = replace(job.progress, current_step=current_step)
+            self._set_finished(job, JobStatus.FAILED)
+        
+        self._queue_notification(job.id, urgent=True)
+        logger.error(f"Job {job.id} failed: {message}")
+    
+    def _mark_cancelled(self, job: Job):
+        """Record that a job was cancelled."""
+        with job._lock:
+            if job.status == JobStatus.CANCELLED:
+                return
+            job.progress = replace(job.progress, current_step="Cancelled")
+            self._set_finished(job, JobStatus.CANCELLED)
+        
+        self._queue_notification(job.id, urgent=True)
+        logger.info(f"Cancelled job {job.id}")
+    
     def cancel_job(self, job_id: str) -> bool:
         """Cancel a running job."""
         job = self.jobs.get(job_id)
@@ -211,18 +466,20 @@ class JobManager:
         if job.status not in [JobStatus.PENDING, JobStatus.RUNNING]:
             return False
         
+        # Coroutine jobs are interrupted at their next await
+        task = job._task
+        if task:
+            if task.cancel():
+                self._mark_cancelled(job)
+                return True
+            return False
+        
         # Cancel the future if it's running
-        future = self.running_futures.get(job_id)
+        future = job._future
         if future:
             cancelled = future.cancel()
             if cancelled or future.done():
-                with self._lock:
-                    job.status = JobStatus.CANCELLED
-                    job.completed_at = datetime.utcnow()
-                    job.progress.current_step = "Cancelled"
-                
-                self._notify_progress_callbacks(job_id)
-                logger.info(f"Cancelled job {job_id}")
+                self._mark_cancelled(job)
                 return True
         
         return False
@@ -239,73 +496,117 @@ class JobManager:
         if not job:
             return
         
-        with self._lock:
-            job.progress = JobProgress(
-                current_step=current_step,
-                steps_completed=steps_completed,
-                total_steps=total_steps,
-                items_processed=items_processed,
-                total_items=total_items
-            )
-            
-            # Estimate remaining time
-            if job.started_at and items_processed > 0:
-                elapsed = (datetime.utcnow() - job.started_at).total_seconds()
-                rate = items_processed / elapsed
-                remaining_items = total_items - items_processed
-                job.progress.estimated_remaining_seconds = remaining_items / rate if rate > 0 else None
+        # Callers often report once per loop iteration whether or not anything moved
+        progress = job.progress
+        if (items_processed == progress.items_processed and current_step == progress.current_step
+                and steps_completed == progress.steps_completed and total_steps == progress.total_steps
+                and total_items == progress.total_items):
+            return
         
-        self._notify_progress_callbacks(job_id)
+        if total_items > 0:
+            percentage = (items_processed / total_items) * 100
+        elif total_steps > 0:
+            percentage = (steps_completed / total_steps) * 100
+        else:
+            percentage = 0.0
+        
+        # Estimate remaining time
+        estimated_remaining_seconds = None
+        if job._started_monotonic is not None and items_processed > 0:
+            elapsed = time.monotonic() - job._started_monotonic
+            rate = items_processed / elapsed
+            remaining_items = total_items - items_processed
+            estimated_remaining_seconds = remaining_items / rate if rate > 0 else None
+        
+        # Publish with one attribute store so lock-free readers see all of it or none
+        job.progress = JobProgress(
+            current_step=current_step,
+            steps_completed=steps_completed,
+            total_steps=total_steps,
+            items_processed=items_processed,
+            total_items=total_items,
+            percentage=percentage,
+            estimated_remaining_seconds=estimated_remaining_seconds
+        )
+        
+        self._queue_notification(job_id)
+    
+    def _queue_notification(self, job_id: str, urgent: bool = False):
+        """Mark a job as changed for the flusher thread; urgent changes wake it."""
+        with self._progress_lock:
+            self._pending_progress.add(job_id)
+            if self._progress_flusher is None:
+                self._progress_flusher = threading.Thread(
+                    target=self._run_progress_flusher, name="job-progress-flusher", daemon=True
+                )
+                self._progress_flusher.start()
+        
+        if urgent:
+            self._flush_now.set()
+    
+    def _run_progress_flusher(self):
+        """Flush queued notifications until shutdown."""
+        while not self._stop_flushing.is_set():
+            self._flush_now.wait(self.PROGRESS_FLUSH_INTERVAL)
+            self._flush_now.clear()
+            self._flush_progress()
+    
+    def _flush_progress(self):
+        """Notify callbacks once for every job whose progress changed since the last flush."""
+        with self._progress_lock:
+            pending, self._pending_progress = self._pending_progress, set()
+        
+        for job_id in pending:
+            self._notify_progress_callbacks(job_id)
     
     def add_progress_callback(self, job_id: str, callback: Callable[[Job], None]):
         """Add a progress callback for a job."""
-        with self._lock:
-            if job_id in self.progress_callbacks:
-                self.progress_callbacks[job_id].append(callback)
+        job = self.jobs.get(job_id)
+        if job:
+            with job._lock:
+                job._callbacks = job._callbacks + (callback,)
     
     def remove_progress_callback(self, job_id: str, callback: Callable[[Job], None]):
         """Remove a progress callback for a job."""
-        with self._lock:
-            if job_id in self.progress_callbacks:
+        job = self.jobs.get(job_id)
+        if job:
+            with job._lock:
+                callbacks = list(job._callbacks)
                 try:
-                    self.progress_callbacks[job_id].remove(callback)
+                    callbacks.remove(callback)
                 except ValueError:
-                    pass
+                    return
+                job._callbacks = tuple(callbacks)
     
     def cleanup_completed_jobs(self, max_age_hours: int = 24):
         """Clean up old completed jobs."""
-        cutoff = datetime.utcnow().timestamp() - (max_age_hours * 3600)
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
         
-        to_remove = []
-        for job_id, job in self.jobs.items():
-            if (job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED] and
-                job.completed_at and job.completed_at.timestamp() < cutoff):
-                to_remove.append(job_id)
+        removed = 0
+        with self._index_lock:
+            while self._finished:
+                job = next(iter(self._finished.values()))
+                if job.completed_at >= cutoff:
+                    break
+                self._remove_job(job)
+                removed += 1
         
-        with self._lock:
-            for job_id in to_remove:
-                del self.jobs[job_id]
-                if job_id in self.progress_callbacks:
-                    del self.progress_callbacks[job_id]
-                if job_id in self.running_futures:
-                    del self.running_futures[job_id]
-        
-        if to_remove:
-            logger.info(f"Cleaned up {len(to_remove)} old jobs")
+        if removed:
+            logger.info(f"Cleaned up {removed} old jobs")
     
     def _update_job_status(self, job_id: str, status: JobStatus):
         """Update job status."""
-        with self._lock:
-            job = self.jobs.get(job_id)
-            if job:
-                job.status = status
+        job = self.jobs.get(job_id)
+        if job:
+            with job._lock:
+                self._set_status(job, status)
     
     def _notify_progress_callbacks(self, job_id: str):
         """Notify all progress callbacks for a job."""
         job = self.jobs.get(job_id)
-        callbacks = self.progress_callbacks.get(job_id, [])
-        
-        for callback in callbacks:
+        if job is None:
+            return
+        for callback in job._callbacks:
             try:
                 callback(job)
             except Exception as e:
@@ -316,40 +617,64 @@ class JobManager:
         logger.info("Shutting down job manager...")
         
         # Cancel all running jobs
-        for job_id in list(self.running_futures.keys()):
-            self.cancel_job(job_id)
+        for job in list(self.jobs.values()):
+            if job._future or job._task:
+                self.cancel_job(job.id)
         
         # Shutdown executor
         self.executor.shutdown(wait=True)
+        
+        # Deliver any notifications still waiting for a flush
+        self._stop_flushing.set()
+        self._flush_now.set()
+        if self._progress_flusher is not None:
+            self._progress_flusher.join()
+        self._flush_progress()
         logger.info("Job manager shutdown complete")
 
 
-# Global job manager instance
-job_manager = JobManager()
+# Process-wide job manager, created on first use
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_manager() -> JobManager:
+    """Get the process-wide job manager, creating it on first use."""
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager()
+    return _job_manager
 
 
 def create_job(job_type: JobType, title: str, description: str, 
                total_items: int = 1, metadata: Optional[Dict[str, Any]] = None,
                created_by: Optional[str] = None) -> str:
     """Convenience function to create a job."""
-    return job_manager.create_job(job_type, title, description, total_items, metadata, created_by)
+    return get_manager().create_job(job_type, title, description, total_items, metadata, created_by)
 
 
 def start_job(job_id: str, job_function: Callable, *args, **kwargs) -> bool:
     """Convenience function to start a job."""
-    return job_manager.start_job(job_id, job_function, *args, **kwargs)
+    return get_manager().start_job(job_id, job_function, *args, **kwargs)
+
+
+def start_job_async(job_id: str, job_function: Callable[..., Awaitable[Any]], *args, **kwargs) -> bool:
+    """Convenience function to start a coroutine job on the running event loop."""
+    return get_manager().start_job_async(job_id, job_function, *args, **kwargs)
 
 
 def get_job(job_id: str) -> Optional[Job]:
     """Convenience function to get a job."""
-    return job_manager.get_job(job_id)
+    return get_manager().get_job(job_id)
 
 
 def list_jobs(**kwargs) -> List[Job]:
     """Convenience function to list jobs."""
-    return job_manager.list_jobs(**kwargs)
+    return get_manager().list_jobs(**kwargs)
 
 
 def cancel_job(job_id: str) -> bool:
     """Convenience function to cancel a job."""
-    return job_manager.cancel_job(job_id)
\ No newline at end of file
+    return get_manager().cancel_job(job_id)
\ No newline at end of file
@@ -2,18 +2,76 @@
 
 import logging
 import re
-from typing import List, Dict, Any, Optional, Tuple, Set
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+import numpy as np
+from typing import List, Dict, FrozenSet, Optional, Tuple
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, func
 from dataclasses import dataclass
 from collections import defaultdict, Counter
+from itertools import combinations
 
 from ..models import Table, Column, Relationship, DataSource
 
 logger = logging.getLogger(__name__)
 
+# Common FK naming patterns as (pattern, base confidence, pattern type)
+FK_NAME_PATTERNS = [
+    (r'^(.+)_id$', 1.0, 'exact_match'),           # product_id -> product.id
+    (r'^(.+)_fk$', 0.9, 'fk_suffix'),             # product_fk -> product.id
+    (r'^fk_(.+)$', 0.9, 'fk_prefix'),             # fk_product -> product.id
+    (r'^(.+)_key$', 0.8, 'key_suffix'),           # product_key -> product.id
+    (r'^(.+)_code$', 0.7, 'code_suffix'),         # product_code -> product.code
+    (r'^(.+)_number$', 0.6, 'number_suffix'),     # order_number -> order.number
+    (r'^(.+)_ref$', 0.8, 'ref_suffix'),           # customer_ref -> customer.id
+    (r'^ref_(.+)$', 0.8, 'ref_prefix'),           # ref_customer -> customer.id
+]
 
-@dataclass
+# A name can end in at most one of the suffixes and start with at most one
+# of the prefixes, so these two matches find every pattern above that applies
+FK_SUFFIX_PATTERN = re.compile(r'^(.+)_(id|fk|key|code|number|ref)$')
+FK_PREFIX_PATTERN = re.compile(r'^(fk|ref)_(.+)$')
+FK_SUFFIX_INDEX = {'id': 0, 'fk': 1, 'key': 3, 'code': 4, 'number': 5, 'ref': 6}
+FK_PREFIX_INDEX = {'fk': 2, 'ref': 7}
+
+# Data type families for compatibility checks
+INT_TYPES = frozenset({'integer', 'int', 'bigint', 'smallint', 'tinyint'})
+STRING_TYPES = frozenset({'varchar', 'char', 'text', 'string'})
+NUMERIC_TYPES = frozenset({'decimal', 'numeric', 'float', 'double', 'real'})
+INT_FAMILY, STRING_FAMILY, NUMERIC_FAMILY = 1, 2, 4
+
+# Compatibility of two differing types, indexed by the family bits they
+# share; integer outranks string, which outranks numeric
+TYPE_FAMILY_COMPATIBILITY = (0.3, 0.9, 0.8, 0.9, 0.7, 0.9, 0.8, 0.9)
+
+
+def type_families(data_type: str) -> int:
+    """Get the family bits of every type family a lowercased data type mentions."""
+    families = 0
+    if any(t in data_type for t in INT_TYPES):
+        families |= INT_FAMILY
+    if any(t in data_type for t in STRING_TYPES):
+        families |= STRING_FAMILY
+    if any(t in data_type for t in NUMERIC_TYPES):
+        families |= NUMERIC_FAMILY
+    return families
+
+
+@dataclass(slots=True)
+class Evidence:
+    """Why a candidate was proposed; each detection method fills in its own fields."""
+    detection_method: Optional[str] = None
+    pattern_type: Optional[str] = None
+    pattern: Optional[str] = None
+    name_confidence: Optional[float] = None
+    column_confidence: Optional[float] = None
+    type_compatibility: Optional[float] = None
+    value_overlap: Optional[float] = None
+    source_cardinality: Optional[int] = None
+    target_cardinality: Optional[int] = None
+    fk_indicators: Optional[List[str]] = None
+
+
+@dataclass(slots=True)
 class RelationshipCandidate:
     """Candidate relationship between two columns."""
     source_table: Table
@@ -22,7 +80,17 @@ class RelationshipCandidate:
     target_column: Column
     relationship_type: str
     confidence_score: float
-    evidence: Dict[str, Any]
+    evidence: Evidence
+
+
+@dataclass
+class StructuralTargets:
+    """Likely primary key columns, with their name bigrams as rows of a 0/1 matrix."""
+    columns: List[Tuple[Table, Column]]
+    table_ids: np.ndarray
+    names: np.ndarray
+    bigrams: np.ndarray
+    sizes: np.ndarray
     
 
 class RelationshipDetector:
@@ -31,6 +99,21 @@ class RelationshipDetector:
     def __init__(self, db_session: Session):
         """Initialize with database session."""
         self.db = db_session
+        # Column ID -> set of the column's profiled top values
+        self._topvals_cache: Dict[int, FrozenSet[str]] = {}
+        # Character bigram -> bit position, and name -> its bigrams as a bitmask
+        self._bigram_bits: Dict[str, int] = {}
+        self._name_bits: Dict[str, int] = {}
+        # Per-column facts read in the detection loops, by column ID
+        self._is_pk: Dict[int, bool] = {}
+        self._col_name_lower: Dict[int, str] = {}
+        self._col_data_type_lower: Dict[int, str] = {}
+        self._col_card_ratio: Dict[int, Optional[float]] = {}
+        self._col_high_cardinality: Dict[int, bool] = {}
+        self._col_type_families: Dict[int, int] = {}
+        self._table_name_lower: Dict[int, str] = {}
+        # Name a column may refer to -> (table name, name confidence) pairs
+        self._table_name_index: Dict[str, List[Tuple[str, float]]] = {}
         
     def detect_all_relationships(self, data_source_id: int) -> List[Relationship]:
         """Detect all relationships for a data source."""
@@ -42,6 +125,8 @@ class RelationshipDetector:
             logger.info("Need at least 2 tables to detect relationships")
             return []
         
+        self._index_columns(tables)
+        
         # Find relationship candidates using multiple methods
         candidates = []
         
@@ -68,10 +153,76 @@ class RelationshipDetector:
     
     def _get_tables_with_columns(self, data_source_id: int) -> List[Table]:
         """Get all tables with their columns for analysis."""
-        return self.db.query(Table).filter(
+        # Columns are read for every table, so load them in one query
+        # instead of lazily per table
+        return self.db.query(Table).options(
+            selectinload(Table.columns)
+        ).filter(
             Table.data_source_id == data_source_id
         ).all()
     
+    def _index_columns(self, tables: List[Table]):
+        """Precompute the per-column facts the detection methods look up repeatedly."""
+        self._topvals_cache.clear()
+        self._is_pk.clear()
+        self._col_name_lower.clear()
+        self._col_data_type_lower.clear()
+        self._col_card_ratio.clear()
+        self._col_high_cardinality.clear()
+        self._col_type_families.clear()
+        self._table_name_lower.clear()
+        
+        for table in tables:
+            table_name_lower = self._table_name_lower[table.id] = table.table_name.lower()
+            pk_name = f"{table_name_lower}_id"
+            for column in table.columns:
+                name_lower = column.column_name.lower()
+                self._col_name_lower[column.id] = name_lower
+                data_type_lower = self._col_data_type_lower[column.id] = column.data_type.lower()
+                self._col_type_families[column.id] = type_families(data_type_lower)
+                self._col_card_ratio[column.id] = (
+                    column.cardinality / table.row_count
+                    if column.cardinality and table.row_count else None
+                )
+                self._col_high_cardinality[column.id] = self._compute_is_high_cardinality(column, table)
+                self._is_pk[column.id] = self._compute_is_primary_key(column, table, name_lower, pk_name)
+    
+    def _get_name_lower(self, column: Column) -> str:
+        """Get a column's lowercased name."""
+        name_lower = self._col_name_lower.get(column.id)
+        return name_lower if name_lower is not None else column.column_name.lower()
+    
+    def _get_table_name_lower(self, table: Table) -> str:
+        """Get a table's lowercased name."""
+        name_lower = self._table_name_lower.get(table.id)
+        return name_lower if name_lower is not None else table.table_name.lower()
+    
+    def _get_data_type_lower(self, column: Column) -> str:
+        """Get a column's lowercased data type."""
+        data_type_lower = self._col_data_type_lower.get(column.id)
+        return data_type_lower if data_type_lower is not None else column.data_type.lower()
+    
+    def _get_type_families(self, column: Column) -> int:
+        """Get the family bits of a column's data type."""
+        families = self._col_type_families.get(column.id)
+        return families if families is not None else type_families(self._get_data_type_lower(column))
+    
+    def _get_cardinality_ratio(self, column: Column, table: Table) -> Optional[float]:
+        """Get a column's distinct values per table row, or None if unknown."""
+        if column.id in self._col_card_ratio:
+            return self._col_card_ratio[column.id]
+        return column.cardinality / table.row_count if column.cardinality and table.row_count else None
+    
+    def _is_high_cardinality(self, column: Column, table: Table) -> bool:
+        """Check whether nearly every row of a table has a distinct value in a column."""
+        is_high = self._col_high_cardinality.get(column.id)
+        return is_high if is_high is not None else self._compute_is_high_cardinality(column, table)
+    
+    def _compute_is_high_cardinality(self, column: Column, table: Table) -> bool:
+        """Decide whether a column has a distinct value for at least 95% of its table's rows."""
+        return bool(column.cardinality and table.row_count and
+                    column.cardinality >= table.row_count * 0.95)
+    
     def _detect_foreign_key_relationships(self, tables: List[Table]) -> List[RelationshipCandidate]:
         """Detect explicit foreign key relationships."""
         candidates = []
@@ -87,73 +238,60 @@ class RelationshipDetector:
         candidates = []
         
         # Build lookup maps
-        table_by_name = {t.table_name.lower(): t for t in tables}
+        table_by_name = {self._get_table_name_lower(t): t for t in tables}
         columns_by_table = {t.id: t.columns for t in tables}
-        
-        # Common FK naming patterns
-        fk_patterns = [
-            (r'^(.+)_id$', 1.0, 'exact_match'),           # product_id -> product.id
-            (r'^(.+)_fk$', 0.9, 'fk_suffix'),             # product_fk -> product.id
-            (r'^fk_(.+)$', 0.9, 'fk_prefix'),             # fk_product -> product.id
-            (r'^(.+)_key$', 0.8, 'key_suffix'),           # product_key -> product.id
-            (r'^(.+)_code$', 0.7, 'code_suffix'),         # product_code -> product.code
-            (r'^(.+)_number$', 0.6, 'number_suffix'),     # order_number -> order.number
-            (r'^(.+)_ref$', 0.8, 'ref_suffix'),           # customer_ref -> customer.id
-            (r'^ref_(.+)$', 0.8, 'ref_prefix'),           # ref_customer -> customer.id
-        ]
+        self._table_name_index = self._build_table_name_index(table_by_name)
         
         for source_table in tables:
             for source_column in source_table.columns:
-                source_col_lower = source_column.column_name.lower()
+                source_col_lower = self._get_name_lower(source_column)
                 
                 # Skip if it's a likely primary key
                 if self._is_likely_primary_key(source_column):
                     continue
                 
-                for pattern, base_confidence, pattern_type in fk_patterns:
-                    match = re.match(pattern, source_col_lower)
-                    if match:
-                        potential_table_name = match.group(1)
+                for pattern_index, potential_table_name in self._match_fk_patterns(source_col_lower):
+                    pattern, base_confidence, pattern_type = FK_NAME_PATTERNS[pattern_index]
+                    
+                    # Look for target table (handle plural/singular variations)
+                    target_candidates = self._find_table_candidates(potential_table_name)
+                    
+                    for target_table_name, name_confidence in target_candidates:
+                        target_table = table_by_name[target_table_name]
                         
-                        # Look for target table (handle plural/singular variations)
-                        target_candidates = self._find_table_candidates(potential_table_name, table_by_name)
+                        # Find potential target columns (PK, unique keys, etc.)
+                        target_columns = self._find_target_columns(target_table, pattern_type)
                         
-                        for target_table_name, name_confidence in target_candidates:
-                            target_table = table_by_name[target_table_name]
+                        for target_column, col_confidence in target_columns:
+                            # Calculate overall confidence
+                            confidence = base_confidence * name_confidence * col_confidence
                             
-                            # Find potential target columns (PK, unique keys, etc.)
-                            target_columns = self._find_target_columns(target_table, pattern_type)
+                            # Type compatibility check
+                            type_compatibility = self._check_type_compatibility(
+                                source_column, target_column
+                            )
+                            confidence *= type_compatibility
                             
-                            for target_column, col_confidence in target_columns:
-                                # Calculate overall confidence
-                                confidence = base_confidence * name_confidence * col_confidence
-                                
-                                # Type compatibility check
-                                type_compatibility = self._check_type_compatibility(
-                                    source_column, target_column
+                            if confidence > 0.3:  # Threshold for consideration
+                                relationship_type = self._infer_relationship_type(
+                                    source_column, target_column, source_table, target_table
                                 )
-                                confidence *= type_compatibility
                                 
-                                if confidence > 0.3:  # Threshold for consideration
-                                    relationship_type = self._infer_relationship_type(
-                                        source_column, target_column, source_table, target_table
+                                candidates.append(RelationshipCandidate(
+                                    source_table=source_table,
+                                    source_column=source_column,
+                                    target_table=target_table,
+                                    target_column=target_column,
+                                    relationship_type=relationship_type,
+                                    confidence_score=confidence,
+                                    evidence=Evidence(
+                                        pattern_type=pattern_type,
+                                        pattern=pattern,
+                                        name_confidence=name_confidence,
+                                        column_confidence=col_confidence,
+                                        type_compatibility=type_compatibility
                                     )
-                                    
-                                    candidates.append(RelationshipCandidate(
-                                        source_table=source_table,
-                                        source_column=source_column,
-                                        target_table=target_table,
-                                        target_column=target_column,
-                                        relationship_type=relationship_type,
-                                        confidence_score=confidence,
-                                        evidence={
-                                            'pattern_type': pattern_type,
-                                            'pattern': pattern,
-                                            'name_confidence': name_confidence,
-                                            'column_confidence': col_confidence,
-                                            'type_compatibility': type_compatibility
-                                        }
-                                    ))
+                                ))
         
         logger.debug(f"Found {len(candidates)} naming pattern candidates")
         return candidates
@@ -162,44 +300,62 @@ class RelationshipDetector:
         """Detect relationships based on data distribution and cardinality."""
         candidates = []
         
-        for source_table in tables:
-            for source_column in source_table.columns:
-                # Skip if no cardinality data
-                if not source_column.cardinality or not source_column.top_values:
-                    continue
-                
-                for target_table in tables:
-                    if target_table.id == source_table.id:
-                        continue
-                    
-                    for target_column in target_table.columns:
-                        if not target_column.cardinality or not target_column.top_values:
-                            continue
-                        
-                        # Check if there's significant value overlap
-                        overlap_score = self._calculate_value_overlap(source_column, target_column)
-                        
-                        if overlap_score > 0.5:  # Significant overlap
-                            # Analyze cardinality patterns
-                            relationship_type, confidence = self._analyze_cardinality_pattern(
-                                source_column, target_column, source_table, target_table
-                            )
-                            
-                            if confidence > 0.4:
-                                candidates.append(RelationshipCandidate(
-                                    source_table=source_table,
-                                    source_column=source_column,
-                                    target_table=target_table,
-                                    target_column=target_column,
-                                    relationship_type=relationship_type,
-                                    confidence_score=confidence,
-                                    evidence={
-                                        'detection_method': 'statistical',
-                                        'value_overlap': overlap_score,
-                                        'source_cardinality': source_column.cardinality,
-                                        'target_cardinality': target_column.cardinality
-                                    }
-                                ))
+        # Profiled columns in scan order, with their top values
+        profiled = []
+        for table in tables:
+            for column in table.columns:
+                if column.cardinality and column.top_values:
+                    values = self._get_top_values(column)
+                    if values:
+                        profiled.append((table, column, values))
+        
+        # Only columns sharing a top value can overlap, so count shared
+        # values per pair from an inverted index instead of comparing every pair
+        postings = defaultdict(list)
+        for position, (_, _, values) in enumerate(profiled):
+            for value in values:
+                postings[value].append(position)
+        
+        shared = Counter()
+        for positions in postings.values():
+            shared.update(combinations(positions, 2))
+        
+        # Both directions of each overlapping pair, in the order a full scan visits them
+        pairs = []
+        for (a, b), intersection in shared.items():
+            if profiled[a][0].id == profiled[b][0].id:
+                continue
+            
+            overlap_score = intersection / (len(profiled[a][2]) + len(profiled[b][2]) - intersection)
+            if overlap_score > 0.5:  # Significant overlap
+                pairs.append((a, b, overlap_score))
+                pairs.append((b, a, overlap_score))
+        pairs.sort()
+        
+        for source, target, overlap_score in pairs:
+            source_table, source_column, _ = profiled[source]
+            target_table, target_column, _ = profiled[target]
+            
+            # Analyze cardinality patterns
+            relationship_type, confidence = self._analyze_cardinality_pattern(
+                source_column, target_column, source_table, target_table
+            )
+            
+            if confidence > 0.4:
+                candidates.append(RelationshipCandidate(
+                    source_table=source_table,
+                    source_column=source_column,
+                    target_table=target_table,
+                    target_column=target_column,
+                    relationship_type=relationship_type,
+                    confidence_score=confidence,
+                    evidence=Evidence(
+                        detection_method='statistical',
+                        value_overlap=overlap_score,
+                        source_cardinality=source_column.cardinality,
+                        target_cardinality=target_column.cardinality
+                    )
+                ))
         
         logger.debug(f"Found {len(candidates)} statistical candidates")
         return candidates
@@ -208,13 +364,15 @@ class RelationshipDetector:
         """Detect relationships based on column structure and constraints."""
         candidates = []
         
+        structural_targets = self._index_structural_targets(tables)
+        
         # Find columns that look like foreign keys based on structure
         for source_table in tables:
             for source_column in source_table.columns:
                 # Look for structural FK indicators
                 if self._has_fk_structure(source_column):
                     # Find potential target tables/columns
-                    potential_targets = self._find_structural_targets(source_column, tables)
+                    potential_targets = self._find_structural_targets(source_column, structural_targets)
                     
                     for target_table, target_column, confidence in potential_targets:
                         relationship_type = self._infer_relationship_type(
@@ -228,51 +386,57 @@ class RelationshipDetector:
                             target_column=target_column,
                             relationship_type=relationship_type,
                             confidence_score=confidence,
-                            evidence={
-                                'detection_method': 'structural',
-                                'fk_indicators': self._get_fk_indicators(source_column)
-                            }
+                            evidence=Evidence(
+                                detection_method='structural',
+                                fk_indicators=self._get_fk_indicators(source_column)
+                            )
                         ))
         
         logger.debug(f"Found {len(candidates)} structural candidates")
         return candidates
     
-    def _find_table_candidates(self, table_name: str, table_by_name: Dict[str, Table]) -> List[Tuple[str, float]]:
-        """Find table candidates for a given name, handling plural/singular variations."""
-        candidates = []
-        
-        # Exact match
-        if table_name in table_by_name:
-            candidates.append((table_name, 1.0))
-        
-        # Plural variations
-        plural_forms = [
-            table_name + 's',
-            table_name + 'es',
-            table_name + 'ies' if table_name.endswith('y') else None
-        ]
-        
-        for plural in plural_forms:
-            if plural and plural in table_by_name:
-                candidates.append((plural, 0.9))
+    def _match_fk_patterns(self, column_name: str) -> List[Tuple[int, str]]:
+        """Get (index into FK_NAME_PATTERNS, referenced name) for every pattern a column name matches."""
+        matches = []
         
-        # Singular variations (if input was plural)
-        if table_name.endswith('s') and len(table_name) > 1:
-            singular = table_name[:-1]
-            if singular in table_by_name:
-                candidates.append((singular, 0.9))
+        match = FK_SUFFIX_PATTERN.match(column_name)
+        if match:
+            matches.append((FK_SUFFIX_INDEX[match.group(2)], match.group(1)))
         
-        if table_name.endswith('es') and len(table_name) > 2:
-            singular = table_name[:-2]
-            if singular in table_by_name:
-                candidates.append((singular, 0.9))
+        match = FK_PREFIX_PATTERN.match(column_name)
+        if match:
+            matches.append((FK_PREFIX_INDEX[match.group(1)], match.group(2)))
         
-        if table_name.endswith('ies') and len(table_name) > 3:
-            singular = table_name[:-3] + 'y'
-            if singular in table_by_name:
-                candidates.append((singular, 0.9))
-        
-        return candidates
+        # Keep the order the patterns are listed in
+        matches.sort()
+        return matches
+    
+    def _build_table_name_index(self, table_by_name: Dict[str, Table]) -> Dict[str, List[Tuple[str, float]]]:
+        """Map every name a column can refer to onto the tables it matches, handling plural/singular variations."""
+        ranked = defaultdict(list)
+        for name in table_by_name:
+            # (lookup name, rank, confidence); the rank keeps each lookup's
+            # tables in exact, plural, then singular order
+            forms = [(name, 0, 1.0), (name + 's', 4, 0.9), (name + 'es', 5, 0.9)]
+            if name.endswith('s'):
+                forms.append((name[:-1], 1, 0.9))
+            if name.endswith('es'):
+                forms.append((name[:-2], 2, 0.9))
+            if name.endswith('yies'):
+                forms.append((name[:-3], 3, 0.9))
+            if name.endswith('y') and len(name) > 1:
+                forms.append((name[:-1] + 'ies', 6, 0.9))
+            for lookup_name, rank, confidence in forms:
+                ranked[lookup_name].append((rank, name, confidence))
+        
+        return {
+            lookup_name: [(name, confidence) for _, name, confidence in sorted(entries)]
+            for lookup_name, entries in ranked.items()
+        }
+    
+    def _find_table_candidates(self, table_name: str) -> List[Tuple[str, float]]:
+        """Find table candidates for a given name, handling plural/singular variations."""
+        return self._table_name_index.get(table_name, [])
     
     def _find_target_columns(self, table: Table, pattern_type: str) -> List[Tuple[Column, float]]:
         """Find potential target columns in a table."""
@@ -286,14 +450,13 @@ class RelationshipDetector:
                 confidence = 1.0
             
             # Unique columns get high priority
-            elif column.is_key or (column.cardinality and table.row_count and 
-                                 column.cardinality >= table.row_count * 0.95):
+            elif column.is_key or self._is_high_cardinality(column, table):
                 confidence = 0.9
             
             # For specific patterns, look for matching column names
-            elif pattern_type == 'code_suffix' and 'code' in column.column_name.lower():
+            elif pattern_type == 'code_suffix' and 'code' in self._get_name_lower(column):
                 confidence = 0.8
-            elif pattern_type == 'number_suffix' and 'number' in column.column_name.lower():
+            elif pattern_type == 'number_suffix' and 'number' in self._get_name_lower(column):
                 confidence = 0.8
             
             # Default for non-nullable columns
@@ -311,73 +474,55 @@ class RelationshipDetector:
     
     def _is_likely_primary_key(self, column: Column) -> bool:
         """Check if a column is likely a primary key."""
-        col_name_lower = column.column_name.lower()
-        
+        is_pk = self._is_pk.get(column.id)
+        if is_pk is None:
+            table = column.table
+            is_pk = self._compute_is_primary_key(
+                column, table, self._get_name_lower(column), f"{self._get_table_name_lower(table)}_id"
+            )
+        return is_pk
+    
+    def _compute_is_primary_key(self, column: Column, table: Table, name_lower: str, pk_name: str) -> bool:
+        """Decide whether a column looks like its table's primary key."""
         # Common PK naming patterns
-        pk_patterns = ['id', 'pk', f"{column.table.table_name.lower()}_id"]
-        
-        if col_name_lower in pk_patterns:
+        if name_lower in ('id', 'pk', pk_name):
             return True
         
         # Check if it's marked as key and has high cardinality
-        if (column.is_key and column.cardinality and column.table.row_count and
-            column.cardinality >= column.table.row_count * 0.95):
+        if column.is_key and self._is_high_cardinality(column, table):
             return True
         
         return False
     
     def _check_type_compatibility(self, source_column: Column, target_column: Column) -> float:
         """Check data type compatibility between columns."""
-        source_type = source_column.data_type.lower()
-        target_type = target_column.data_type.lower()
+        source_type = self._get_data_type_lower(source_column)
+        target_type = self._get_data_type_lower(target_column)
         
         # Exact match
         if source_type == target_type:
             return 1.0
         
-        # Integer types
-        int_types = {'integer', 'int', 'bigint', 'smallint', 'tinyint'}
-        if any(t in source_type for t in int_types) and any(t in target_type for t in int_types):
-            return 0.9
-        
-        # String types
-        string_types = {'varchar', 'char', 'text', 'string'}
-        if any(t in source_type for t in string_types) and any(t in target_type for t in string_types):
-            return 0.8
-        
-        # Numeric types
-        numeric_types = {'decimal', 'numeric', 'float', 'double', 'real'}
-        if any(t in source_type for t in numeric_types) and any(t in target_type for t in numeric_types):
-            return 0.7
-        
-        # Different types but could work
-        return 0.3
+        # Integer, string or numeric types in common; different types could still work
+        shared = self._get_type_families(source_column) & self._get_type_families(target_column)
+        return TYPE_FAMILY_COMPATIBILITY[shared]
     
-    def _calculate_value_overlap(self, source_column: Column, target_column: Column) -> float:
-        """Calculate the overlap in top values between two columns."""
-        if not source_column.top_values or not target_column.top_values:
-            return 0.0
-        
-        source_values = set(source_column.top_values.keys()) if isinstance(source_column.top_values, dict) else set()
-        target_values = set(target_column.top_values.keys()) if isinstance(target_column.top_values, dict) else set()
-        
-        if not source_values or not target_values:
-            return 0.0
-        
-        intersection = source_values.intersection(target_values)
-        union = source_values.union(target_values)
-        
-        return len(intersection) / len(union) if union else 0.0
+    def _get_top_values(self, column: Column) -> FrozenSet[str]:
+        """Get the set of a column's profiled top values, cached per column."""
+        values = self._topvals_cache.get(column.id)
+        if values is None:
+            top_values = column.top_values
+            values = frozenset(top_values.keys()) if isinstance(top_values, dict) else frozenset()
+            self._topvals_cache[column.id] = values
+        return values
     
     def _analyze_cardinality_pattern(self, source_column: Column, target_column: Column, 
                                    source_table: Table, target_table: Table) -> Tuple[str, float]:
         """Analyze cardinality patterns to determine relationship type and confidence."""
         
         # Get cardinality ratios
-        source_ratio = (source_column.cardinality / source_table.row_count 
-                       if source_column.cardinality and source_table.row_count else 0)
-        target_ratio = (target_column.cardinality / target_table.row_count 
-                       if target_column.cardinality and target_table.row_count else 0)
+        source_ratio = self._get_cardinality_ratio(source_column, source_table) or 0
+        target_ratio = self._get_cardinality_ratio(target_column, target_table) or 0
         
         # High cardinality in target suggests it's a primary key
         if target_ratio > 0.95:
@@ -400,52 +545,91 @@ class RelationshipDetector:
             return False
         
         # Has FK-like naming
-        col_name_lower = column.column_name.lower()
+        col_name_lower = self._get_name_lower(column)
         fk_indicators = ['_id', '_key', '_fk', 'ref_', '_ref', '_code']
         
         return any(indicator in col_name_lower for indicator in fk_indicators)
     
-    def _find_structural_targets(self, source_column: Column, tables: List[Table]) -> List[Tuple[Table, Column, float]]:
+    def _index_structural_targets(self, tables: List[Table]) -> StructuralTargets:
+        """Collect the likely primary key columns every structural source is compared against."""
+        columns = [
+            (table, column)
+            for table in tables
+            for column in table.columns
+            if self._is_likely_primary_key(column)
+        ]
+        names = [self._get_name_lower(column) for _, column in columns]
+        name_bits = [self._get_name_bits(name) for name in names]
+        
+        width = len(self._bigram_bits)
+        bigrams = np.zeros((len(columns), width), dtype=np.int32)
+        for row, bits in enumerate(name_bits):
+            bigrams[row] = self._unpack_name_bits(bits, width)
+        
+        return StructuralTargets(
+            columns=columns,
+            table_ids=np.array([table.id for table, _ in columns], dtype=np.int64),
+            names=np.array(names, dtype=object),
+            bigrams=bigrams,
+            sizes=bigrams.sum(axis=1)
+        )
+    
+    def _find_structural_targets(self, source_column: Column,
+                                 structural_targets: StructuralTargets) -> List[Tuple[Table, Column, float]]:
         """Find structural targets for a potential foreign key column."""
         targets = []
-        
-        # Simple implementation - look for similarly named columns in other tables
-        col_name_lower = source_column.column_name.lower()
-        
-        for table in tables:
-            if table.id == source_column.table_id:
-                continue
-            
-            for column in table.columns:
-                if self._is_likely_primary_key(column):
-                    # Check name similarity
-                    similarity = self._calculate_name_similarity(col_name_lower, column.column_name.lower())
-                    if similarity > 0.5:
-                        targets.append((table, column, similarity * 0.7))
+        if not structural_targets.columns:
+            return targets
+        
+        # Simple implementation - look for similarly named columns in other tables,
+        # scoring the bigram Jaccard similarity against all of them at once
+        col_name_lower = self._get_name_lower(source_column)
+        width = structural_targets.bigrams.shape[1]
+        source_bits = self._get_name_bits(col_name_lower)
+        source_size = source_bits.bit_count()
+        
+        # Bigrams no target has cannot be shared, so only the first width bits count
+        intersection = structural_targets.bigrams @ self._unpack_name_bits(source_bits, width)
+        union = source_size + structural_targets.sizes - intersection
+        
+        # Names without bigrams only match themselves
+        empty = (structural_targets.sizes == 0) | (source_size == 0)
+        similarities = np.where(
+            empty,
+            (structural_targets.names == col_name_lower).astype(np.float64),
+            intersection / np.where(empty, 1, union)
+        )
+        
+        matches = (structural_targets.table_ids != source_column.table_id) & (similarities > 0.5)
+        for i in np.flatnonzero(matches):
+            table, column = structural_targets.columns[i]
+            targets.append((table, column, float(similarities[i]) * 0.7))
         
         return targets
     
-    def _calculate_name_similarity(self, name1: str, name2: str) -> float:
-        """Calculate similarity between two column names."""
-        # Simple Jaccard similarity on character n-grams
-        def get_ngrams(s: str, n: int = 2) -> Set[str]:
-            return set(s[i:i+n] for i in range(len(s) - n + 1))
-        
-        ngrams1 = get_ngrams(name1)
-        ngrams2 = get_ngrams(name2)
-        
-        if not ngrams1 or not ngrams2:
-            return 1.0 if name1 == name2 else 0.0
-        
-        intersection = ngrams1.intersection(ngrams2)
-        union = ngrams1.union(ngrams2)
-        
-        return len(intersection) / len(union)
+    def _get_name_bits(self, name: str) -> int:
+        """Get a name's character bigrams as a bitmask, cached per name."""
+        bits = self._name_bits.get(name)
+        if bits is None:
+            bits = 0
+            for i in range(len(name) - 1):
+                bigram = name[i:i + 2]
+                position = self._bigram_bits.get(bigram)
+                if position is None:
+                    position = self._bigram_bits[bigram] = len(self._bigram_bits)
+                bits |= 1 << position
+            self._name_bits[name] = bits
+        return bits
+    
+    def _unpack_name_bits(self, bits: int, width: int) -> np.ndarray:
+        """Expand the first width bits of a bigram bitmask into a 0/1 vector."""
+        packed = (bits & ((1 << width) - 1)).to_bytes((width + 7) // 8, 'little')
+        return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=width, bitorder='little').astype(np.int32)
     
     def _get_fk_indicators(self, column: Column) -> List[str]:
         """Get list of foreign key indicators for a column."""
         indicators = []
-        col_name_lower = column.column_name.lower()
+        col_name_lower = self._get_name_lower(column)
         
         if '_id' in col_name_lower:
             indicators.append('id_suffix')
@@ -463,11 +647,10 @@ class RelationshipDetector:
         """Infer the type of relationship between two columns."""
         
         # Check cardinalities if available
-        if (source_column.cardinality and target_column.cardinality and 
-            source_table.row_count and target_table.row_count):
-            
-            source_uniqueness = source_column.cardinality / source_table.row_count
-            target_uniqueness = target_column.cardinality / target_table.row_count
+        source_uniqueness = self._get_cardinality_ratio(source_column, source_table)
+        target_uniqueness = self._get_cardinality_ratio(target_column, target_table)
+        
+        if source_uniqueness is not None and target_uniqueness is not None:
             
             # Both are unique -> one-to-one
             if source_uniqueness > 0.95 and target_uniqueness > 0.95:
@@ -508,36 +691,42 @@ class RelationshipDetector:
     
     def _save_relationships(self, candidates: List[RelationshipCandidate]) -> List[Relationship]:
         """Save relationship candidates to database."""
-        saved_relationships = []
+        if not candidates:
+            return []
         
+        # Check which relationships already exist with one query for all candidates
+        source_table_ids = {candidate.source_table.id for candidate in candidates}
+        existing = {
+            tuple(row) for row in self.db.query(
+                Relationship.source_table_id,
+                Relationship.source_column_id,
+                Relationship.target_table_id,
+                Relationship.target_column_id
+            ).filter(Relationship.source_table_id.in_(source_table_ids))
+        }
+        
+        saved_relationships = []
         for candidate in candidates:
-            # Check if relationship already exists
-            existing = self.db.query(Relationship).filter(
-                and_(
-                    Relationship.source_table_id == candidate.source_table.id,
-                    Relationship.source_column_id == candidate.source_column.id,
-                    Relationship.target_table_id == candidate.target_table.id,
-                    Relationship.target_column_id == candidate.target_column.id
-                )
-            ).first()
+            key = (candidate.source_table.id, candidate.source_column.id,
+                   candidate.target_table.id, candidate.target_column.id)
+            if key in existing:
+                continue
             
-            if not existing:
-                relationship = Relationship(
-                    source_table_id=candidate.source_table.id,
-                    source_column_id=candidate.source_column.id,
-                    target_table_id=candidate.target_table.id,
-                    target_column_id=candidate.target_column.id,
-                    relationship_type=candidate.relationship_type,
-                    confidence_score=candidate.confidence_score,
-                    heuristic_score=candidate.confidence_score,
-                    is_validated=False
-                )
-                
-                self.db.add(relationship)
-                saved_relationships.append(relationship)
+            saved_relationships.append(Relationship(
+                source_table_id=candidate.source_table.id,
+                source_column_id=candidate.source_column.id,
+                target_table_id=candidate.target_table.id,
+                target_column_id=candidate.target_column.id,
+                relationship_type=candidate.relationship_type,
+                confidence_score=candidate.confidence_score,
+                heuristic_score=candidate.confidence_score,
+                is_validated=False
+            ))
         
         if saved_relationships:
+            # Flushed as one batched INSERT
+            self.db.add_all(saved_relationships)
             self.db.commit()
             logger.info(f"Saved {len(saved_relationships)} new relationships")
         
-        return saved_relationships
\ No newline at end of file
+        return saved_relationships
@@ -0,0 +1,307 @@
+"""Semantic cache for LLM generation results."""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("DBDOC_CACHE_DIR", ".dbdoc_cache")
+
+# Stateless, so one instance is shared by every cache
+_vectorizer = HashingVectorizer(
+    analyzer="char_wb",
+    ngram_range=(3, 5),
+    n_features=2 ** 18,
+    alternate_sign=False,
+    norm="l2"
+)
+
+
+def embed(texts: List[str]) -> sparse.csr_matrix:
+    """Embed texts as L2-normalized sparse row vectors."""
+    return _vectorizer.transform(texts)
+
+
+def similarity(a: str, b: str) -> float:
+    """Cosine similarity of two texts."""
+    vectors = embed([a, b])
+    return float((vectors[0] @ vectors[1].T).toarray()[0, 0])
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of LLM results keyed on prompt context.
+
+    Contexts are embedded with a hashed character n-gram vectorizer whose
+    rows are L2-normalized, so cosine similarity is a sparse dot product.
+    Entries are partitioned by an exact key (e.g. column name and type) so
+    near-identical contexts for different columns never share a result; a
+    lookup returns the result of the most similar context in the key's
+    partition when the similarity reaches the threshold.
+    """
+
+    def __init__(self, threshold: float = 0.95, path: Optional[str] = None):
+        """Initialize with a similarity threshold and optional file to persist to."""
+        self.threshold = threshold
+        self.path = path
+        self._entries: List[Tuple[str, str, Dict[str, Any]]] = []
+        # Key -> (stacked context vectors, vectors added since, results)
+        self._partitions: Dict[str, Tuple[Optional[sparse.csr_matrix], List[sparse.csr_matrix], List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str, context: str) -> Optional[Dict[str, Any]]:
+        """Get the result stored for the most similar context under a key, or None."""
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is None:
+                return None
+
+            matrix, pending, results = partition
+            if pending:
+                # Stack vectors added since the last lookup in one go
+                matrix = sparse.vstack(([matrix] if matrix is not None else []) + pending, format="csr")
+                self._partitions[key] = (matrix, [], results)
+
+            similarities = (matrix @ embed([context]).T).toarray().ravel()
+            best = int(similarities.argmax())
+            if similarities[best] < self.threshold:
+                return None
+            return dict(results[best])
+
+    def add(self, key: str, context: str, result: Dict[str, Any]) -> None:
+        """Store a result for a context under a key."""
+        with self._lock:
+            entry = (key, context, dict(result))
+            self._entries.append(entry)
+            self._index(key, embed([context]), dict(result))
+
+            if self.path:
+                self._append(entry)
+
+    def _index(self, key: str, vector: sparse.csr_matrix, result: Dict[str, Any]) -> None:
+        """Queue an embedded context for its key's partition."""
+        partition = self._partitions.get(key)
+        if partition is None:
+            self._partitions[key] = (None, [vector], [result])
+        else:
+            partition[1].append(vector)
+            partition[2].append(result)
+
+    def _load(self) -> None:
+        """Load stored entries, re-embedding their contexts in one pass."""
+        try:
+            with open(self.path, "rb") as f:
+                while True:
+                    try:
+                        record = pickle.load(f)
+                    except EOFError:
+                        break
+                    except pickle.UnpicklingError:
+                        # A write cut short by a crash; keep what came before it
+                        logger.warning(f"Ignoring truncated entry at the end of {self.path}")
+                        break
+                    # Files written before entries were appended hold one list
+                    if isinstance(record, list):
+                        self._entries.extend(record)
+                    else:
+                        self._entries.append(record)
+
+            if self._entries:
+                vectors = embed([context for _, context, _ in self._entries])
+                rows: Dict[str, List[int]] = {}
+                for i, (key, _, _) in enumerate(self._entries):
+                    rows.setdefault(key, []).append(i)
+                for key, indices in rows.items():
+                    self._partitions[key] = (
+                        vectors[indices], [], [dict(self._entries[i][2]) for i in indices]
+                    )
+        except Exception as e:
+            logger.warning(f"Failed to load semantic cache from {self.path}: {e}")
+            self._entries, self._partitions = [], {}
+
+    def _append(self, entry: Tuple[str, str, Dict[str, Any]]) -> None:
+        """Append one entry to the cache file; vectors are rebuilt on load."""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                pickle.dump(entry, f)
+        except OSError as e:
+            logger.warning(f"Failed to save semantic cache to {self.path}: {e}")
+
+
+class ProgramCache:
+    """
+    Per-key description templates synthesized from accumulated LLM results.
+
+    Once enough results for a key have been recorded, the AI service asks
+    the LLM once for a template that reproduces them from the column's
+    name, type and table. A template is only installed if it reproduces
+    the recorded examples; afterwards it answers that key locally.
+    Templates are plain string.Template substitutions, never code.
+    """
+
+    FIELDS = ("table_name", "column_name", "data_type", "nullable")
+    TEMPLATE_KEYS = ("description", "suggested_name", "reasoning", "business_domain", "data_quality_warning")
+
+    def __init__(self, directory: Optional[str] = None, min_examples: int = 20,
+                 min_match_rate: float = 0.9, min_similarity: float = 0.7):
+        """Initialize with the directory templates are stored in and validation thresholds."""
+        self.directory = directory
+        self.min_examples = min_examples
+        self.min_match_rate = min_match_rate
+        self.min_similarity = min_similarity
+        self._examples: Dict[str, List[Tuple[Dict[str, str], Dict[str, Any]]]] = {}
+        self._programs: Dict[str, Dict[str, Any]] = {}
+        self._attempted: set = set()
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Render the key's template for a column, or None if it has none."""
+        program = self._programs.get(key)
+        if program is None:
+            program = self._load(key)
+            if program is None:
+                return None
+        return self._render(program, fields)
+
+    def record(self, key: str, fields: Dict[str, str],
+               result: Dict[str, Any]) -> Optional[List[Tuple[Dict[str, str], Dict[str, Any]]]]:
+        """Record an LLM result; returns the examples once the key is ready for synthesis."""
+        with self._lock:
+            if key in self._attempted:
+                return None
+            examples = self._examples.setdefault(key, [])
+            examples.append((dict(fields), dict(result)))
+            if len(examples) < self.min_examples:
+                return None
+            self._attempted.add(key)
+            return self._examples.pop(key)
+
+    def install(self, key: str, program: Dict[str, Any],
+                examples: List[Tuple[Dict[str, str], Dict[str, Any]]]) -> bool:
+        """Install a synthesized template if it reproduces enough of the examples."""
+        matches = 0
+        for fields, expected in examples:
+            rendered = self._render(program, fields)
+            if (rendered is not None
+                    and rendered["suggested_is_pii"] == expected.get("suggested_is_pii")
+                    and similarity(rendered["description"], expected.get("description", "")) >= self.min_similarity):
+                matches += 1
+
+        if matches < self.min_match_rate * len(examples):
+            logger.info(f"Rejected synthesized template for {key}: {matches}/{len(examples)} examples matched")
+            return False
+
+        self._programs[key] = program
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._path(key), "w") as f:
+                    json.dump({"key": key, "program": program}, f)
+            except OSError as e:
+                logger.warning(f"Failed to save synthesized template for {key}: {e}")
+
+        logger.info(f"Installed synthesized template for {key}")
+        return True
+
+    def _render(self, program: Dict[str, Any], fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Substitute column fields into a template."""
+        try:
+            rendered = {
+                name: Template(program[name]).substitute(fields) if program.get(name) else None
+                for name in self.TEMPLATE_KEYS
+            }
+            return {
+                "description": rendered["description"] or "",
+                "suggested_name": rendered["suggested_name"],
+                "confidence_score": float(program.get("confidence_score", 0.5)),
+                "reasoning": rendered["reasoning"] or "",
+                "suggested_is_pii": bool(program.get("is_pii", False)),
+                "suggested_business_domain": rendered["business_domain"],
+                "data_quality_warning": rendered["data_quality_warning"],
+            }
+        except (KeyError, ValueError, TypeError):
+            return None
+
+    def _path(self, key: str) -> str:
+        """Get the file a key's template is stored in."""
+        return os.path.join(self.directory, f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.json")
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load a key's template from disk if one was installed earlier."""
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with open(self._path(key)) as f:
+                data = json.load(f)
+            if data.get("key") != key:
+                return None
+            self._programs[key] = data["program"]
+            return data["program"]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load synthesized template for {key}: {e}")
+            return None
+
+
+class ResponseCache:
+    """
+    Exact-match cache of raw LLM responses, keyed by a hash of the request.
+
+    Complements SemanticCache for re-runs over an unchanged schema: the
+    same model, prompt version and prompt always get the stored response
+    without calling the LLM. Responses are kept in memory and, when a
+    directory is given, written to one file per key.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """Initialize with the directory responses are stored in."""
+        self.directory = directory
+        self._responses: Dict[str, str] = {}
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """Hash the parts of a request into a cache key."""
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the stored response for a key, or None."""
+        response = self._responses.get(key)
+        if response is None and self.directory and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    response = self._responses[key] = f.read()
+            except OSError as e:
+                logger.warning(f"Failed to load cached LLM response {key}: {e}")
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """Store the response for a key."""
+        self._responses[key] = response
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = f"{self._path(key)}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(response)
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                logger.warning(f"Failed to save cached LLM response {key}: {e}")
+
+    def _path(self, key: str) -> str:
+        """Get the file a key's response is stored in."""
+        return os.path.join(self.directory, f"{key}.txt")
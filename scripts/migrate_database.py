@@ -59,6 +59,27 @@ def migrate_data_sources():
     for column_def in new_columns:
         add_column_if_not_exists(engine, 'data_sources', column_def)
 
+def create_indexes():
+    """Create indexes added to existing tables, which create_all skips."""
+    print("Creating indexes...")
+    
+    if not check_table_exists(engine, 'ai_descriptions'):
+        print("→ Table ai_descriptions does not exist yet")
+        return
+    
+    try:
+        with engine.connect() as conn:
+            # Superseded by the partial index on pending rows
+            conn.execute(text("DROP INDEX IF EXISTS ix_ai_descriptions_status"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_ai_descriptions_pending "
+                "ON ai_descriptions (status) WHERE status = 'PENDING'"
+            ))
+            conn.commit()
+            print("✓ Created index ix_ai_descriptions_pending")
+    except Exception as e:
+        print(f"✗ Failed to create index ix_ai_descriptions_pending: {e}")
+
 def create_new_tables():
     """Create new tables if they don't exist."""
     print("Creating new tables...")
@@ -96,6 +117,9 @@ def main():
         create_new_tables() 
         print()
         
+        create_indexes()
+        print()
+        
         print("✓ Migration completed successfully!")
         print()
         print("New features available:")
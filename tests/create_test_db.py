@@ -4,12 +4,32 @@
 import sqlite3
 import os
 import random
+from itertools import islice
 from datetime import datetime, timedelta
+import numpy as np
 from faker import Faker
 
 # Initialize Faker for generating realistic data
 fake = Faker()
 
+# Number of values pre-generated per Faker provider; rows draw from these pools
+# with random.choice instead of paying Faker's provider dispatch on every row
+FAKE_POOL_SIZE = 300
+
+# Rows handed to each executemany call
+INSERT_BATCH_SIZE = 500
+
+def _with_nulls(rng, values, null_probability):
+    """Replace a random fraction of values with None."""
+    keep = rng.random(len(values)) >= null_probability
+    return [value if kept else None for value, kept in zip(values, keep.tolist())]
+
+def insert_rows(cursor, sql, rows, batch_size=INSERT_BATCH_SIZE):
+    """Insert rows from any iterable with executemany in fixed-size batches."""
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        cursor.executemany(sql, batch)
+
 def create_test_database(db_path: str = "test_ecommerce.db"):
     """Create a comprehensive test database with realistic e-commerce data."""
     
@@ -22,9 +42,19 @@ def create_test_database(db_path: str = "test_ecommerce.db"):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    # Tune SQLite for a single-writer bulk load: WAL + relaxed sync avoids an
+    # fsync per commit, and the exclusive lock skips shared-memory coordination
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    
     print(f"🏗️  Creating test database: {db_path}")
     
-    # Create tables with realistic schema
+    # Create tables with realistic schema; this also opens the transaction
+    # the data load runs in, so the whole load costs a single commit
     create_tables(cursor)
     print("✅ Created database tables")
     
@@ -32,11 +62,18 @@ def create_test_database(db_path: str = "test_ecommerce.db"):
     insert_sample_data(cursor, conn)
     print("✅ Inserted sample data")
     
-    # Create indexes for performance
+    # Create indexes (including the email uniqueness constraint) after the
+    # data is loaded so each one is built in a single sorted pass
     create_indexes(cursor)
     print("✅ Created database indexes")
     
     conn.commit()
+    
+    # Fold the WAL back into the main file and leave it in rollback-journal
+    # mode, so the file is complete (and its size accurate) once closed
+    cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    cursor.execute("PRAGMA journal_mode=DELETE")
+    cursor.close()
     conn.close()
     
     print(f"🎉 Test database created successfully: {db_path}")
@@ -45,25 +82,26 @@ def create_test_database(db_path: str = "test_ecommerce.db"):
 
 def create_tables(cursor):
     """Create all database tables."""
+    # executescript commits any pending transaction before it runs, so the
+    # load transaction is opened inside the script rather than beforehand
+    cursor.executescript('''
+        BEGIN;
     
-    # Customers table
-    cursor.execute('''
+        -- Customers table
         CREATE TABLE customers (
             customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
             first_name TEXT NOT NULL,
             last_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
+            email TEXT NOT NULL,  -- unique index is built after the bulk load
             phone TEXT,
             date_of_birth DATE,
             registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             customer_segment TEXT CHECK(customer_segment IN ('bronze', 'silver', 'gold', 'platinum')),
             total_lifetime_value DECIMAL(10,2) DEFAULT 0.00,
             is_active BOOLEAN DEFAULT 1
-        )
-    ''')
+        );
     
-    # Products table
-    cursor.execute('''
+        -- Products table
         CREATE TABLE products (
             product_id INTEGER PRIMARY KEY AUTOINCREMENT,
             product_name TEXT NOT NULL,
@@ -78,11 +116,9 @@ def create_tables(cursor):
             created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             is_discontinued BOOLEAN DEFAULT 0
-        )
-    ''')
+        );
     
-    # Orders table
-    cursor.execute('''
+        -- Orders table
         CREATE TABLE orders (
             order_id INTEGER PRIMARY KEY AUTOINCREMENT,
             customer_id INTEGER NOT NULL,
@@ -100,11 +136,9 @@ def create_tables(cursor):
             discount_amount DECIMAL(10,2) DEFAULT 0.00,
             order_source TEXT,
             FOREIGN KEY (customer_id) REFERENCES customers (customer_id)
-        )
-    ''')
+        );
     
-    # Order items table
-    cursor.execute('''
+        -- Order items table
         CREATE TABLE order_items (
             order_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
             order_id INTEGER NOT NULL,
@@ -115,11 +149,9 @@ def create_tables(cursor):
             discount_applied DECIMAL(10,2) DEFAULT 0.00,
             FOREIGN KEY (order_id) REFERENCES orders (order_id),
             FOREIGN KEY (product_id) REFERENCES products (product_id)
-        )
-    ''')
+        );
     
-    # Reviews table
-    cursor.execute('''
+        -- Reviews table
         CREATE TABLE product_reviews (
             review_id INTEGER PRIMARY KEY AUTOINCREMENT,
             product_id INTEGER NOT NULL,
@@ -134,11 +166,9 @@ def create_tables(cursor):
             FOREIGN KEY (product_id) REFERENCES products (product_id),
             FOREIGN KEY (customer_id) REFERENCES customers (customer_id),
             FOREIGN KEY (order_id) REFERENCES orders (order_id)
-        )
-    ''')
+        );
     
-    # Inventory tracking table
-    cursor.execute('''
+        -- Inventory tracking table
         CREATE TABLE inventory_movements (
             movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
             product_id INTEGER NOT NULL,
@@ -150,11 +180,9 @@ def create_tables(cursor):
             unit_cost DECIMAL(10,2),
             FOREIGN KEY (product_id) REFERENCES products (product_id),
             FOREIGN KEY (reference_order_id) REFERENCES orders (order_id)
-        )
-    ''')
+        );
     
-    # Marketing campaigns table
-    cursor.execute('''
+        -- Marketing campaigns table
         CREATE TABLE marketing_campaigns (
             campaign_id INTEGER PRIMARY KEY AUTOINCREMENT,
             campaign_name TEXT NOT NULL,
@@ -168,30 +196,49 @@ def create_tables(cursor):
             total_clicks INTEGER DEFAULT 0,
             total_impressions INTEGER DEFAULT 0,
             is_active BOOLEAN DEFAULT 1
-        )
+        );
     ''')
 
 def insert_sample_data(cursor, conn):
     """Insert realistic sample data into all tables."""
     
+    # Pre-generate pools of Faker values once
+    first_names = [fake.first_name() for _ in range(FAKE_POOL_SIZE)]
+    last_names = [fake.last_name() for _ in range(FAKE_POOL_SIZE)]
+    phone_numbers = [fake.phone_number() for _ in range(FAKE_POOL_SIZE)]
+    addresses = [fake.address() for _ in range(FAKE_POOL_SIZE)]
+    review_titles = [fake.sentence(nb_words=6) for _ in range(FAKE_POOL_SIZE)]
+    review_texts = [fake.paragraph(nb_sentences=3) for _ in range(FAKE_POOL_SIZE)]
+    notes = [fake.sentence() for _ in range(FAKE_POOL_SIZE)]
+    # catch_phrase() is the costliest provider here and only names 220 rows,
+    # so a smaller pool is enough
+    catch_phrases = [fake.catch_phrase() for _ in range(50)]
+    
+    # Numeric columns are drawn in bulk with NumPy and converted to Python
+    # scalars via tolist(), since sqlite3 cannot bind NumPy integer types
+    rng = np.random.default_rng()
+    
     # Insert customers
     print("  📝 Inserting customers...")
+    lifetime_values = np.round(rng.uniform(50, 5000, 500), 2).tolist()
     customers_data = []
     for i in range(500):
+        first_name = random.choice(first_names)
+        last_name = random.choice(last_names)
         customer = (
-            fake.first_name(),
-            fake.last_name(),
-            fake.unique.email(),
-            fake.phone_number(),
+            first_name,
+            last_name,
+            f"{first_name.lower()}.{last_name.lower()}{i}@example.com",  # unique by index
+            random.choice(phone_numbers),
             fake.date_of_birth(minimum_age=18, maximum_age=80),
             fake.date_time_between(start_date='-2y', end_date='now'),
             random.choice(['bronze', 'silver', 'gold', 'platinum']),
-            round(random.uniform(50, 5000), 2),
+            lifetime_values[i],
             random.choice([True, False]) if random.random() > 0.1 else True  # 90% active
         )
         customers_data.append(customer)
     
-    cursor.executemany('''
+    insert_rows(cursor, '''
         INSERT INTO customers (first_name, last_name, email, phone, date_of_birth, 
                              registration_date, customer_segment, total_lifetime_value, is_active)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -202,135 +249,150 @@ def insert_sample_data(cursor, conn):
     categories = ['Electronics', 'Clothing', 'Home & Garden', 'Sports', 'Books', 'Toys', 'Beauty', 'Automotive']
     brands = ['TechCorp', 'StyleBrand', 'HomeMax', 'SportsPro', 'ReadWell', 'PlayTime', 'BeautyPlus', 'AutoExpert']
     
+    prices = np.round(rng.uniform(10, 500, 200), 2).tolist()
+    costs = np.round(rng.uniform(5, 250, 200), 2).tolist()
+    weights = np.round(rng.uniform(0.1, 10, 200), 3).tolist()
+    lengths = rng.integers(10, 51, 200).tolist()
+    widths = rng.integers(10, 51, 200).tolist()
+    heights = rng.integers(5, 31, 200).tolist()
+    stock_quantities = rng.integers(0, 101, 200).tolist()
+    reorder_levels = rng.integers(5, 21, 200).tolist()
+    
     products_data = []
     for i in range(200):
         category = random.choice(categories)
         product = (
-            fake.catch_phrase() + f" {category}",
+            f"{random.choice(catch_phrases)} {category}",
             category,
             random.choice(brands),
-            round(random.uniform(10, 500), 2),
-            round(random.uniform(5, 250), 2),
-            round(random.uniform(0.1, 10), 3),
-            f"{random.randint(10,50)}x{random.randint(10,50)}x{random.randint(5,30)}",
-            random.randint(0, 100),
-            random.randint(5, 20),
+            prices[i],
+            costs[i],
+            weights[i],
+            f"{lengths[i]}x{widths[i]}x{heights[i]}",
+            stock_quantities[i],
+            reorder_levels[i],
             fake.date_time_between(start_date='-1y', end_date='now'),
             fake.date_time_between(start_date='-30d', end_date='now'),
             random.choice([True, False]) if random.random() > 0.05 else False  # 5% discontinued
         )
         products_data.append(product)
     
-    cursor.executemany('''
+    insert_rows(cursor, '''
         INSERT INTO products (product_name, product_category, brand, price, cost, weight_kg,
                             dimensions_cm, stock_quantity, reorder_level, created_date, 
                             last_updated, is_discontinued)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', products_data)
     
-    # Get customer and product IDs for foreign key references
-    cursor.execute("SELECT customer_id FROM customers")
-    customer_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT product_id, price FROM products")
-    products = cursor.fetchall()
+    # AUTOINCREMENT numbers rows from 1 in a fresh database, so foreign key
+    # targets are known without reading the IDs back
+    customer_ids = list(range(1, len(customers_data) + 1))
+    products = list(zip(range(1, len(products_data) + 1), prices))
     
     # Insert orders
     print("  🛒 Inserting orders...")
-    orders_data = []
-    order_items_data = []
-    
-    for i in range(1000):
-        customer_id = random.choice(customer_ids)
-        order_date = fake.date_time_between(start_date='-6m', end_date='now')
-        
-        # Calculate shipping and delivery dates
-        ship_date = None
-        delivery_date = None
-        status = random.choice(['pending', 'processing', 'shipped', 'delivered', 'cancelled'])
+    num_orders = 1000
+    items_per_order = rng.integers(1, 6, num_orders).tolist()
+    statuses = rng.choice(['pending', 'processing', 'shipped', 'delivered', 'cancelled'], num_orders)
+    shipped_mask = np.isin(statuses, ['shipped', 'delivered'])
+    delivered_mask = statuses == 'delivered'
+    
+    # Order dates fall within the last ~6 months; ship and delivery dates are
+    # day offsets from them, computed for every order at once
+    now = np.datetime64(datetime.now(), 's')
+    order_dates = now - rng.integers(0, 183 * 24 * 3600, num_orders).astype('timedelta64[s]')
+    ship_dates = order_dates + rng.integers(1, 4, num_orders).astype('timedelta64[D]')
+    delivery_dates = ship_dates + rng.integers(1, 8, num_orders).astype('timedelta64[D]')
+    
+    # Back to Python datetimes, nulling dates for orders that never got that far
+    order_dates = order_dates.tolist()
+    ship_dates = np.where(shipped_mask, ship_dates.astype(object), None).tolist()
+    delivery_dates = np.where(delivered_mask, delivery_dates.astype(object), None).tolist()
+    statuses = statuses.tolist()
+    
+    order_customer_ids = []
+    item_order_ids = []
+    item_product_ids = []
+    item_prices = []
+    
+    for i in range(num_orders):
+        order_customer_ids.append(random.choice(customer_ids))
+        order_id = i + 1
         
-        if status in ['shipped', 'delivered']:
-            ship_date = order_date + timedelta(days=random.randint(1, 3))
-        if status == 'delivered':
-            delivery_date = ship_date + timedelta(days=random.randint(1, 7))
-        
-        # Calculate order totals
-        num_items = random.randint(1, 5)
-        subtotal = 0
-        
-        order = (
-            customer_id,
-            order_date,
-            ship_date,
-            delivery_date,
-            status,
-            fake.address(),
-            fake.address(),
-            random.choice(['credit_card', 'debit_card', 'paypal', 'bank_transfer']),
-            random.choice(['website', 'mobile_app', 'phone', 'store'])
-        )
-        orders_data.append(order)
-        order_id = 1000 + i + 1  # Assuming auto-increment starts at 1
-        
-        # Add order items
-        selected_products = random.sample(products, min(num_items, len(products)))
+        # Pick the products for this order's items
+        selected_products = random.sample(products, min(items_per_order[i], len(products)))
         for product_id, price in selected_products:
-            quantity = random.randint(1, 3)
-            line_total = quantity * price
-            subtotal += line_total
-            
-            order_item = (
-                order_id,
-                product_id,
-                quantity,
-                price,
-                line_total,
-                round(random.uniform(0, line_total * 0.1), 2)  # Random discount
-            )
-            order_items_data.append(order_item)
-        
-        # Update order with calculated totals
-        tax_rate = 0.08
-        tax_amount = round(subtotal * tax_rate, 2)
-        shipping_cost = round(random.uniform(5, 25), 2) if subtotal < 100 else 0
-        discount = round(random.uniform(0, subtotal * 0.15), 2)
-        total = subtotal + tax_amount + shipping_cost - discount
-        
-        # Update the order tuple with calculated values
-        orders_data[-1] = order + (subtotal, tax_amount, shipping_cost, total, discount)
-    
-    cursor.executemany('''
+            item_order_ids.append(order_id)
+            item_product_ids.append(product_id)
+            item_prices.append(price)
+    
+    # Calculate line totals for all items at once
+    quantities = rng.integers(1, 4, len(item_prices))
+    line_totals = quantities * np.array(item_prices)
+    item_discounts = np.round(rng.uniform(0, line_totals * 0.1), 2)  # Random discount
+    # Rows are zipped lazily and only materialized one batch at a time
+    order_items_data = zip(
+        item_order_ids,
+        item_product_ids,
+        quantities.tolist(),
+        item_prices,
+        line_totals.tolist(),
+        item_discounts.tolist()
+    )
+    
+    # Assemble each order row once, column by column; the money columns are
+    # filled in from the order items by update_order_totals
+    orders_data = zip(
+        order_customer_ids,
+        order_dates,
+        ship_dates,
+        delivery_dates,
+        statuses,
+        random.choices(addresses, k=num_orders),
+        random.choices(addresses, k=num_orders),
+        random.choices(['credit_card', 'debit_card', 'paypal', 'bank_transfer'], k=num_orders),
+        random.choices(['website', 'mobile_app', 'phone', 'store'], k=num_orders)
+    )
+    
+    insert_rows(cursor, '''
         INSERT INTO orders (customer_id, order_date, ship_date, delivery_date, order_status,
-                          shipping_address, billing_address, payment_method, order_source,
-                          subtotal, tax_amount, shipping_cost, total_amount, discount_amount)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                          shipping_address, billing_address, payment_method, order_source)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', orders_data)
     
     # Insert order items
     print("  📋 Inserting order items...")
-    cursor.executemany('''
+    insert_rows(cursor, '''
         INSERT INTO order_items (order_id, product_id, quantity, unit_price, line_total, discount_applied)
         VALUES (?, ?, ?, ?, ?, ?)
     ''', order_items_data)
     
+    update_order_totals(cursor)
+    
+    # Product IDs shared by the review and inventory loops
+    product_ids = [p[0] for p in products]
+    
     # Insert product reviews
     print("  ⭐ Inserting product reviews...")
-    reviews_data = []
-    for i in range(300):
-        review = (
-            random.choice([p[0] for p in products]),
+    review_order_ids = _with_nulls(rng, rng.integers(1, num_orders + 1, 300).tolist(), 0.3)  # 70% have order reference
+    ratings = rng.integers(1, 6, 300).tolist()
+    helpful_votes = rng.integers(0, 51, 300).tolist()
+    reviews_data = (
+        (
+            random.choice(product_ids),
             random.choice(customer_ids),
-            random.randint(1000, 2000) if random.random() > 0.3 else None,  # 70% have order reference
-            random.randint(1, 5),
-            fake.sentence(nb_words=6),
-            fake.paragraph(nb_sentences=3),
+            review_order_ids[i],
+            ratings[i],
+            random.choice(review_titles),
+            random.choice(review_texts),
             fake.date_time_between(start_date='-4m', end_date='now'),
             random.choice([True, False]),
-            random.randint(0, 50)
+            helpful_votes[i]
         )
-        reviews_data.append(review)
+        for i in range(300)
+    )
     
-    cursor.executemany('''
+    insert_rows(cursor, '''
         INSERT INTO product_reviews (product_id, customer_id, order_id, rating, review_title,
                                    review_text, review_date, is_verified_purchase, helpful_votes)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -338,20 +400,23 @@ def insert_sample_data(cursor, conn):
     
     # Insert inventory movements
     print("  📊 Inserting inventory movements...")
-    movements_data = []
-    for i in range(400):
-        movement = (
-            random.choice([p[0] for p in products]),
+    quantity_changes = rng.integers(-50, 101, 400).tolist()
+    reference_order_ids = _with_nulls(rng, rng.integers(1, num_orders + 1, 400).tolist(), 0.5)
+    unit_costs = np.round(rng.uniform(5, 100, 400), 2).tolist()
+    movements_data = (
+        (
+            random.choice(product_ids),
             random.choice(['inbound', 'outbound', 'adjustment']),
-            random.randint(-50, 100),
+            quantity_changes[i],
             fake.date_time_between(start_date='-3m', end_date='now'),
-            random.randint(1000, 2000) if random.random() > 0.5 else None,
-            fake.sentence() if random.random() > 0.7 else None,
-            round(random.uniform(5, 100), 2)
+            reference_order_ids[i],
+            random.choice(notes) if random.random() > 0.7 else None,
+            unit_costs[i]
         )
-        movements_data.append(movement)
+        for i in range(400)
+    )
     
-    cursor.executemany('''
+    insert_rows(cursor, '''
         INSERT INTO inventory_movements (product_id, movement_type, quantity_change, movement_date,
                                        reference_order_id, notes, unit_cost)
         VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -359,37 +424,70 @@ def insert_sample_data(cursor, conn):
     
     # Insert marketing campaigns
     print("  📢 Inserting marketing campaigns...")
+    campaign_days = rng.integers(7, 91, 20).tolist()
+    budgets = np.round(rng.uniform(1000, 50000, 20), 2).tolist()
+    conversion_rates = np.round(rng.uniform(0.01, 0.15, 20), 4).tolist()
+    total_clicks = rng.integers(100, 10001, 20).tolist()
+    total_impressions = rng.integers(1000, 100001, 20).tolist()
     campaigns_data = []
     for i in range(20):
         start_date = fake.date_between(start_date='-6m', end_date='now')
-        end_date = start_date + timedelta(days=random.randint(7, 90))
+        end_date = start_date + timedelta(days=campaign_days[i])
         
         campaign = (
-            fake.catch_phrase() + " Campaign",
+            f"{random.choice(catch_phrases)} Campaign",
             random.choice(['email', 'social_media', 'ppc', 'display', 'influencer']),
             start_date,
             end_date,
-            round(random.uniform(1000, 50000), 2),
+            budgets[i],
             random.choice(['18-25', '26-35', '36-50', '50+']),
             random.choice(['facebook', 'google', 'instagram', 'email', 'youtube']),
-            round(random.uniform(0.01, 0.15), 4),
-            random.randint(100, 10000),
-            random.randint(1000, 100000),
+            conversion_rates[i],
+            total_clicks[i],
+            total_impressions[i],
             end_date > datetime.now().date()
         )
         campaigns_data.append(campaign)
     
-    cursor.executemany('''
+    insert_rows(cursor, '''
         INSERT INTO marketing_campaigns (campaign_name, campaign_type, start_date, end_date,
                                        budget, target_audience, channel, conversion_rate,
                                        total_clicks, total_impressions, is_active)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', campaigns_data)
 
+def update_order_totals(cursor, tax_rate=0.08):
+    """Derive order subtotals, tax, shipping, discounts and totals from order items in SQL."""
+    # Aggregate once into a rowid-keyed temp table so the per-order lookup
+    # below is a B-tree seek rather than a scan of order_items
+    cursor.execute("CREATE TEMP TABLE order_subtotals (order_id INTEGER PRIMARY KEY, subtotal REAL)")
+    cursor.execute('''
+        INSERT INTO order_subtotals (order_id, subtotal)
+        SELECT order_id, SUM(line_total) FROM order_items GROUP BY order_id
+    ''')
+    cursor.execute('''
+        UPDATE orders SET subtotal = COALESCE(
+            (SELECT s.subtotal FROM order_subtotals s WHERE s.order_id = orders.order_id), 0
+        )
+    ''')
+    cursor.execute("DROP TABLE order_subtotals")
+    
+    # RANDOM() / 2^64 + 0.5 is a uniform draw from [0, 1)
+    cursor.execute('''
+        UPDATE orders SET
+            tax_amount = ROUND(subtotal * ?, 2),
+            shipping_cost = CASE
+                WHEN subtotal < 100 THEN ROUND(5 + 20 * (RANDOM() / 18446744073709551616.0 + 0.5), 2)
+                ELSE 0
+            END,
+            discount_amount = ROUND(subtotal * 0.15 * (RANDOM() / 18446744073709551616.0 + 0.5), 2)
+    ''', (tax_rate,))
+    cursor.execute("UPDATE orders SET total_amount = subtotal + tax_amount + shipping_cost - discount_amount")
+
 def create_indexes(cursor):
     """Create database indexes for better performance."""
     indexes = [
-        "CREATE INDEX idx_customers_email ON customers(email)",
+        "CREATE UNIQUE INDEX idx_customers_email_unique ON customers(email)",
         "CREATE INDEX idx_customers_segment ON customers(customer_segment)",
         "CREATE INDEX idx_orders_customer_id ON orders(customer_id)",
         "CREATE INDEX idx_orders_date ON orders(order_date)",
@@ -402,8 +500,10 @@ def create_indexes(cursor):
         "CREATE INDEX idx_inventory_product_id ON inventory_movements(product_id)"
     ]
     
-    for index_sql in indexes:
-        cursor.execute(index_sql)
+    # executescript commits the data load first; the indexes and planner
+    # statistics (for the reporting joins in print_database_stats) then go
+    # in as one more transaction
+    cursor.executescript("BEGIN;\n" + ";\n".join(indexes) + ";\nANALYZE;\nCOMMIT;")
 
 def print_database_stats(db_path: str):
     """Print statistics about the created database."""
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test script for AI service response handling, using a stubbed LLM client."""
+
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from dbdoc.services.ai_service import AIService, LLMProvider
+from dbdoc.services.semantic_cache import SemanticCache, ProgramCache, ResponseCache
+
+
+class FakeCompletions:
+    """Returns queued responses and counts the calls made."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.responses.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_service(responses):
+    """Create an OpenAI-backed service with in-memory caches and a fake client."""
+    service = AIService(
+        LLMProvider.OPENAI,
+        semantic_cache=SemanticCache(),
+        program_cache=ProgramCache(),
+        response_cache=ResponseCache()
+    )
+    completions = FakeCompletions(responses)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service, completions
+
+
+def column(table_name, column_name):
+    """Keyword arguments describing a column."""
+    return {
+        "table_name": table_name,
+        "column_name": column_name,
+        "data_type": "integer",
+        "is_nullable": False,
+        "profile_data": {},
+        "sample_values": [],
+    }
+
+
+def test_unparseable_response_is_not_cached():
+    """Test that a truncated response is retried instead of replayed."""
+    good = '{"description": "Order total.", "confidence_score": 0.9}'
+    service, completions = make_service(['{"description": "Order tot', good])
+
+    first = service.generate_column_description(**column("orders", "total"))
+    assert first.confidence_score == 0.0
+
+    second = service.generate_column_description(**column("orders", "total"))
+    assert second.description == "Order total."
+    assert completions.calls == 2
+
+
+def test_parsed_response_is_cached():
+    """Test that a response that parses is reused for the same prompt."""
+    good = '{"description": "Order total.", "confidence_score": 0.9}'
+    service, completions = make_service([good])
+
+    prompt = "Describe orders.total"
+    assert service._call_openai(prompt, validate=service._check_response) == good
+    assert service._call_openai(prompt, validate=service._check_response) == good
+    assert completions.calls == 1
+
+
+def test_bad_batch_item_falls_back_to_its_own_call():
+    """Test that one unusable item in a table batch only affects its own column."""
+    batch = ('{"results": ['
+             '{"column_name": "id", "description": "Order ID.", "confidence_score": 0.9}, '
+             '{"column_name": "total", "description": "Order total.", "confidence_score": "high"}]}')
+    service, completions = make_service([batch])
+    individually = []
+
+    def generate_individually(items):
+        individually.extend(item["column_name"] for item in items)
+        return [service._parse_response('{"description": "Retried.", "confidence_score": 0.8}', service.model)
+                for _ in items]
+
+    service.generate_column_descriptions = generate_individually
+    results = service.generate_column_descriptions_for_table("orders", [column("orders", "id"), column("orders", "total")])
+
+    assert [result.description for result in results] == ["Order ID.", "Retried."]
+    assert individually == ["total"]
+
+
+if __name__ == "__main__":
+    test_unparseable_response_is_not_cached()
+    test_parsed_response_is_cached()
+    test_bad_batch_item_falls_back_to_its_own_call()
+    print("✅ AI service tests passed!")
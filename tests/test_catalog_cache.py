@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Test script for the catalog read cache."""
+
+from dbdoc.core.catalog_cache import CatalogCache
+
+
+def test_catalog_cache_invalidation():
+    """Test that writes to a data source invalidate only its cached reads."""
+    cache = CatalogCache(ttl_seconds=60)
+    cache.set("tables", 1, 1, ["orders"])
+    cache.set("tables", 2, 2, ["customers"])
+    etag = cache.etag(1)
+    
+    assert cache.get("tables", 1) == ["orders"]
+    
+    cache.invalidate(1)
+    assert cache.get("tables", 1) is None
+    assert cache.get("tables", 2) == ["customers"]
+    assert cache.etag(1) != etag
+    
+    cache.invalidate()
+    assert cache.get("tables", 2) is None
+
+
+def test_catalog_cache_ttl():
+    """Test that entries expire after the TTL."""
+    cache = CatalogCache(ttl_seconds=0)
+    cache.set("table_details", 5, 1, {"id": 5})
+    assert cache.get("table_details", 5) is None
+
+
+def test_catalog_cache_etag_per_process():
+    """Test that ETags from another process or an earlier run never match."""
+    first, restarted = CatalogCache(ttl_seconds=60), CatalogCache(ttl_seconds=60)
+    assert first.etag(1) != restarted.etag(1)
+
+
+if __name__ == "__main__":
+    test_catalog_cache_invalidation()
+    test_catalog_cache_ttl()
+    test_catalog_cache_etag_per_process()
+    print("✅ Catalog cache tests passed!")
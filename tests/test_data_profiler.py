@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Test script for table profiling against a SQLite source."""
+
+import os
+import sqlite3
+import statistics
+import tempfile
+
+from sqlalchemy import create_engine, event
+
+from dbdoc.services.data_profiler import DataProfiler
+
+ROWS = [
+    (i, f"user{i}@example.com" if i % 3 else None, i * 1.5, "note" if i % 10 == 0 else None)
+    for i in range(1, 101)
+]
+
+
+def make_profiler(directory):
+    """Create a profiler over a SQLite database holding a 100-row customers table."""
+    path = os.path.join(directory, "source.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE customers (id INTEGER, email TEXT, balance REAL, note TEXT)")
+    conn.executemany("INSERT INTO customers VALUES (?, ?, ?, ?)", ROWS)
+    conn.commit()
+    conn.close()
+    return DataProfiler(create_engine(f"sqlite:///{path}"), "sqlite")
+
+
+def test_profile_table_sqlite():
+    """Test statistics, top values, samples and pattern matches for every column."""
+    with tempfile.TemporaryDirectory() as directory:
+        profiles = make_profiler(directory).profile_table("main", "customers", ["id", "email", "balance", "note"])
+
+    assert profiles["id"].cardinality == 100
+    assert profiles["id"].avg_value == 50.5
+    assert abs(profiles["balance"].std_dev - statistics.stdev(row[2] for row in ROWS)) < 1e-9
+
+    email = profiles["email"]
+    assert email.null_percentage == 33.0
+    assert len(email.sample_values) == 20
+    assert email.pattern_analysis["pattern_matches"]["email"]["percentage"] == 100.0
+
+    note = profiles["note"]
+    assert note.top_values == [("note", 10)]
+    assert note.null_percentage == 90.0
+
+
+def test_profile_table_groups_wide_tables():
+    """Test that a wide table is profiled COLUMNS_PER_QUERY columns per batch of queries."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "wide.db")
+        names = [f"c{i}" for i in range(250)]
+        conn = sqlite3.connect(path)
+        conn.execute(f"CREATE TABLE wide ({', '.join(names)})")
+        conn.executemany(f"INSERT INTO wide VALUES ({', '.join('?' * len(names))})",
+                         [tuple(range(row, row + len(names))) for row in range(5)])
+        conn.commit()
+        conn.close()
+
+        engine = create_engine(f"sqlite:///{path}")
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        profiles = DataProfiler(engine, "sqlite").profile_table("main", "wide", names)
+
+    assert list(profiles) == names
+    assert all(profile.cardinality == 5 for profile in profiles.values())
+    # Stats, top values and sample queries for each of three groups
+    assert len(statements) == 9
+
+
+def test_profile_table_falls_back_per_column():
+    """Test that a failing batch is retried column by column, dropping only the bad column."""
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = make_profiler(directory)
+        # Text that isn't valid UTF-8 can't be fetched, so any query returning it fails
+        with profiler.engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE customers ADD COLUMN garbled TEXT")
+            conn.exec_driver_sql("UPDATE customers SET garbled = CAST(X'FF' AS TEXT)")
+        profiles = profiler.profile_table("main", "customers", ["id", "garbled", "note"])
+
+    assert sorted(profiles) == ["id", "note"]
+    assert profiles["id"].cardinality == 100
+    assert profiles["note"].top_values == [("note", 10)]
+
+
+def test_profile_table_tops_up_sparse_columns():
+    """Test that a mostly-null column gets its own non-null sample."""
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = make_profiler(directory)
+        profiler.pattern_sample_size = 20
+        profiles = profiler.profile_table("main", "customers", ["id", "note"])
+
+    assert len(profiles["id"].sample_values) == 20
+    assert profiles["note"].sample_values == ["note"] * 10
+
+
+def test_analyze_patterns_keeps_database_counts():
+    """Test that pattern counts from the database survive an empty sample."""
+    analysis = DataProfiler(create_engine("sqlite://"), "sqlite")._analyze_patterns([], {"email": (40, 50), "phone": (0, 50)})
+    assert analysis == {"pattern_matches": {"email": {"matches": 40, "percentage": 80.0}}}
+
+
+def test_pattern_prefilter_allows_trailing_newline():
+    """Test that values the regexes accept before a final newline are still counted."""
+    profiler = DataProfiler(create_engine("sqlite://"), "sqlite")
+    profiler._hyperscan_db = lambda: None
+    values = ["123-45-6789\n", "10.0.0.1\n", "123e4567-e89b-12d3-a456-426614174000\n",
+              "123-45-6789\n\n", "10.0.0.1\n\n", "123e4567-e89b-12d3-a456-426614174000\n\n", "\n", ""]
+
+    expected = {name: sum(1 for value in values if pattern.match(value)) for name, pattern in profiler.patterns.items()}
+    assert expected["ssn"] == expected["ip_address"] == expected["uuid"] == 1
+    assert profiler._count_pattern_matches(values) == expected
+
+
+if __name__ == "__main__":
+    test_profile_table_sqlite()
+    test_profile_table_groups_wide_tables()
+    test_profile_table_falls_back_per_column()
+    test_profile_table_tops_up_sparse_columns()
+    test_analyze_patterns_keeps_database_counts()
+    test_pattern_prefilter_allows_trailing_newline()
+    print("✅ Data profiler tests passed!")
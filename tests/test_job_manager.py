@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test script for job tracking, indexing and notification in the job manager."""
+
+import threading
+from datetime import datetime, timedelta
+
+from dbdoc.services.job_manager import JobManager, JobType, JobStatus
+
+
+def run_job(manager, job_id, result=None, error=None):
+    """Run a job on the manager's pool to completion, returning or raising as given."""
+    def job_function(progress_callback):
+        if error:
+            raise error
+        return result
+
+    assert manager.start_job(job_id, job_function)
+    try:
+        manager.get_job(job_id)._future.result()
+    except Exception:
+        pass
+
+
+def indexed_statuses(manager, job_id):
+    """Statuses whose index holds the job."""
+    return [status for status, entries in manager._by_status.items()
+            if any(entry_id == job_id for _, entry_id in entries)]
+
+
+def test_status_indexes_follow_jobs():
+    """Test that completing, failing and cancelling a job moves it between status indexes."""
+    manager = JobManager(max_concurrent_jobs=1)
+    completed, failed, blocker, cancelled = (
+        manager.create_job(JobType.DATA_PROFILING, f"Job {i}", "") for i in range(4)
+    )
+    assert all(indexed_statuses(manager, job_id) == [JobStatus.PENDING] for job_id in manager.jobs)
+
+    run_job(manager, completed, result=42)
+    run_job(manager, failed, error=ValueError("boom"))
+
+    # With the only worker busy, the next job waits in the queue and can be cancelled
+    release = threading.Event()
+    manager.start_job(blocker, lambda progress_callback: release.wait())
+    manager.start_job(cancelled, lambda progress_callback: None)
+    assert manager.cancel_job(cancelled)
+    release.set()
+    manager.get_job(blocker)._future.result()
+
+    assert indexed_statuses(manager, completed) == [JobStatus.COMPLETED]
+    assert indexed_statuses(manager, failed) == [JobStatus.FAILED]
+    assert indexed_statuses(manager, cancelled) == [JobStatus.CANCELLED]
+    assert manager.get_job(completed).result == 42
+    assert manager.get_job(completed).progress.percentage == 100.0
+    assert manager.get_job(failed).error == "boom"
+    assert [job.id for job in manager.list_jobs(status=JobStatus.COMPLETED)] == [blocker, completed]
+    assert [job.id for job in manager.list_jobs(status=JobStatus.CANCELLED)] == [cancelled]
+    assert manager.list_jobs(status=JobStatus.PENDING) == []
+    manager.shutdown()
+
+
+def test_status_published_last():
+    """Test that a job's timestamps, result and final progress are set before its status changes."""
+    manager = JobManager()
+    published = []
+    set_status = manager._set_status
+
+    def record(job, status):
+        published.append((status, job.started_at, job.completed_at, job.result, job.progress.current_step))
+        set_status(job, status)
+
+    manager._set_status = record
+    run_job(manager, manager.create_job(JobType.DATA_PROFILING, "Job", ""), result=42)
+
+    (running, started_at, _, _, _), (completed, _, completed_at, result, step) = published
+    assert (running, completed) == (JobStatus.RUNNING, JobStatus.COMPLETED)
+    assert started_at is not None and completed_at is not None
+    assert (result, step) == (42, "Completed")
+    manager.shutdown()
+
+
+def test_list_jobs_after_cleanup():
+    """Test filtering and limits once expired jobs have been cleaned up."""
+    manager = JobManager()
+    job_types = [JobType.DATA_PROFILING, JobType.ERD_GENERATION] * 3
+    job_ids = [manager.create_job(job_type, f"Job {i}", "") for i, job_type in enumerate(job_types)]
+    for job_id in job_ids[:4]:
+        run_job(manager, job_id)
+
+    # The two oldest finished jobs have expired
+    for job_id in job_ids[:2]:
+        manager.get_job(job_id).completed_at = datetime.utcnow() - timedelta(hours=2)
+    manager.cleanup_completed_jobs(max_age_hours=1)
+
+    assert sorted(manager.jobs) == sorted(job_ids[2:])
+    assert [job.id for job in manager.list_jobs()] == job_ids[:1:-1]
+    assert [job.id for job in manager.list_jobs(limit=2)] == job_ids[:3:-1]
+    assert [job.id for job in manager.list_jobs(job_type=JobType.DATA_PROFILING)] == [job_ids[4], job_ids[2]]
+    assert [job.id for job in manager.list_jobs(status=JobStatus.COMPLETED)] == [job_ids[3], job_ids[2]]
+    assert [job.id for job in manager.list_jobs(job_type=JobType.ERD_GENERATION, status=JobStatus.PENDING)] == [job_ids[5]]
+    assert manager.list_jobs(job_type=JobType.ERD_GENERATION, status=JobStatus.COMPLETED, limit=1)[0].id == job_ids[3]
+    manager.shutdown()
+
+
+def test_callbacks_fire_once_per_flush():
+    """Test that any number of progress updates between flushes notify each callback once."""
+    manager = JobManager()
+    # Long enough that only the explicit flushes below notify
+    manager.PROGRESS_FLUSH_INTERVAL = 60
+    job_id = manager.create_job(JobType.DESCRIPTION_GENERATION, "Job", "", total_items=10)
+    seen = []
+    manager.add_progress_callback(job_id, lambda job: seen.append(job.progress.items_processed))
+
+    for items in range(1, 6):
+        manager.update_job_progress(job_id, "Generating", 0, 1, items, 10)
+    manager._flush_progress()
+    assert seen == [5]
+
+    manager._flush_progress()
+    assert seen == [5]
+
+    manager.update_job_progress(job_id, "Generating", 0, 1, 6, 10)
+    manager.update_job_progress(job_id, "Generating", 0, 1, 6, 10)
+    manager._flush_progress()
+    assert seen == [5, 6]
+    manager.shutdown()
+
+
+def test_full_queue_returns_false():
+    """Test that a job submitted past the queue limit fails instead of waiting."""
+    manager = JobManager(max_concurrent_jobs=1)
+    release = threading.Event()
+    job_ids = [manager.create_job(JobType.SCHEMA_DISCOVERY, f"Job {i}", "")
+               for i in range(JobManager.QUEUED_JOBS_PER_WORKER + 1)]
+
+    for job_id in job_ids[:-1]:
+        assert manager.start_job(job_id, lambda progress_callback: release.wait())
+    assert not manager.start_job(job_ids[-1], lambda progress_callback: None)
+
+    rejected = manager.get_job(job_ids[-1])
+    assert rejected.status == JobStatus.FAILED
+    assert rejected.error == "Job queue is full"
+    release.set()
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    test_status_indexes_follow_jobs()
+    test_status_published_last()
+    test_list_jobs_after_cleanup()
+    test_callbacks_fire_once_per_flush()
+    test_full_queue_returns_false()
+    print("✅ Job manager tests passed!")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Test script for relationship detection against straightforward pairwise reference scoring."""
+
+import random
+import re
+
+from dbdoc.models import Table, Column
+from dbdoc.services.relationship_detector import RelationshipDetector, FK_NAME_PATTERNS
+
+TABLE_NAMES = [
+    "customer", "customers", "order", "orders", "product", "item", "user", "account",
+    "category", "categories", "company", "status", "address", "addresses", "box", "boxes",
+    "y", "ies", "s",
+]
+DATA_TYPES = [
+    "INTEGER", "integer", "bigint", "int4", "TEXT", "varchar(255)", "CHARACTER VARYING",
+    "numeric(10,2)", "double precision", "REAL", "uuid", "date", "tinytext", "pointer",
+]
+TOP_VALUES = [None, {}, {"a": 1}, {"a": 1, "b": 2}, {"a": 1, "b": 2, "c": 3}, {"b": 1, "c": 1}, {"x": 1}]
+
+
+def random_schema(rng):
+    """Build detached tables and columns with random names, types and profiles."""
+    tables = []
+    next_column_id = 1
+    for table_id, table_name in enumerate(rng.sample(TABLE_NAMES, rng.randint(2, 10)), start=1):
+        table = Table(id=table_id, table_name=table_name.upper() if rng.random() < 0.1 else table_name,
+                      row_count=rng.choice([None, 0, 100]))
+        for _ in range(rng.randint(1, 6)):
+            target = rng.choice(TABLE_NAMES)
+            column_name = rng.choice([
+                "id", "pk", "name", "code", "number", f"{table_name}_id", f"{target}_id", f"{target}_fk",
+                f"fk_{target}", f"{target}_key", f"{target}_code", f"{target}_number", f"{target}_ref",
+                f"ref_{target}", f"{target}_ref_id", "a", "",
+            ])
+            table.columns.append(Column(
+                id=next_column_id, table_id=table_id, column_name=column_name,
+                data_type=rng.choice(DATA_TYPES), is_nullable=rng.random() < 0.5,
+                is_key=rng.random() < 0.3, cardinality=rng.choice([None, 0, 50, 96, 100]),
+                top_values=rng.choice(TOP_VALUES)
+            ))
+            next_column_id += 1
+        tables.append(table)
+    return tables
+
+
+def reference_table_candidates(table_name, table_by_name):
+    """Tables a name can refer to, checking each plural and singular form in turn."""
+    candidates = []
+    if table_name in table_by_name:
+        candidates.append((table_name, 1.0))
+    for plural in [table_name + 's', table_name + 'es', table_name + 'ies' if table_name.endswith('y') else None]:
+        if plural and plural in table_by_name:
+            candidates.append((plural, 0.9))
+    if table_name.endswith('s') and len(table_name) > 1 and table_name[:-1] in table_by_name:
+        candidates.append((table_name[:-1], 0.9))
+    if table_name.endswith('es') and len(table_name) > 2 and table_name[:-2] in table_by_name:
+        candidates.append((table_name[:-2], 0.9))
+    if table_name.endswith('ies') and len(table_name) > 3 and table_name[:-3] + 'y' in table_by_name:
+        candidates.append((table_name[:-3] + 'y', 0.9))
+    return candidates
+
+
+def reference_type_compatibility(source_type, target_type):
+    """Compatibility of two data types, checking each family by substring."""
+    source_type, target_type = source_type.lower(), target_type.lower()
+    if source_type == target_type:
+        return 1.0
+    for types, score in [({'integer', 'int', 'bigint', 'smallint', 'tinyint'}, 0.9),
+                         ({'varchar', 'char', 'text', 'string'}, 0.8),
+                         ({'decimal', 'numeric', 'float', 'double', 'real'}, 0.7)]:
+        if any(t in source_type for t in types) and any(t in target_type for t in types):
+            return score
+    return 0.3
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets."""
+    return len(a & b) / len(a | b)
+
+
+def bigrams(name):
+    """Set of a name's character bigrams."""
+    return {name[i:i + 2] for i in range(len(name) - 1)}
+
+
+def reference_naming(detector, tables):
+    """Naming candidates from matching every pattern against every column."""
+    candidates = []
+    table_by_name = {t.table_name.lower(): t for t in tables}
+    for source_table in tables:
+        for source_column in source_table.columns:
+            if detector._is_likely_primary_key(source_column):
+                continue
+            for pattern, base_confidence, pattern_type in FK_NAME_PATTERNS:
+                match = re.match(pattern, source_column.column_name.lower())
+                if not match:
+                    continue
+                for target_name, name_confidence in reference_table_candidates(match.group(1), table_by_name):
+                    target_table = table_by_name[target_name]
+                    for target_column, col_confidence in detector._find_target_columns(target_table, pattern_type):
+                        confidence = base_confidence * name_confidence * col_confidence
+                        confidence *= reference_type_compatibility(source_column.data_type, target_column.data_type)
+                        if confidence > 0.3:
+                            relationship_type = detector._infer_relationship_type(
+                                source_column, target_column, source_table, target_table)
+                            candidates.append((source_column.id, target_column.id, relationship_type, confidence))
+    return candidates
+
+
+def reference_statistical(detector, tables):
+    """Statistical candidates from comparing the top values of every pair of profiled columns."""
+    candidates = []
+    for source_table in tables:
+        for source_column in source_table.columns:
+            if not source_column.cardinality or not source_column.top_values:
+                continue
+            for target_table in tables:
+                if target_table.id == source_table.id:
+                    continue
+                for target_column in target_table.columns:
+                    if not target_column.cardinality or not target_column.top_values:
+                        continue
+                    overlap = jaccard(set(source_column.top_values), set(target_column.top_values))
+                    if overlap > 0.5:
+                        relationship_type, confidence = detector._analyze_cardinality_pattern(
+                            source_column, target_column, source_table, target_table)
+                        if confidence > 0.4:
+                            candidates.append((source_column.id, target_column.id, relationship_type, confidence))
+    return candidates
+
+
+def reference_structural(detector, tables):
+    """Structural candidates from comparing every FK-like column's name with every likely primary key."""
+    candidates = []
+    for source_table in tables:
+        for source_column in source_table.columns:
+            if not detector._has_fk_structure(source_column):
+                continue
+            source_name = source_column.column_name.lower()
+            for target_table in tables:
+                if target_table.id == source_column.table_id:
+                    continue
+                for target_column in target_table.columns:
+                    if not detector._is_likely_primary_key(target_column):
+                        continue
+                    target_name = target_column.column_name.lower()
+                    if bigrams(source_name) and bigrams(target_name):
+                        similarity = jaccard(bigrams(source_name), bigrams(target_name))
+                    else:
+                        similarity = 1.0 if source_name == target_name else 0.0
+                    if similarity > 0.5:
+                        relationship_type = detector._infer_relationship_type(
+                            source_column, target_column, source_table, target_table)
+                        candidates.append((source_column.id, target_column.id, relationship_type, similarity * 0.7))
+    return candidates
+
+
+def summarize(candidates):
+    """Comparable (source, target, type, confidence) tuples for detector candidates."""
+    return [(c.source_column.id, c.target_column.id, c.relationship_type, c.confidence_score) for c in candidates]
+
+
+def test_detectors_match_pairwise_reference():
+    """Test that the indexed detectors find the same candidates, in the same order, as pairwise scoring."""
+    rng = random.Random(5)
+    for _ in range(300):
+        tables = random_schema(rng)
+        detector = RelationshipDetector(None)
+        detector._index_columns(tables)
+
+        assert summarize(detector._detect_naming_pattern_relationships(tables)) == reference_naming(detector, tables)
+        assert summarize(detector._detect_statistical_relationships(tables)) == reference_statistical(detector, tables)
+        assert summarize(detector._detect_structural_relationships(tables)) == reference_structural(detector, tables)
+
+
+def test_table_candidates_and_type_compatibility():
+    """Test the table name index and type families against direct checks."""
+    rng = random.Random(7)
+    for _ in range(200):
+        table_by_name = {name: None for name in rng.sample(TABLE_NAMES, rng.randint(1, len(TABLE_NAMES)))}
+        detector = RelationshipDetector(None)
+        detector._table_name_index = detector._build_table_name_index(table_by_name)
+        for name in TABLE_NAMES + ["categor", "compan", "addresse", "bo", "ie", ""]:
+            assert detector._find_table_candidates(name) == reference_table_candidates(name, table_by_name)
+
+    for source_type in DATA_TYPES:
+        for target_type in DATA_TYPES:
+            source = Column(id=1, data_type=source_type)
+            target = Column(id=2, data_type=target_type)
+            assert (RelationshipDetector(None)._check_type_compatibility(source, target)
+                    == reference_type_compatibility(source_type, target_type))
+
+
+if __name__ == "__main__":
+    test_detectors_match_pairwise_reference()
+    test_table_candidates_and_type_compatibility()
+    print("✅ Relationship detector tests passed!")
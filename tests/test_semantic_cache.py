@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test script for the semantic LLM result cache."""
+
+import os
+import pickle
+import tempfile
+
+from dbdoc.services.semantic_cache import SemanticCache, ProgramCache, ResponseCache
+
+
+def test_semantic_cache_lookup():
+    """Test that similar contexts hit and other keys or contexts miss."""
+    cache = SemanticCache(threshold=0.9)
+    context = "Table: users\nColumn: created_at\nData Type: timestamp\nNullable: No"
+    cache.add("created_at", context, {"description": "When the record was created."})
+    
+    assert cache.lookup("created_at", context) == {"description": "When the record was created."}
+    assert cache.lookup("created_at", context.replace("users", "user")) is not None
+    assert cache.lookup("updated_at", context) is None
+    assert cache.lookup("created_at", "Table: orders\nColumn: total_amount\nData Type: numeric") is None
+
+
+def test_semantic_cache_persistence():
+    """Test that cached results survive reloading from disk."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "semantic_cache.pkl")
+        SemanticCache(path=path).add("email", "Column: email", {"description": "Email address."})
+        
+        reloaded = SemanticCache(path=path)
+        assert len(reloaded) == 1
+        assert reloaded.lookup("email", "Column: email") == {"description": "Email address."}
+
+
+def test_semantic_cache_appends_entries():
+    """Test that entries are appended to the file and older single-list files still load."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "semantic_cache.pkl")
+        with open(path, "wb") as f:
+            pickle.dump([("email", "Column: email", {"description": "Email address."})], f)
+
+        cache = SemanticCache(path=path)
+        cache.add("email", "Column: work_email", {"description": "Work email address."})
+        cache.add("phone", "Column: phone", {"description": "Phone number."})
+        assert cache.lookup("email", "Column: work_email") == {"description": "Work email address."}
+        SemanticCache(path=path).add("phone", "Column: mobile_phone", {"description": "Mobile number."})
+
+        reloaded = SemanticCache(path=path)
+        assert len(reloaded) == 4
+        assert reloaded.lookup("email", "Column: email") == {"description": "Email address."}
+        assert reloaded.lookup("phone", "Column: mobile_phone") == {"description": "Mobile number."}
+
+
+def test_program_cache_validation():
+    """Test that templates are installed only when they reproduce the examples."""
+    cache = ProgramCache(min_examples=2)
+    examples = None
+    for table in ["users", "orders"]:
+        fields = {"table_name": table, "column_name": "created_at", "data_type": "timestamp", "nullable": "No"}
+        result = {"description": f"When the {table} record was created.", "suggested_is_pii": False}
+        examples = cache.record("created_at", fields, result)
+    assert examples is not None and len(examples) == 2
+    
+    assert not cache.install("created_at", {"description": "A monetary amount.", "is_pii": False}, examples)
+    assert cache.install("created_at", {"description": "When the $table_name record was created.", "is_pii": False}, examples)
+    
+    rendered = cache.run("created_at", {"table_name": "items", "column_name": "created_at", "data_type": "timestamp", "nullable": "No"})
+    assert rendered["description"] == "When the items record was created."
+
+
+def test_response_cache_persistence():
+    """Test that exact responses survive reloading and other requests miss."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        key = ResponseCache.key("gpt-4", "v1", "prompt")
+        ResponseCache(directory=cache_dir).set(key, '{"description": "x"}')
+        
+        reloaded = ResponseCache(directory=cache_dir)
+        assert reloaded.get(key) == '{"description": "x"}'
+        assert reloaded.get(ResponseCache.key("gpt-4", "v2", "prompt")) is None
+
+
+if __name__ == "__main__":
+    test_semantic_cache_lookup()
+    test_semantic_cache_persistence()
+    test_semantic_cache_appends_entries()
+    test_program_cache_validation()
+    test_response_cache_persistence()
+    print("✅ Semantic cache tests passed!")